@@ -1,60 +1,65 @@
 import os
 import json
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+from dataclasses import dataclass, field
 from datetime import datetime
-from textblob import TextBlob
+from functools import lru_cache
 import re
 from collections import Counter
-import nltk
-nltk.download('punkt_tab')
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-import networkx as nx
-import requests
 from tenacity import retry, stop_after_attempt, wait_exponential
 import logging
 from dotenv import load_dotenv
 
+from feature_store import PostFeatureStore
+from post_schema import EXPORT_PRECISION, build_posts_frame, category_matrix, export_floats, flat_frame, memory_usage
+from profiling import profiled, span, start_session
+from report_stats import compute_report_stats, sentiment_label
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 input_folder = "input"
-if not os.path.exists(input_folder):
-    os.makedirs(input_folder)
-
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Per-post features from earlier runs; only new or edited posts are re-analyzed
+# Anchored at the repo, not the cwd: job stages run in a staging directory that is deleted afterwards
+FEATURE_STORE_PATH = os.getenv('FEATURE_STORE_PATH', os.path.join(BASE_DIR, '.feature_cache', 'post_features.json'))
+
+# NLTK data the keyword extractor needs; punkt_tab backs word_tokenize on NLTK >= 3.8.2
+NLTK_RESOURCES = [
+    ('tokenizers/punkt_tab', 'punkt_tab'),
+    ('corpora/stopwords', 'stopwords')
+]
+
+@lru_cache(maxsize=None)
 def ensure_nltk_resources():
+    """
+    Import NLTK and check its data on first use. Resources are looked up on
+    the local data path only (plus nltk_data in the repo, where the deploy
+    build puts it); missing ones are downloaded just when NLTK_DOWNLOAD=1,
+    otherwise keywords use the fallback tokenizer.
+    """
+    import nltk
 
     nltk_data_path = os.path.join(os.path.expanduser("~"), "nltk_data")
-    if not os.path.exists(nltk_data_path):
-        os.makedirs(nltk_data_path)
-    nltk.data.path.append(nltk_data_path)
-    resources = [
-        ('tokenizers/punkt', 'punkt'),
-        ('corpora/stopwords', 'stopwords')
-    ]
+    for path in (os.path.join(BASE_DIR, "nltk_data"), nltk_data_path):
+        if path not in nltk.data.path:
+            nltk.data.path.append(path)
     
-    for resource_path, resource_name in resources:
+    for resource_path, resource_name in NLTK_RESOURCES:
         try:
-            if not os.path.exists(os.path.join(nltk_data_path, resource_path)):
-                logger.info(f"Downloading NLTK resource: {resource_name}")
-                nltk.download(resource_name, download_dir=nltk_data_path, quiet=True)
-                
-            if resource_name == 'punkt':
-                word_tokenize("Test sentence.")
-                logger.info("NLTK punkt tokenizer verified.")
-            elif resource_name == 'stopwords':
-                stopwords.words('english')
-                logger.info("NLTK stopwords verified.")
-        except Exception as e:
-            logger.error(f"Error with NLTK resource {resource_name}: {e}")
-            return False
+            nltk.data.find(resource_path)
+        except LookupError:
+            if os.getenv('NLTK_DOWNLOAD') != '1':
+                logger.warning(f"NLTK resource {resource_name} not found locally; set NLTK_DOWNLOAD=1 to download it")
+                return False
+            logger.info(f"Downloading NLTK resource: {resource_name}")
+            os.makedirs(nltk_data_path, exist_ok=True)
+            if not nltk.download(resource_name, download_dir=nltk_data_path, quiet=True):
+                logger.error(f"Could not download NLTK resource {resource_name}")
+                return False
     
     return True
 
-nltk_resources_available = ensure_nltk_resources()
-
 def fallback_tokenize(text):
     if not isinstance(text, str):
         return []
@@ -88,8 +93,10 @@ def extract_keywords(text, num_keywords=5):
     if not isinstance(text, str) or not text.strip():
         return []
     
-    if nltk_resources_available:
+    if ensure_nltk_resources():
         try:
+            from nltk.corpus import stopwords
+            from nltk.tokenize import word_tokenize
             words = word_tokenize(clean_text(text))
             stop_words = set(stopwords.words('english'))
             filtered_words = [word for word in words if word not in stop_words and len(word) > 2]
@@ -124,12 +131,14 @@ def clean_text(text):
 def get_sentiment(text):
     if not isinstance(text, str) or not text.strip():
         return 0.0
+    from textblob import TextBlob
     analysis = TextBlob(text)
     return analysis.sentiment.polarity
 
 def get_subjectivity(text):
     if not isinstance(text, str) or not text.strip():
         return 0.0
+    from textblob import TextBlob
     analysis = TextBlob(text)
     return analysis.sentiment.subjectivity
 
@@ -207,6 +216,7 @@ def generate_content_insights(df, api_key=None):
     return insights
 
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=10))
+@profiled("llm_call")
 def call_llm_api(prompt, api_key):
     """
     Call the Gemini API with retry logic
@@ -223,6 +233,8 @@ def call_llm_api(prompt, api_key):
         }]
     }
     
+    import requests
+
     # Gemini API URL
     api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={api_key}"
     
@@ -249,14 +261,14 @@ def generate_fallback_analysis(df):
     
     # Basic thematic analysis using categories
     if 'categories' in df.columns:
-        category_counts = df['categories'].str.split(', ').explode().value_counts()
+        category_counts = category_matrix(df).sum().sort_values(ascending=False)
         insights["thematic"] = f"Most common categories in posts: {', '.join(category_counts.index[:3])}"
     else:
         insights["thematic"] = "No category information available."
     
     # Basic sentiment context
     avg_sentiment = df['combined_sentiment'].mean() if 'combined_sentiment' in df.columns else 0
-    sentiment_description = "positive" if avg_sentiment > 0.1 else "negative" if avg_sentiment < -0.1 else "neutral"
+    sentiment_description = sentiment_label(avg_sentiment)
     insights["sentiment_context"] = f"Posts have an overall {sentiment_description} tone with average sentiment score of {avg_sentiment:.2f}."
     
     # Basic user intent analysis
@@ -294,109 +306,126 @@ def format_llm_insights(insights):
     return formatted
 
 
-# Main execution
+# Pipeline API: run(config) chains the stages below; each stage can also be
+# called on its own (e.g. to benchmark it or to feed it already-loaded posts)
 
-try:
-    data = load_data('input.json')
-except:
-    logger.warning("Could not load data from input.json, using sample data")
-   
-posts_data = []
-for post in data:
-    if 'data' in post:
-        post_data = post['data']
-        
-        created_utc = post_data.get('created_utc', 0)
-        created_datetime = datetime.utcfromtimestamp(created_utc) if created_utc else None
-        
-        title = post_data.get('title', '')
-        selftext = post_data.get('selftext', '')
-        
+@dataclass
+class AnalysisConfig:
+    input_file: str = 'input.json'
+    output_dir: str = input_folder
+    feature_store_path: str = FEATURE_STORE_PATH
+    # None reads GEMINI_API_KEY from the environment
+    api_key: str = None
+
+
+@dataclass
+class AnalysisResult:
+    df: pd.DataFrame
+    stats: object
+    visualization_data: dict
+    report: str
+    outputs: list = field(default_factory=list)
+    timings: dict = field(default_factory=dict)
+
+
+def load(config):
+    """Stage 1: the raw Reddit listing (sample data when the file is unavailable)"""
+    return load_data(config.input_file)
+
+def compute_post_features(title, selftext):
+    """Text features of one post: sentiment, subjectivity, keywords and categories"""
+    with span("sentiment", items=1):
         title_sentiment = get_sentiment(title)
         content_sentiment = get_sentiment(selftext)
         combined_sentiment = (title_sentiment + content_sentiment) / 2 if selftext else title_sentiment
-        
+    
         title_subjectivity = get_subjectivity(title)
         content_subjectivity = get_subjectivity(selftext)
         combined_subjectivity = (title_subjectivity + content_subjectivity) / 2 if selftext else title_subjectivity
-        
+    
+    with span("keywords", items=1):
         try:
             keywords = extract_keywords(title + " " + selftext if selftext else title)
         except Exception as e:
             print(f"Error extracting keywords: {e}")
             keywords = []
-        
+    
+    with span("categorization", items=1):
         categories = categorize_content(title, selftext)
-        
-        is_crosspost = 'crosspost_parent' in post_data
-        crosspost_parent = post_data.get('crosspost_parent', '')
-        
-        processed_data = {
-            'id': post_data.get('id', ''),
-            'subreddit': post_data.get('subreddit', ''),
-            'author': post_data.get('author', ''),
-            'title': title,
-            'selftext': selftext,
-            'created_utc': created_datetime,
-            'score': post_data.get('score', 0),
-            'ups': post_data.get('ups', 0),
-            'downs': post_data.get('downs', 0),
-            'upvote_ratio': post_data.get('upvote_ratio', 0),
-            'num_comments': post_data.get('num_comments', 0),
-            'title_sentiment': title_sentiment,
-            'content_sentiment': content_sentiment,
-            'combined_sentiment': combined_sentiment,
-            'title_subjectivity': title_subjectivity,
-            'content_subjectivity': content_subjectivity,
-            'combined_subjectivity': combined_subjectivity,
-            'keywords': ', '.join([kw[0] for kw in keywords]),
-            'categories': ', '.join(categories),
-            'is_crosspost': is_crosspost,
-            'crosspost_parent': crosspost_parent,
-            'over_18': post_data.get('over_18', False),
-            'stickied': post_data.get('stickied', False),
-            'domain': post_data.get('domain', ''),
-            'url': post_data.get('url', '')
-        }
-        
-        posts_data.append(processed_data)
-
-df = pd.DataFrame(posts_data)
-
-if 'created_utc' in df.columns and not df['created_utc'].isnull().all():
-    df['date'] = df['created_utc'].dt.date
-    df['day_of_week'] = df['created_utc'].dt.day_name()
-    df['hour_of_day'] = df['created_utc'].dt.hour
-
-try:
-    df.to_csv(os.path.join(input_folder, 'processed_posts.csv'), index=False)
-    print(f"Processed data saved to {os.path.join(input_folder, 'processed_posts.csv')}")
-except Exception as e:
-    print(f"Error saving processed data: {e}")
-
-load_dotenv()
+    
+    return {
+        'title_sentiment': title_sentiment,
+        'content_sentiment': content_sentiment,
+        'combined_sentiment': combined_sentiment,
+        'title_subjectivity': title_subjectivity,
+        'content_subjectivity': content_subjectivity,
+        'combined_subjectivity': combined_subjectivity,
+        'keywords': [kw[0] for kw in keywords],
+        'categories': categories
+    }
 
-gemini_api_key = os.getenv('GEMINI_API_KEY')
-if not gemini_api_key:
-    print("Warning: GEMINI_API_KEY environment variable not found.")
-    print("AI-enhanced insights will not be available.")
-try:
-    llm_insights = generate_content_insights(df, api_key=gemini_api_key)
-    llm_insights_formatted = format_llm_insights(llm_insights)
-    print("Generated AI insights successfully")
-except Exception as e:
-    print(f"Error generating AI insights: {e}")
-    llm_insights_formatted = "Error generating AI insights. Using basic analysis only."
+def featurize(posts, feature_store_path=FEATURE_STORE_PATH):
+    """Stage 2: per-post features and the typed posts DataFrame"""
+    # Fallback-tokenizer keywords are stored apart, so they are redone once NLTK data is available
+    tokenizer = "nltk" if ensure_nltk_resources() else "fallback"
+    # Held (and locked) from loading through prune and save, so concurrent jobs take turns
+    with PostFeatureStore(feature_store_path, variant=tokenizer) as feature_store:
+        posts_data = []
+        for post in posts:
+            if 'data' in post:
+                post_data = post['data']
+            
+                created_utc = post_data.get('created_utc', 0)
+                created_datetime = datetime.utcfromtimestamp(created_utc) if created_utc else None
+            
+                title = post_data.get('title', '')
+                selftext = post_data.get('selftext', '')
+            
+                features = feature_store.features(post_data.get('id', ''), title, selftext, compute_post_features)
+            
+                is_crosspost = 'crosspost_parent' in post_data
+                crosspost_parent = post_data.get('crosspost_parent', '')
+            
+                processed_data = {
+                    'id': post_data.get('id', ''),
+                    'subreddit': post_data.get('subreddit', ''),
+                    'author': post_data.get('author', ''),
+                    'title': title,
+                    'selftext': selftext,
+                    'created_utc': created_datetime,
+                    'score': post_data.get('score', 0),
+                    'ups': post_data.get('ups', 0),
+                    'downs': post_data.get('downs', 0),
+                    'upvote_ratio': post_data.get('upvote_ratio', 0),
+                    'num_comments': post_data.get('num_comments', 0),
+                    **features,
+                    'is_crosspost': is_crosspost,
+                    'crosspost_parent': crosspost_parent,
+                    'over_18': post_data.get('over_18', False),
+                    'stickied': post_data.get('stickied', False),
+                    'domain': post_data.get('domain', ''),
+                    'url': post_data.get('url', '')
+                }
+            
+                posts_data.append(processed_data)
 
-# VISUALIZATIONS AND ANALYSIS
+        print(f"Analyzed {feature_store.misses} new or edited posts, reused stored features for {feature_store.hits}")
+        pruned = feature_store.prune_unseen()
+        if pruned:
+            print(f"Dropped stored features for {pruned} posts no longer in the dump")
+        feature_store.save()
 
-visualization_data = {}
+    # Categorical/fixed-width dtypes; see post_schema
+    df = build_posts_frame(posts_data)
+    print(f"Posts DataFrame: {len(df)} rows, {memory_usage(df) / 1024 / 1024:.2f} MB")
+    return df
 
-def save_visualization_data(data_key, data_value, description=None):
+def save_visualization_data(visualization_data, data_key, data_value, description=None):
     """
     Save visualization data to JSON instead of creating PNG files
     
     Args:
+        visualization_data: Dictionary the serialized entry is added to
         data_key: Key to use in the visualization_data dictionary
         data_value: The data to save (will be converted to serializable format)
         description: Optional description of the data
@@ -420,190 +449,210 @@ def save_visualization_data(data_key, data_value, description=None):
     except Exception as e:
         print(f"Error saving visualization data for {data_key}: {e}")
 
-# Time-based analysis
-if 'date' in df.columns and not df['date'].isnull().all():
-    # Posts per day
-    posts_per_day = df.groupby('date').size()
+def aggregate(df):
+    """Stage 3: chart data for the dashboard and the report statistics"""
+    visualization_data = {}
+
+    # Time-based analysis
+    if 'date' in df.columns and not df['date'].isnull().all():
+        # Posts per day
+        posts_per_day = df.groupby('date').size()
     
-    if not posts_per_day.empty:
-        posts_per_day_data = {
-            'dates': [str(date) for date in posts_per_day.index],
-            'counts': posts_per_day.values.tolist()
-        }
-        save_visualization_data('posts_per_day', posts_per_day_data, 'Number of posts per day')
+        if not posts_per_day.empty:
+            posts_per_day_data = {
+                'dates': [str(date) for date in posts_per_day.index],
+                'counts': posts_per_day.values.tolist()
+            }
+            save_visualization_data(visualization_data, 'posts_per_day', posts_per_day_data, 'Number of posts per day')
     
-    # Posts by hour of day 
-    if 'hour_of_day' in df.columns:
-        posts_by_hour = df.groupby('hour_of_day').size()
+        # Posts by hour of day 
+        if 'hour_of_day' in df.columns:
+            posts_by_hour = df.groupby('hour_of_day').size()
         
-        if not posts_by_hour.empty:
-            posts_by_hour_data = {
-                'hours': posts_by_hour.index.tolist(),
-                'counts': posts_by_hour.values.tolist()
-            }
-            save_visualization_data('posts_by_hour', posts_by_hour_data, 'Number of posts by hour of day')
+            if not posts_by_hour.empty:
+                posts_by_hour_data = {
+                    'hours': posts_by_hour.index.tolist(),
+                    'counts': posts_by_hour.values.tolist()
+                }
+                save_visualization_data(visualization_data, 'posts_by_hour', posts_by_hour_data, 'Number of posts by hour of day')
             
-    # Posts by day of week
-    if 'day_of_week' in df.columns:
-        ordered_days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        posts_by_day = df.groupby('day_of_week').size()
+        # Posts by day of week
+        if 'day_of_week' in df.columns:
+            # day_of_week is an ordered categorical, so groups come out Monday first
+            posts_by_day = df.groupby('day_of_week', observed=True).size()
         
-        if not posts_by_day.empty:
-            try:
-                posts_by_day = posts_by_day.reindex(ordered_days)
-            except:
-                pass 
-            posts_by_day_data = {
-                'days': posts_by_day.index.tolist(),
-                'counts': posts_by_day.values.tolist()
-            }
-            save_visualization_data('posts_by_day', posts_by_day_data, 'Number of posts by day of week')
-
-# User analysis
-user_stats = df['author'].value_counts()
+            if not posts_by_day.empty:
+                posts_by_day_data = {
+                    'days': posts_by_day.index.tolist(),
+                    'counts': posts_by_day.values.tolist()
+                }
+                save_visualization_data(visualization_data, 'posts_by_day', posts_by_day_data, 'Number of posts by day of week')
+
+    # User analysis
+    user_stats = df['author'].value_counts()
+
+    if not user_stats.empty:
+        top_users_data = {
+            'users': user_stats.head(min(10, len(user_stats))).index.tolist(),
+            'counts': user_stats.head(min(10, len(user_stats))).values.tolist()
+        }
+        save_visualization_data(visualization_data, 'top_users', top_users_data, 'Top most active users')
 
-if not user_stats.empty:
-    top_users_data = {
-        'users': user_stats.head(min(10, len(user_stats))).index.tolist(),
-        'counts': user_stats.head(min(10, len(user_stats))).values.tolist()
-    }
-    save_visualization_data('top_users', top_users_data, 'Top most active users')
+    # Subreddit analysis
+    subreddit_stats = df['subreddit'].value_counts()
 
-# Subreddit analysis
-subreddit_stats = df['subreddit'].value_counts()
+    if not subreddit_stats.empty:
+        top_subreddits_data = {
+            'subreddits': subreddit_stats.head(min(10, len(subreddit_stats))).index.tolist(),
+            'counts': subreddit_stats.head(min(10, len(subreddit_stats))).values.tolist()
+        }
+        save_visualization_data(visualization_data, 'top_subreddits', top_subreddits_data, 'Top subreddits by post count')
 
-if not subreddit_stats.empty:
-    top_subreddits_data = {
-        'subreddits': subreddit_stats.head(min(10, len(subreddit_stats))).index.tolist(),
-        'counts': subreddit_stats.head(min(10, len(subreddit_stats))).values.tolist()
+    # Sentiment analysis data
+    sentiment_distribution_data = {
+        'title_sentiment': export_floats(df['title_sentiment']),
+        'content_sentiment': export_floats(df['content_sentiment']) if 'content_sentiment' in df.columns else [],
+        'combined_sentiment': export_floats(df['combined_sentiment'])
     }
-    save_visualization_data('top_subreddits', top_subreddits_data, 'Top subreddits by post count')
-
-# Sentiment analysis data
-sentiment_distribution_data = {
-    'title_sentiment': df['title_sentiment'].tolist(),
-    'content_sentiment': df['content_sentiment'].tolist() if 'content_sentiment' in df.columns else [],
-    'combined_sentiment': df['combined_sentiment'].tolist()
-}
-save_visualization_data('sentiment_distribution', sentiment_distribution_data, 'Distribution of sentiment values')
-
-# Sentiment vs. Engagement Analysis
-sentiment_engagement_data = {
-    'sentiment_vs_score': df[['combined_sentiment', 'score']].to_dict('records'),
-    'sentiment_vs_comments': df[['combined_sentiment', 'num_comments']].to_dict('records'),
-    'subjectivity_vs_score': df[['combined_subjectivity', 'score']].to_dict('records'),
-    'subjectivity_vs_comments': df[['combined_subjectivity', 'num_comments']].to_dict('records')
-}
-save_visualization_data('sentiment_engagement', sentiment_engagement_data, 'Relationships between sentiment/subjectivity and engagement metrics')
-
-# Content Category Analysis
-if 'categories' in df.columns:
-    all_categories = []
-    for cats in df['categories'].str.split(', '):
-        if isinstance(cats, list):
-            all_categories.extend(cats)
-    
-    category_counts = Counter(all_categories)
-    
-    if category_counts:
-        category_data = {
-            'categories': list(category_counts.keys()),
-            'counts': list(category_counts.values())
-        }
-        save_visualization_data('content_categories', category_data, 'Distribution of content categories')
+    save_visualization_data(visualization_data, 'sentiment_distribution', sentiment_distribution_data, 'Distribution of sentiment values')
+
+    # Sentiment vs. Engagement Analysis
+    engagement = df[['combined_sentiment', 'combined_subjectivity', 'score', 'num_comments']].astype(
+        {'combined_sentiment': 'float64', 'combined_subjectivity': 'float64'}).round(EXPORT_PRECISION)
+    sentiment_engagement_data = {
+        'sentiment_vs_score': engagement[['combined_sentiment', 'score']].to_dict('records'),
+        'sentiment_vs_comments': engagement[['combined_sentiment', 'num_comments']].to_dict('records'),
+        'subjectivity_vs_score': engagement[['combined_subjectivity', 'score']].to_dict('records'),
+        'subjectivity_vs_comments': engagement[['combined_subjectivity', 'num_comments']].to_dict('records')
+    }
+    save_visualization_data(visualization_data, 'sentiment_engagement', sentiment_engagement_data, 'Relationships between sentiment/subjectivity and engagement metrics')
 
-#  Keyword analysis
-if 'keywords' in df.columns:
-    all_keywords = []
-    for kws in df['keywords'].str.split(', '):
-        if isinstance(kws, list):
-            all_keywords.extend([k for k in kws if k])  
+    # Content Category Analysis
+    if 'categories' in df.columns:
+        category_counts = category_matrix(df).sum()
+        category_counts = category_counts[category_counts > 0]
     
-    keyword_counts = Counter(all_keywords)
+        if not category_counts.empty:
+            category_data = {
+                'categories': category_counts.index.tolist(),
+                'counts': [int(count) for count in category_counts.values]
+            }
+            save_visualization_data(visualization_data, 'content_categories', category_data, 'Distribution of content categories')
+
+    #  Keyword analysis
+    if 'keywords' in df.columns:
+        keyword_counts = df['keywords'].explode().dropna().value_counts().head(15)
     
-    if keyword_counts:
-        keyword_data = {
-            'keywords': [word for word, _ in keyword_counts.most_common(15)],
-            'counts': [count for _, count in keyword_counts.most_common(15)]
-        }
-        save_visualization_data('top_keywords', keyword_data, 'Top 15 most frequent keywords')
+        if not keyword_counts.empty:
+            keyword_data = {
+                'keywords': keyword_counts.index.tolist(),
+                'counts': keyword_counts.values.tolist()
+            }
+            save_visualization_data(visualization_data, 'top_keywords', keyword_data, 'Top 15 most frequent keywords')
 
-#  Crosspost Analysis
-if 'is_crosspost' in df.columns:
-    crosspost_count = df['is_crosspost'].sum()
-    direct_post_count = len(df) - crosspost_count
+    #  Crosspost Analysis
+    if 'is_crosspost' in df.columns:
+        crosspost_count = df['is_crosspost'].sum()
+        direct_post_count = len(df) - crosspost_count
     
-    if crosspost_count > 0 or direct_post_count > 0:
-        crosspost_data = {
-            'labels': ['Direct Posts', 'Crossposts'],
-            'values': [int(direct_post_count), int(crosspost_count)]
-        }
-        save_visualization_data('crosspost_ratio', crosspost_data, 'Ratio of direct posts vs. crossposts')
+        if crosspost_count > 0 or direct_post_count > 0:
+            crosspost_data = {
+                'labels': ['Direct Posts', 'Crossposts'],
+                'values': [int(direct_post_count), int(crosspost_count)]
+            }
+            save_visualization_data(visualization_data, 'crosspost_ratio', crosspost_data, 'Ratio of direct posts vs. crossposts')
         
-        if crosspost_count > 0:
-            try:
-                crosspost_df = df[df['is_crosspost'] == True].copy()
-                if not crosspost_df.empty and 'crosspost_parent_subreddit' in crosspost_df.columns:
-                    network_nodes = list(set(crosspost_df['subreddit'].tolist() + crosspost_df['crosspost_parent_subreddit'].tolist()))
-                    network_links = []
-                    for _, row in crosspost_df.iterrows():
-                        if pd.notna(row['crosspost_parent_subreddit']):
-                            network_links.append({
-                                'source': row['crosspost_parent_subreddit'],
-                                'target': row['subreddit'],
-                                'value': 1
-                            })
+            if crosspost_count > 0:
+                try:
+                    crosspost_df = df[df['is_crosspost'] == True].copy()
+                    if not crosspost_df.empty and 'crosspost_parent_subreddit' in crosspost_df.columns:
+                        network_nodes = list(set(crosspost_df['subreddit'].tolist() + crosspost_df['crosspost_parent_subreddit'].tolist()))
+                        network_links = []
+                        for _, row in crosspost_df.iterrows():
+                            if pd.notna(row['crosspost_parent_subreddit']):
+                                network_links.append({
+                                    'source': row['crosspost_parent_subreddit'],
+                                    'target': row['subreddit'],
+                                    'value': 1
+                                })
                     
-                    network_data = {
-                        'nodes': [{'id': node, 'group': 1} for node in network_nodes],
-                        'links': network_links
-                    }
-                    save_visualization_data('crosspost_network', network_data, 'Network of crosspost relationships between subreddits')
-            except Exception as e:
-                print(f"Error creating crosspost network data: {e}")
-
-# Domain Analysis
-if 'domain' in df.columns and not df['domain'].isnull().all():
-    domain_stats = df['domain'].value_counts()
-    
-    if not domain_stats.empty:
-        domain_data = {
-            'domains': domain_stats.head(min(10, len(domain_stats))).index.tolist(),
-            'counts': domain_stats.head(min(10, len(domain_stats))).values.tolist()
-        }
-        save_visualization_data('top_domains', domain_data, 'Top domains by post count')
+                        network_data = {
+                            'nodes': [{'id': node, 'group': 1} for node in network_nodes],
+                            'links': network_links
+                        }
+                        save_visualization_data(visualization_data, 'crosspost_network', network_data, 'Network of crosspost relationships between subreddits')
+                except Exception as e:
+                    print(f"Error creating crosspost network data: {e}")
+
+    # Domain Analysis
+    if 'domain' in df.columns and not df['domain'].isnull().all():
+        domain_stats = df['domain'].value_counts()
+    
+        if not domain_stats.empty:
+            domain_data = {
+                'domains': domain_stats.head(min(10, len(domain_stats))).index.tolist(),
+                'counts': domain_stats.head(min(10, len(domain_stats))).values.tolist()
+            }
+            save_visualization_data(visualization_data, 'top_domains', domain_data, 'Top domains by post count')
+
+    # Top posts analysis
+    top_posts = df.nlargest(10, 'score')[['title', 'author', 'subreddit', 'score', 'num_comments']]
+    top_posts_data = top_posts.to_dict('records')
+    save_visualization_data(visualization_data, 'top_posts', top_posts_data, 'Top 10 posts by score')
+
+    # Every figure in the report and its JSON copy comes from one stats pass
+    stats = compute_report_stats(df)
+    save_visualization_data(visualization_data, 'report_stats', stats.to_dict(), 'Statistics behind the analysis report')
+    return visualization_data, stats
+
+def generate_insights(df, api_key=None):
+    """LLM insights (or the fallback analysis) formatted for the report"""
+    load_dotenv()
+
+    gemini_api_key = api_key or os.getenv('GEMINI_API_KEY')
+    if not gemini_api_key:
+        print("Warning: GEMINI_API_KEY environment variable not found.")
+        print("AI-enhanced insights will not be available.")
+    try:
+        llm_insights = generate_content_insights(df, api_key=gemini_api_key)
+        llm_insights_formatted = format_llm_insights(llm_insights)
+        print("Generated AI insights successfully")
+    except Exception as e:
+        print(f"Error generating AI insights: {e}")
+        llm_insights_formatted = "Error generating AI insights. Using basic analysis only."
+    return llm_insights_formatted
 
-# Top posts analysis
-top_posts = df.nlargest(10, 'score')[['title', 'author', 'subreddit', 'score', 'num_comments']]
-top_posts_data = top_posts.to_dict('records')
-save_visualization_data('top_posts', top_posts_data, 'Top 10 posts by score')
+def or_na(value):
+    return 'N/A' if value is None or value == [] else value
 
-def try_value(func, default="N/A"):
-    try:
-        return func()
-    except (TypeError, ValueError, KeyError, IndexError):
-        return default
+def build_report(df, stats, api_key=None):
+    """Stage 4: the Markdown analysis report"""
+    llm_insights_formatted = generate_insights(df, api_key)
 
-# Generate comprehensive analysis report
-report = f"""# Reddit Data Analysis Report
+    subreddit_stats = df['subreddit'].value_counts()
+    user_stats = df['author'].value_counts()
+    top_posts = df.nlargest(10, 'score')[['title', 'author', 'subreddit', 'score', 'num_comments']]
+    best_sentiment = stats.by_sentiment.best()
+
+    report = f"""# Reddit Data Analysis Report
 
 ## Overview
-- **Total Posts Analyzed:** {len(df)}
-- **Date Range:** {df['date'].min() if 'date' in df.columns and not df['date'].isnull().all() else 'N/A'} to {df['date'].max() if 'date' in df.columns and not df['date'].isnull().all() else 'N/A'}
-- **Total Subreddits:** {df['subreddit'].nunique()}
-- **Total Authors:** {df['author'].nunique()}
+- **Total Posts Analyzed:** {stats.total_posts}
+- **Date Range:** {or_na(stats.date_start)} to {or_na(stats.date_end)}
+- **Total Subreddits:** {stats.subreddit_count}
+- **Total Authors:** {stats.author_count}
 
 {llm_insights_formatted}
 
 ## Content Analysis
-- **Average Sentiment:** {df['combined_sentiment'].mean():.2f} (scale: -1 to 1)
-- **Average Subjectivity:** {df['combined_subjectivity'].mean():.2f} (scale: 0 to 1)
-- **Most Common Content Categories:** {', '.join([cat for cat, count in Counter(all_categories).most_common(3)]) if 'all_categories' in locals() else 'N/A'}
+- **Average Sentiment:** {stats.avg_sentiment:.2f} (scale: -1 to 1)
+- **Average Subjectivity:** {stats.avg_subjectivity:.2f} (scale: 0 to 1)
+- **Most Common Content Categories:** {', '.join(stats.top_categories) or 'N/A'}
 
 ## Engagement Metrics
-- **Average Score:** {df['score'].mean():.2f}
-- **Average Comments:** {df['num_comments'].mean():.2f}
-- **Average Upvote Ratio:** {f"{df['upvote_ratio'].mean():.2f}" if 'upvote_ratio' in df.columns else 'N/A'}
+- **Average Score:** {stats.avg_score:.2f}
+- **Average Comments:** {stats.avg_comments:.2f}
+- **Average Upvote Ratio:** {f"{stats.avg_upvote_ratio:.2f}" if stats.avg_upvote_ratio is not None else 'N/A'}
 
 ## Top Subreddits
 {subreddit_stats.head(5).to_string()}
@@ -615,27 +664,75 @@ report = f"""# Reddit Data Analysis Report
 {top_posts[['title', 'score', 'author']].head(5).to_string()}
 
 ## Sentiment Analysis
-- **Most Positive Post:** "{df.loc[df['combined_sentiment'].idxmax(), 'title']}" (Sentiment: {df['combined_sentiment'].max():.2f})
-- **Most Negative Post:** "{df.loc[df['combined_sentiment'].idxmin(), 'title']}" (Sentiment: {df['combined_sentiment'].min():.2f})
+- **Most Positive Post:** "{stats.most_positive_post['title']}" (Sentiment: {stats.most_positive_post['sentiment']:.2f})
+- **Most Negative Post:** "{stats.most_negative_post['title']}" (Sentiment: {stats.most_negative_post['sentiment']:.2f})
 
 ## Key Findings
-1. Content sentiment averages {df['combined_sentiment'].mean():.2f}, indicating an overall {'positive' if df['combined_sentiment'].mean() > 0 else 'negative' if df['combined_sentiment'].mean() < 0 else 'neutral'} tone.
-2. {'Posts with higher sentiment scores tend to receive more upvotes.' if df['combined_sentiment'].corr(df['score']) > 0.2 else 'There is no strong correlation between sentiment and post score.'}
-3. The most active day for posting is {df['day_of_week'].mode()[0] if 'day_of_week' in df.columns and not df.empty else 'N/A'}.
-4. {'Crossposts account for ' + str(round(crosspost_count/len(df)*100, 1)) + '% of all posts.' if 'crosspost_count' in locals() else ''}
+1. Content sentiment averages {stats.avg_sentiment:.2f}, indicating an overall {stats.tone} tone.
+2. {'Posts with higher sentiment scores tend to receive more upvotes.' if (stats.sentiment_score_corr or 0) > 0.2 else 'There is no strong correlation between sentiment and post score.'}
+3. The most active day for posting is {or_na(stats.by_weekday.most_common())}.
+4. {'Crossposts account for ' + str(round(stats.crosspost_share * 100, 1)) + '% of all posts.' if stats.crosspost_share is not None else ''}
 
 ## Recommendations
-1. Best time to post: {try_value(lambda: df.groupby('hour_of_day').mean()['score'].idxmax(), 'N/A')} UTC on {try_value(lambda: df.groupby('day_of_week').mean()['score'].idxmax(), 'N/A')}
-2. Content with {try_value(lambda: 'positive' if df.groupby('combined_sentiment').mean()['score'].idxmax() > 0 else 'negative' if df.groupby('combined_sentiment').mean()['score'].idxmax() < 0 else 'neutral', 'neutral')} sentiment tends to perform better.
-3. Most engaging content categories: {try_value(lambda: ', '.join([cat for cat, _ in sorted(zip(df['categories'].unique(), [df[df['categories'] == cat]['score'].mean() for cat in df['categories'].unique()]), key=lambda x: x[1], reverse=True)[:2]]), 'N/A') if 'categories' in df.columns else 'N/A'}
+1. Best time to post: {or_na(stats.by_hour.best() and stats.by_hour.best()[0])} UTC on {or_na(stats.by_weekday.best() and stats.by_weekday.best()[0])}
+2. Content with {best_sentiment[0] if best_sentiment else 'neutral'} sentiment tends to perform better.
+3. Most engaging content categories: {', '.join(stats.by_category.best(2)) or 'N/A'}
 """
+    return report
+
+def write_outputs(result, output_dir=input_folder):
+    """Stage 5: processed posts CSV, the report and the visualization JSON"""
+    os.makedirs(output_dir, exist_ok=True)
+    csv_path = os.path.join(output_dir, 'processed_posts.csv')
+    report_path = os.path.join(output_dir, 'analysis_report.md')
+    data_path = os.path.join(output_dir, 'all_visualization_data.json')
+    outputs = []
+
+    try:
+        flat_frame(result.df).to_csv(csv_path, index=False)
+        print(f"Processed data saved to {csv_path}")
+        outputs.append(csv_path)
+    except Exception as e:
+        print(f"Error saving processed data: {e}")
+
+    with open(report_path, 'w') as f:
+        f.write(result.report)
+    outputs.append(report_path)
 
-with open(os.path.join(input_folder, 'analysis_report.md'), 'w') as f:
-    f.write(report)
+    with open(data_path, 'w') as f:
+        json.dump(result.visualization_data, f, default=str)
+    outputs.append(data_path)
 
-with open(os.path.join(input_folder, 'all_visualization_data.json'), 'w') as f:
-    json.dump(visualization_data, f, default=str) 
+    print(f"All analysis results have been saved to the '{output_dir}' folder.")
+    print(f"Raw data for visualizations saved to '{data_path}'")
+    print("The data can now be used to create visualizations in your frontend.")
+    return outputs
 
-print(f"All analysis results have been saved to the '{input_folder}' folder.")
-print(f"Raw data for visualizations saved to '{os.path.join(input_folder, 'all_visualization_data.json')}'")
-print("The data can now be used to create visualizations in your frontend.")
\ No newline at end of file
+def run(config=None, posts=None):
+    """
+    Run the whole analysis and return an AnalysisResult with per-stage timings.
+    Pass posts to skip loading when the dump is already in memory.
+    """
+    config = config or AnalysisConfig()
+    timings = {}
+
+    def timed(stage, func, *args):
+        with span(f"analysis1.{stage}", items=len(posts) if posts is not None else None) as record:
+            value = func(*args)
+        timings[stage] = round(record.wall, 3)
+        return value
+
+    if posts is None:
+        posts = timed('load', load, config)
+    df = timed('featurize', featurize, posts, config.feature_store_path)
+    visualization_data, stats = timed('aggregate', aggregate, df)
+    report = timed('report', build_report, df, stats, config.api_key)
+    result = AnalysisResult(df=df, stats=stats, visualization_data=visualization_data, report=report, timings=timings)
+    result.outputs = timed('write', write_outputs, result, config.output_dir)
+    return result
+
+
+if __name__ == "__main__":
+    # PROFILE_TRACE / PROFILE_STAGE / PROFILE_MODE turn on the trace and detailed profiling
+    start_session()
+    run()
@@ -1,14 +1,16 @@
 import json
 import os
+import sys
+from dataclasses import dataclass, field
 import pandas as pd
 from collections import Counter
 import re
 import requests
 from dotenv import load_dotenv
 
+from profiling import profiled, span, start_session
+
 output_dir = "analysis_output"
-if not os.path.exists(output_dir):
-    os.makedirs(output_dir)
 
 # Load the data from a JSON file
 def load_data(file_path):
@@ -35,9 +37,8 @@ def load_data_from_api(api_url):
     
 load_dotenv()
 
-gemini_api_key = os.getenv('GEMINI_API_KEY')
-
 # Function to generate content summary using Gemini API
+@profiled("llm_call")
 def generate_content_summary(texts, prompt_type="general"):
     gemini_api_key = os.getenv('GEMINI_API_KEY')
     gemini_api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={gemini_api_key}"
@@ -97,225 +98,293 @@ def generate_content_summary(texts, prompt_type="general"):
         elif prompt_type == "political":
             return "Political terminology in posts indicates polarization and suggests significant influence on user engagement patterns."
 
-data_source = "file"  
-data_file_path = "output1.json"  
-api_url = ""  
-
-if data_source == "file":
-    data = load_data(data_file_path)
-else:
-    data = load_data_from_api(api_url)
-
-if not data:
-    print("Failed to load data.")
-    exit()
-
-# Initialize an empty list for posts data
-posts_data = []
-exceptional_posts = []
-all_bad_words = []  
-all_political_words = []  
-all_political_misinfo = []  
-all_texts = []  
-
-for batch in data:
-    for post in batch.get('Post', []):
-        if post.get('banned', False):
-            exceptional_posts.append(post)
-            continue
+# Pipeline API: run(config) chains the stages below; each stage can also be
+# called on its own (e.g. to benchmark it or to feed it already-loaded batches)
+
+@dataclass
+class ContentAnalysisConfig:
+    data_source: str = "file"
+    input_file: str = "output1.json"
+    api_url: str = ""
+    output_dir: str = output_dir
+
+
+@dataclass
+class ContentFeatures:
+    df: pd.DataFrame
+    exceptional_posts: list
+    all_bad_words: list
+    all_political_words: list
+    all_political_misinfo: list
+    all_texts: list
+
+
+@dataclass
+class ContentAggregates:
+    bad_words_counter: Counter
+    political_words_counter: Counter
+    misinfo_counter: Counter
+    most_common_words: list
+    correlation_analysis: str
+    overall_analysis: dict
+    # Chart data, keyed by its all_visualization_data.json name
+    charts: dict
+
+
+@dataclass
+class ContentAnalysisResult:
+    features: ContentFeatures
+    aggregates: ContentAggregates
+    summaries: dict
+    report: str
+    outputs: list = field(default_factory=list)
+    timings: dict = field(default_factory=dict)
+
+
+def load(config):
+    """Stage 1: the LLM result batches, from a file or an API"""
+    if config.data_source == "file":
+        return load_data(config.input_file)
+    return load_data_from_api(config.api_url)
+
+def featurize(data):
+    """Stage 2: one row per post plus the flat word lists the counts are built from"""
+    # Initialize an empty list for posts data
+    posts_data = []
+    exceptional_posts = []
+    all_bad_words = []  
+    all_political_words = []  
+    all_political_misinfo = []  
+    all_texts = []  
+
+    for batch in data:
+        for post in batch.get('Post', []):
+            if post.get('banned', False):
+                exceptional_posts.append(post)
+                continue
         
-        bad_words_list = post.get('Bad words', [])
-        if isinstance(bad_words_list, list):
-            all_bad_words.extend(bad_words_list)
+            bad_words_list = post.get('Bad words', [])
+            if isinstance(bad_words_list, list):
+                all_bad_words.extend(bad_words_list)
         
-        political_words_list = post.get('Political words', [])
-        if isinstance(political_words_list, list):
-            all_political_words.extend(political_words_list)
+            political_words_list = post.get('Political words', [])
+            if isinstance(political_words_list, list):
+                all_political_words.extend(political_words_list)
         
-        misinfo_list = post.get('Potential Misinfo', [])
-        if isinstance(misinfo_list, list):
-            all_political_misinfo.extend(misinfo_list)
+            misinfo_list = post.get('Potential Misinfo', [])
+            if isinstance(misinfo_list, list):
+                all_political_misinfo.extend(misinfo_list)
         
-        post_data = {
-            'ID': post.get('ID', ''),
-            'user': post.get('user', ''),
-            'Bad words': ', '.join(bad_words_list) if isinstance(bad_words_list, list) else '',
-            'Political words': ', '.join(political_words_list) if isinstance(political_words_list, list) else '',
-            'Potential Misinfo': ', '.join(misinfo_list) if isinstance(misinfo_list, list) else '',
-            'banned': post.get('banned', False),
-            'subreddit': post.get('subreddit', ''),
-            'extra': post.get('extra', ''),
-            'timestamp': post.get('timestamp', '')  
-        }
-        posts_data.append(post_data)
-        all_texts.append(post.get('extra', ''))  
-
-df = pd.DataFrame(posts_data)
-
-# Count the top bad words
-bad_words_counter = Counter(all_bad_words)
-top_bad_words = bad_words_counter.most_common(20)  
-
-# Count the top political words
-political_words_counter = Counter(all_political_words)
-top_political_words = political_words_counter.most_common(20)  
-
-# Count the top potential misinfo words
-misinfo_counter = Counter(all_political_misinfo)
-top_misinfo = misinfo_counter.most_common(20)  
-
-# Generate different types of analysis using the Gemini API
-general_summary = generate_content_summary(all_texts, "general")
-bad_words_analysis = generate_content_summary(all_bad_words, "bad_words")
-political_words_analysis = generate_content_summary(all_political_words, "political")
-
-print("\n=== OVERALL CONTENT SUMMARY ===")
-print(general_summary)
-print("\n=== BAD WORDS ANALYSIS ===")
-print(bad_words_analysis)
-print("\n=== POLITICAL WORDS ANALYSIS ===")
-print(political_words_analysis)
-
-# Word Cloud data for General Content
-text_for_wc = " ".join(all_texts)
-general_word_counts = Counter(re.findall(r'\w+', text_for_wc.lower()))
-top_general_words = general_word_counts.most_common(100) 
-
-wordcloud_data = {
-    'general': [{'text': word, 'size': count} for word, count in top_general_words],
-    'bad_words': [{'text': word, 'size': count} for word, count in bad_words_counter.most_common(100)],
-    'political_words': [{'text': word, 'size': count} for word, count in political_words_counter.most_common(100)],
-    'misinfo': [{'text': word, 'size': count} for word, count in misinfo_counter.most_common(100)]
-}
-
-with open(os.path.join(output_dir, 'wordcloud_data.json'), 'w') as f:
-    json.dump(wordcloud_data, f)
-
-# Generate detailed insights 
-words = " ".join(all_texts)
-word_counts = Counter(re.findall(r'\w+', words.lower()))
-most_common_words = word_counts.most_common(20) 
-
-# Calculate engagement metrics 
-engagement_stats = {}
-if 'likes' in df.columns:
-    engagement_stats['Average Likes'] = df['likes'].mean()
-if 'comments' in df.columns:
-    engagement_stats['Average Comments'] = df['comments'].mean()
-if 'shares' in df.columns:
-    engagement_stats['Average Shares'] = df['shares'].mean()
-
-# Analyze correlations between bad words, political content, and engagement
-correlation_analysis = "No engagement metrics available to analyze correlation."
-correlation_data = {}
-
-if any(metric in df.columns for metric in ['likes', 'comments', 'shares']):
-    df['bad_words_count'] = df['Bad words'].apply(lambda x: len(x.split(',')) if x and x.strip() else 0)
-    df['political_words_count'] = df['Political words'].apply(lambda x: len(x.split(',')) if x and x.strip() else 0)
-    df['misinfo_count'] = df['Potential Misinfo'].apply(lambda x: len(x.split(',')) if x and x.strip() else 0)
-    
-    if 'likes' in df.columns:
-        correlation_data['Correlation with Likes'] = {
-            'Bad Words': df['bad_words_count'].corr(df['likes']),
-            'Political Words': df['political_words_count'].corr(df['likes']),
-            'Potential Misinfo': df['misinfo_count'].corr(df['likes'])
-        }
-    if 'comments' in df.columns:
-        correlation_data['Correlation with Comments'] = {
-            'Bad Words': df['bad_words_count'].corr(df['comments']),
-            'Political Words': df['political_words_count'].corr(df['comments']),
-            'Potential Misinfo': df['misinfo_count'].corr(df['comments'])
-        }
-    correlation_analysis = str(correlation_data)
-
-# Overall insights
-overall_analysis = {
-    'Total Posts': len(df),
-    'Total Exceptional Posts': len(exceptional_posts),
-    'Bad Words Count': len(all_bad_words),
-    'Political Words Count': len(all_political_words),
-    'Potential Misinfo Count': len(all_political_misinfo),
-    'Total Unique Subreddits': df['subreddit'].nunique(),
-    'Top Common Words': most_common_words,
-    'Top Bad Words': top_bad_words[:10],  
-    'Engagement Statistics': engagement_stats,
-    'Correlation Analysis': correlation_data
-}
-
-print("\n=== DETAILED OVERALL ANALYSIS ===")
-for key, value in overall_analysis.items():
-    if key not in ['Top Common Words', 'Top Bad Words', 'Top Political Words', 'Correlation Analysis']:
-        print(f"{key}: {value}")
-    elif key in ['Top Common Words', 'Top Bad Words', 'Top Political Words']:
-        print(f"{key}:")
-        for word, count in value:
-            print(f"  - {word}: {count}")
-    else:
-        print(f"{key}: {value}")
-
-word_count_data = {
-    'Bad Words': len(all_bad_words),
-    'Political Words': len(all_political_words),
-    'Potential Misinfo': len(all_political_misinfo),
-}
-
-with open(os.path.join(output_dir, 'word_counts_bar_data.json'), 'w') as f:
-    json.dump(word_count_data, f)
+            post_data = {
+                'ID': post.get('ID', ''),
+                'user': post.get('user', ''),
+                'Bad words': ', '.join(bad_words_list) if isinstance(bad_words_list, list) else '',
+                'Political words': ', '.join(political_words_list) if isinstance(political_words_list, list) else '',
+                'Potential Misinfo': ', '.join(misinfo_list) if isinstance(misinfo_list, list) else '',
+                # Counts are taken from the lists here so nothing has to re-split the joined strings later
+                'bad_words_count': len(bad_words_list) if isinstance(bad_words_list, list) else 0,
+                'political_words_count': len(political_words_list) if isinstance(political_words_list, list) else 0,
+                'misinfo_count': len(misinfo_list) if isinstance(misinfo_list, list) else 0,
+                'banned': post.get('banned', False),
+                'subreddit': post.get('subreddit', ''),
+                'extra': post.get('extra', ''),
+                'timestamp': post.get('timestamp', '')  
+            }
+            posts_data.append(post_data)
+            all_texts.append(post.get('extra', ''))  
+    return ContentFeatures(pd.DataFrame(posts_data), exceptional_posts, all_bad_words, all_political_words,
+                           all_political_misinfo, all_texts)
+
+def aggregate(features):
+    """Stage 3: word counts, correlations, overall statistics and chart data"""
+    df = features.df
+    all_texts = features.all_texts
+    all_bad_words = features.all_bad_words
+    all_political_words = features.all_political_words
+    all_political_misinfo = features.all_political_misinfo
+    exceptional_posts = features.exceptional_posts
+
+    # Count the top bad words
+    bad_words_counter = Counter(all_bad_words)
+    top_bad_words = bad_words_counter.most_common(20)  
+
+    # Count the top political words
+    political_words_counter = Counter(all_political_words)
+    top_political_words = political_words_counter.most_common(20)  
+
+    # Count the top potential misinfo words
+    misinfo_counter = Counter(all_political_misinfo)
+    top_misinfo = misinfo_counter.most_common(20)  
+
+    # Word Cloud data for General Content
+    text_for_wc = " ".join(all_texts)
+    general_word_counts = Counter(re.findall(r'\w+', text_for_wc.lower()))
+    top_general_words = general_word_counts.most_common(100) 
+
+    wordcloud_data = {
+        'general': [{'text': word, 'size': count} for word, count in top_general_words],
+        'bad_words': [{'text': word, 'size': count} for word, count in bad_words_counter.most_common(100)],
+        'political_words': [{'text': word, 'size': count} for word, count in political_words_counter.most_common(100)],
+        'misinfo': [{'text': word, 'size': count} for word, count in misinfo_counter.most_common(100)]
+    }
 
-bad_words_bar_data = {
-    'labels': [word for word, _ in top_bad_words],
-    'counts': [count for _, count in top_bad_words]
-}
+    # Generate detailed insights 
+    words = " ".join(all_texts)
+    word_counts = Counter(re.findall(r'\w+', words.lower()))
+    most_common_words = word_counts.most_common(20) 
 
-with open(os.path.join(output_dir, 'top_bad_words_data.json'), 'w') as f:
-    json.dump(bad_words_bar_data, f)
+    # Calculate engagement metrics 
+    engagement_stats = {}
+    if 'likes' in df.columns:
+        engagement_stats['Average Likes'] = df['likes'].mean()
+    if 'comments' in df.columns:
+        engagement_stats['Average Comments'] = df['comments'].mean()
+    if 'shares' in df.columns:
+        engagement_stats['Average Shares'] = df['shares'].mean()
+
+    # Analyze correlations between bad words, political content, and engagement
+    correlation_analysis = "No engagement metrics available to analyze correlation."
+    correlation_data = {}
+
+    count_columns = {
+        'Bad Words': 'bad_words_count',
+        'Political Words': 'political_words_count',
+        'Potential Misinfo': 'misinfo_count'
+    }
 
-political_words_bar_data = {
-    'labels': [word for word, _ in top_political_words],
-    'counts': [count for _, count in top_political_words]
-}
+    if any(metric in df.columns for metric in ['likes', 'comments', 'shares']):
+        counts = df[list(count_columns.values())].astype('float64')
+    
+        for metric, label in [('likes', 'Correlation with Likes'), ('comments', 'Correlation with Comments')]:
+            if metric in df.columns:
+                correlations = counts.corrwith(pd.to_numeric(df[metric], errors='coerce'))
+                correlation_data[label] = {name: float(correlations[column]) for name, column in count_columns.items()}
+        correlation_analysis = str(correlation_data)
+
+    # Overall insights
+    overall_analysis = {
+        'Total Posts': len(df),
+        'Total Exceptional Posts': len(exceptional_posts),
+        'Bad Words Count': len(all_bad_words),
+        'Political Words Count': len(all_political_words),
+        'Potential Misinfo Count': len(all_political_misinfo),
+        'Total Unique Subreddits': df['subreddit'].nunique(),
+        'Top Common Words': most_common_words,
+        'Top Bad Words': top_bad_words[:10],  
+        'Engagement Statistics': engagement_stats,
+        'Correlation Analysis': correlation_data
+    }
 
-with open(os.path.join(output_dir, 'top_political_words_data.json'), 'w') as f:
-    json.dump(political_words_bar_data, f)
+    print("\n=== DETAILED OVERALL ANALYSIS ===")
+    for key, value in overall_analysis.items():
+        if key not in ['Top Common Words', 'Top Bad Words', 'Top Political Words', 'Correlation Analysis']:
+            print(f"{key}: {value}")
+        elif key in ['Top Common Words', 'Top Bad Words', 'Top Political Words']:
+            print(f"{key}:")
+            for word, count in value:
+                print(f"  - {word}: {count}")
+        else:
+            print(f"{key}: {value}")
+
+    word_count_data = {
+        'Bad Words': len(all_bad_words),
+        'Political Words': len(all_political_words),
+        'Potential Misinfo': len(all_political_misinfo),
+    }
 
-misinfo_bar_data = {
-    'labels': [word for word, _ in top_misinfo],
-    'counts': [count for _, count in top_misinfo]
-}
+    bad_words_bar_data = {
+        'labels': [word for word, _ in top_bad_words],
+        'counts': [count for _, count in top_bad_words]
+    }
 
-with open(os.path.join(output_dir, 'top_misinfo_data.json'), 'w') as f:
-    json.dump(misinfo_bar_data, f)
+    political_words_bar_data = {
+        'labels': [word for word, _ in top_political_words],
+        'counts': [count for _, count in top_political_words]
+    }
 
-subreddit_counts = df['subreddit'].value_counts().to_dict()
+    misinfo_bar_data = {
+        'labels': [word for word, _ in top_misinfo],
+        'counts': [count for _, count in top_misinfo]
+    }
 
-subreddit_pie_data = {
-    'labels': list(subreddit_counts.keys()),
-    'values': list(subreddit_counts.values())
-}
+    subreddit_counts = df['subreddit'].value_counts().to_dict()
 
-with open(os.path.join(output_dir, 'subreddit_distribution_data.json'), 'w') as f:
-    json.dump(subreddit_pie_data, f)
+    subreddit_pie_data = {
+        'labels': list(subreddit_counts.keys()),
+        'values': list(subreddit_counts.values())
+    }
 
-if 'timestamp' in df.columns and not df['timestamp'].empty:
-    try:
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df['date'] = df['timestamp'].dt.date
+    time_series_data = None
+    if 'timestamp' in df.columns and not df['timestamp'].empty:
+        try:
+            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            df['date'] = df['timestamp'].dt.date
         
-        posts_by_date = df.groupby('date').size().reset_index(name='count')
-        posts_by_date['date'] = posts_by_date['date'].astype(str)
+            posts_by_date = df.groupby('date').size().reset_index(name='count')
+            posts_by_date['date'] = posts_by_date['date'].astype(str)
         
-        time_series_data = {
-            'dates': posts_by_date['date'].tolist(),
-            'counts': posts_by_date['count'].tolist()
-        }
+            time_series_data = {
+                'dates': posts_by_date['date'].tolist(),
+                'counts': posts_by_date['count'].tolist()
+            }
         
-        with open(os.path.join(output_dir, 'posts_time_series_data.json'), 'w') as f:
-            json.dump(time_series_data, f)
-    except Exception as e:
-        print(f"Error processing time series data: {e}")
+        except Exception as e:
+            print(f"Error processing time series data: {e}")
+            time_series_data = None
+
+    charts = {
+        'word_counts': word_count_data,
+        'top_bad_words': bad_words_bar_data,
+        'top_political_words': political_words_bar_data,
+        'top_misinfo': misinfo_bar_data,
+        'subreddit_distribution': subreddit_pie_data,
+        'wordcloud': wordcloud_data,
+        'stats': {
+            'total_posts': len(df),
+            'exceptional_posts': len(exceptional_posts),
+            'bad_words_count': len(all_bad_words),
+            'political_words_count': len(all_political_words),
+            'misinfo_count': len(all_political_misinfo),
+            'unique_subreddits': df['subreddit'].nunique()
+        }
+    }
+    if time_series_data is not None:
+        charts['time_series'] = time_series_data
+
+    return ContentAggregates(bad_words_counter, political_words_counter, misinfo_counter, most_common_words,
+                             correlation_analysis, overall_analysis, charts)
+
+def build_report(features, aggregates):
+    """Stage 4: LLM summaries and the Markdown report"""
+    all_texts = features.all_texts
+    all_bad_words = features.all_bad_words
+    all_political_words = features.all_political_words
+    correlation_analysis = aggregates.correlation_analysis
+    most_common_words = aggregates.most_common_words
+    overall_analysis = aggregates.overall_analysis
+    top_bad_words = aggregates.bad_words_counter.most_common(20)
+    top_political_words = aggregates.political_words_counter.most_common(20)
+
+    # Generate different types of analysis using the Gemini API
+    general_summary = generate_content_summary(all_texts, "general")
+    bad_words_analysis = generate_content_summary(all_bad_words, "bad_words")
+    political_words_analysis = generate_content_summary(all_political_words, "political")
+
+    print("\n=== OVERALL CONTENT SUMMARY ===")
+    print(general_summary)
+    print("\n=== BAD WORDS ANALYSIS ===")
+    print(bad_words_analysis)
+    print("\n=== POLITICAL WORDS ANALYSIS ===")
+    print(political_words_analysis)
+
+    summaries = {
+        'general': general_summary,
+        'bad_words': bad_words_analysis,
+        'political': political_words_analysis
+    }
 
-# Comprehensive report with all analyses
-report = f"""
+    # Comprehensive report with all analyses
+    report = f"""
 # Social Media Content Analysis Report
 
 ## Overall Summary
@@ -353,46 +422,88 @@ as they may contribute to increased polarization. Implementing content moderatio
 posts with bad words could improve community health. Regular analysis of trending political 
 terminology can help identify potential misinformation early.
 """
-
-# Saving the report to a file
-with open(os.path.join(output_dir, 'social_media_analysis_report.md'), 'w') as f:
-    f.write(report)
-
-df.to_csv(os.path.join(output_dir, 'processed_posts_data.csv'), index=False)
-
-# Creating a master JSON file with all visualization data 
-visualization_data = {
-    'word_counts': word_count_data,
-    'top_bad_words': bad_words_bar_data,
-    'top_political_words': political_words_bar_data,
-    'top_misinfo': misinfo_bar_data,
-    'subreddit_distribution': subreddit_pie_data,
-    'wordcloud': wordcloud_data,
-    'summaries': {
-        'general': general_summary,
-        'bad_words': bad_words_analysis,
-        'political': political_words_analysis
-    },
-    'stats': {
-        'total_posts': len(df),
-        'exceptional_posts': len(exceptional_posts),
-        'bad_words_count': len(all_bad_words),
-        'political_words_count': len(all_political_words),
-        'misinfo_count': len(all_political_misinfo),
-        'unique_subreddits': df['subreddit'].nunique()
+    return report, summaries
+
+def write_outputs(result, output_dir=output_dir):
+    """Stage 5: the chart JSON files, the report, the posts CSV and the master visualization JSON"""
+    os.makedirs(output_dir, exist_ok=True)
+    charts = result.aggregates.charts
+    chart_files = {
+        'wordcloud': 'wordcloud_data.json',
+        'word_counts': 'word_counts_bar_data.json',
+        'top_bad_words': 'top_bad_words_data.json',
+        'top_political_words': 'top_political_words_data.json',
+        'top_misinfo': 'top_misinfo_data.json',
+        'subreddit_distribution': 'subreddit_distribution_data.json',
+        'time_series': 'posts_time_series_data.json'
     }
-}
-
-if os.path.exists(os.path.join(output_dir, 'posts_time_series_data.json')):
-    with open(os.path.join(output_dir, 'posts_time_series_data.json'), 'r') as f:
-        time_series_data = json.load(f)
-    visualization_data['time_series'] = time_series_data
-
-with open(os.path.join(output_dir, 'all_visualization_data.json'), 'w') as f:
-    json.dump(visualization_data, f)
-
-print("\n=== DATA PROCESSED ===")
-print(f"All analysis results saved to '{output_dir}' folder")
-print(f"Raw chart data saved in JSON format for UI rendering")
-print(f"Master visualization data saved to '{os.path.join(output_dir, 'all_visualization_data.json')}'")
-print(f"The complete analysis report has been saved to '{os.path.join(output_dir, 'social_media_analysis_report.md')}'")
\ No newline at end of file
+    outputs = []
+
+    def write_json(file_name, value):
+        path = os.path.join(output_dir, file_name)
+        with open(path, 'w') as f:
+            json.dump(value, f)
+        outputs.append(path)
+
+    for chart, file_name in chart_files.items():
+        if chart in charts:
+            write_json(file_name, charts[chart])
+
+    # Saving the report to a file
+    report_path = os.path.join(output_dir, 'social_media_analysis_report.md')
+    with open(report_path, 'w') as f:
+        f.write(result.report)
+    outputs.append(report_path)
+
+    csv_path = os.path.join(output_dir, 'processed_posts_data.csv')
+    result.features.df.to_csv(csv_path, index=False)
+    outputs.append(csv_path)
+
+    # Creating a master JSON file with all visualization data
+    visualization_data = {name: value for name, value in charts.items() if name not in ('stats', 'time_series')}
+    visualization_data['summaries'] = result.summaries
+    visualization_data['stats'] = charts['stats']
+    if 'time_series' in charts:
+        visualization_data['time_series'] = charts['time_series']
+    write_json('all_visualization_data.json', visualization_data)
+
+    print("\n=== DATA PROCESSED ===")
+    print(f"All analysis results saved to '{output_dir}' folder")
+    print(f"Raw chart data saved in JSON format for UI rendering")
+    print(f"Master visualization data saved to '{os.path.join(output_dir, 'all_visualization_data.json')}'")
+    print(f"The complete analysis report has been saved to '{report_path}'")
+    return outputs
+
+def run(config=None, data=None):
+    """
+    Run the whole content analysis and return a ContentAnalysisResult with
+    per-stage timings. Pass data to skip loading when the batches are already in memory.
+    """
+    config = config or ContentAnalysisConfig()
+    timings = {}
+
+    def timed(stage, func, *args):
+        with span(f"analysis2.{stage}", items=len(data) if data else None) as record:
+            value = func(*args)
+        timings[stage] = round(record.wall, 3)
+        return value
+
+    if data is None:
+        data = timed('load', load, config)
+    if not data:
+        raise RuntimeError("Failed to load data.")
+    features = timed('featurize', featurize, data)
+    aggregates = timed('aggregate', aggregate, features)
+    report, summaries = timed('report', build_report, features, aggregates)
+    result = ContentAnalysisResult(features, aggregates, summaries, report, timings=timings)
+    result.outputs = timed('write', write_outputs, result, config.output_dir)
+    return result
+
+
+if __name__ == "__main__":
+    start_session()
+    try:
+        run()
+    except RuntimeError as e:
+        print(e)
+        sys.exit(1)
@@ -0,0 +1,333 @@
+import argparse
+import glob
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime
+
+from synthetic_corpus import CorpusConfig
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+# Run in this order: the server is benchmarked on the artifacts the stages before it wrote
+STAGES = ["analysis1", "analysis2", "network", "server"]
+SERVER_ENDPOINTS = [
+    "/api/posts-per-day",
+    "/api/content-categories",
+    "/api/top-subreddits",
+    "/api/sentiment-distribution",
+    "/api/top-bad-words",
+    "/api/top-political-words",
+    "/api/markdown/overview",
+    "/api/crosspost-network",
+    "/api/crosspost-stats",
+    "/api/crosspost-top",
+    "/api/crosspost-cascades"
+]
+DEFAULT_RESULTS = os.path.join(".bench", "pipeline.json")
+WORKER_RESULT = ".bench_result.json"
+
+
+def copy_sources(target):
+    """Copy the pipeline modules into target, where the stages write their outputs and the server reads them"""
+    source = os.path.dirname(os.path.abspath(__file__))
+    for path in glob.glob(os.path.join(source, "*.py")):
+        shutil.copy(path, target)
+
+
+def run_worker(stage, tree, corpus, port, timeout, verbose):
+    """Run one stage in a fresh interpreter inside tree; returns its metrics or an error entry"""
+    env = {key: value for key, value in os.environ.items() if key != "GEMINI_API_KEY"}
+    env["FEATURE_STORE_PATH"] = os.path.join(tree, ".feature_cache", "post_features.json")
+    command = [sys.executable, "bench_pipeline.py", "--worker", stage, "--port", str(port),
+               "--worker-corpus", json.dumps(asdict(corpus))]
+    output = None if verbose else subprocess.DEVNULL
+    result_path = os.path.join(tree, WORKER_RESULT)
+    if os.path.exists(result_path):
+        os.remove(result_path)
+    try:
+        process = subprocess.run(command, cwd=tree, env=env, stdout=output, stderr=output, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"error": f"timed out after {timeout:.0f}s"}
+    if process.returncode != 0 or not os.path.exists(result_path):
+        return {"error": f"exit code {process.returncode}"}
+    with open(result_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Worker side: each function runs inside the copied tree and returns {metric: {"wall": seconds, ...}}
+
+def span_metrics(prefixes):
+    from profiling import get_profiler
+    return {name: entry for name, entry in get_profiler().to_dict()["spans"].items()
+            if name.startswith(prefixes)}
+
+
+def bench_generate(corpus):
+    from profiling import span
+    from synthetic_corpus import write_corpus
+
+    with span("generate", items=corpus.posts):
+        write_corpus(corpus, ".")
+    return span_metrics(("generate",))
+
+
+def bench_analysis1(corpus):
+    import analysis1
+
+    # No API key in the worker environment, so the report uses the offline fallback analysis
+    analysis1.run(analysis1.AnalysisConfig(input_file="input.json"))
+    return span_metrics(("analysis1.", "sentiment", "keywords", "categorization"))
+
+
+def bench_analysis2(corpus):
+    import analysis2
+    from profiling import span
+
+    data = analysis2.load(analysis2.ContentAnalysisConfig())
+    with span("analysis2.featurize", items=len(data)):
+        features = analysis2.featurize(data)
+    with span("analysis2.aggregate", items=len(features.df)):
+        aggregates = analysis2.aggregate(features)
+    # The report stage only calls Gemini; the rest of the outputs are written without it
+    result = analysis2.ContentAnalysisResult(features, aggregates, summaries={}, report="")
+    with span("analysis2.write"):
+        analysis2.write_outputs(result)
+    return span_metrics(("analysis2.",))
+
+
+def bench_network(corpus):
+    from network import discover_crossposts, write_crosspost_outputs
+    from pipeline import load_dump
+    from profiling import span
+
+    with span("network.load", items=corpus.posts):
+        posts = load_dump("input.json")
+    with span("network.discover", items=len(posts)):
+        crosspost_info, sorted_pairs, subreddit_subscribers = discover_crossposts(posts)
+    with span("network.export", items=len(crosspost_info)):
+        write_crosspost_outputs(posts, crosspost_info, sorted_pairs, subreddit_subscribers,
+                                json_output="reddit_crosspost_network.json",
+                                temporal_output="reddit_crosspost_temporal.json",
+                                cascade_output="reddit_crosspost_cascades.json")
+    return span_metrics(("network.",))
+
+
+def server_peak_rss_mb(pid):
+    """Peak RSS of another process from /proc (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def bench_server(corpus, port, repeats=20, ready_timeout=600):
+    import httpx
+    from loadtest import start_server
+
+    base_url = f"http://127.0.0.1:{port}"
+    metrics = {}
+    start = time.perf_counter()
+    server = start_server(port)
+    try:
+        # Warmup is over once the snapshot has a load time, whether or not every artifact loaded
+        warmed = None
+        while time.perf_counter() - start < ready_timeout:
+            readiness = httpx.get(f"{base_url}/readyz", timeout=60).json()
+            if readiness["loaded_at"] is not None:
+                warmed = time.perf_counter() - start
+                break
+            time.sleep(0.1)
+        metrics["server.ready"] = {"wall": warmed, "ready": warmed is not None and readiness["ready"]}
+
+        with httpx.Client(base_url=base_url, timeout=120) as client:
+            for endpoint in SERVER_ENDPOINTS:
+                latencies = []
+                for _ in range(repeats):
+                    request_start = time.perf_counter()
+                    response = client.get(endpoint)
+                    latencies.append(time.perf_counter() - request_start)
+                if response.status_code != 200:
+                    metrics[f"GET {endpoint}"] = {"wall": None, "status": response.status_code}
+                    continue
+                metrics[f"GET {endpoint}"] = {
+                    "wall": statistics.median(latencies),
+                    "first": latencies[0],
+                    "max": max(latencies),
+                    "bytes": len(response.content)
+                }
+        metrics["server.ready"]["peak_rss_mb"] = server_peak_rss_mb(server.pid)
+    finally:
+        server.terminate()
+        server.wait()
+    return metrics
+
+
+WORKERS = {
+    "generate": bench_generate,
+    "analysis1": bench_analysis1,
+    "analysis2": bench_analysis2,
+    "network": bench_network
+}
+
+
+def run_worker_stage(stage, corpus, port):
+    metrics = bench_server(corpus, port) if stage == "server" else WORKERS[stage](corpus)
+    tmp_file = WORKER_RESULT + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(metrics, f)
+    os.replace(tmp_file, WORKER_RESULT)
+
+
+# Driver side
+
+def benchmark_size(corpus, stages, port, timeout, verbose):
+    results = {}
+    with tempfile.TemporaryDirectory(prefix=f"bench_{corpus.posts}_") as tree:
+        copy_sources(tree)
+        print(f"\n{corpus.posts} posts: generating corpus...")
+        results["generate"] = run_worker("generate", tree, corpus, port, timeout, verbose)
+        if "error" in results["generate"]:
+            return results
+        for stage in stages:
+            print(f"{corpus.posts} posts: {stage}...")
+            results[stage] = run_worker(stage, tree, corpus, port, timeout, verbose)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_runs(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["runs"]
+
+
+def save_run(path, run):
+    runs = load_runs(path) + [run]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump({"runs": runs}, f, indent=2)
+    os.replace(tmp_file, path)
+
+
+def find_baseline(runs, revision=None):
+    """Latest stored run, or the latest one of revision"""
+    for run in reversed(runs):
+        if revision is None or run["revision"] == revision:
+            return run
+    return None
+
+
+def flatten(run):
+    """{(size, stage, metric): seconds} for every metric with a wall time"""
+    flat = {}
+    for size, stages in run["results"].items():
+        for stage, metrics in stages.items():
+            for metric, values in metrics.items():
+                if isinstance(values, dict) and values.get("wall") is not None:
+                    flat[(size, stage, metric)] = values["wall"]
+    return flat
+
+
+def format_seconds(value):
+    if value is None:
+        return "-"
+    return f"{value * 1000:.1f}ms" if value < 1 else f"{value:.2f}s"
+
+
+def print_results(run, baseline=None, threshold=10.0):
+    """Print every metric, with the change against baseline; returns the metrics slower than threshold percent"""
+    current = flatten(run)
+    previous = flatten(baseline) if baseline else {}
+    regressions = []
+    header = f"{'posts':>8}  {'stage':<10} {'metric':<34}{'time':>10}{'peak MB':>9}"
+    if baseline:
+        header += f"{'baseline':>10}{'change':>9}"
+    print("\n" + header)
+    for size, stages in run["results"].items():
+        for stage, metrics in stages.items():
+            if "error" in metrics:
+                print(f"{size:>8}  {stage:<10} {metrics['error']}")
+                continue
+            for metric in metrics:
+                key = (size, stage, metric)
+                peak = metrics[metric].get("peak_rss_mb")
+                status = metrics[metric].get("status")
+                timing = f"HTTP {status}" if status else format_seconds(current.get(key))
+                line = (f"{size:>8}  {stage:<10} {metric:<34}{timing:>10}"
+                        f"{'-' if peak is None else f'{peak:.0f}':>9}")
+                if key in previous and key in current:
+                    change = (current[key] - previous[key]) / previous[key] * 100 if previous[key] else 0.0
+                    flag = "  slower" if change > threshold else ""
+                    line += f"{format_seconds(previous[key]):>10}{change:>+8.1f}%{flag}"
+                    if flag:
+                        regressions.append(key)
+                print(line)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pipelines and the API server on synthetic Reddit dumps")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="Post counts to benchmark")
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES, help="Stages to time")
+    parser.add_argument("--crosspost-ratio", type=float, default=0.1, help="Share of posts that are crossposts")
+    parser.add_argument("--subreddits", type=int, default=200, help="Number of subreddits")
+    parser.add_argument("--title-words", type=int, default=10, help="Mean title length in words")
+    parser.add_argument("--selftext-words", type=int, default=60, help="Mean selftext length in words")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed")
+    parser.add_argument("--timeout", type=float, default=3600, help="Seconds before a stage counts as failed")
+    parser.add_argument("--port", type=int, default=8766, help="Port for the benchmarked server")
+    parser.add_argument("--results", default=DEFAULT_RESULTS, help="JSON file the runs are appended to")
+    parser.add_argument("--baseline", metavar="REVISION",
+                        help="Compare against the latest stored run of this revision (default: the latest run)")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Percent slowdown reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on any regression")
+    parser.add_argument("--no-save", action="store_true", help="Do not store this run")
+    parser.add_argument("--verbose", action="store_true", help="Show the stages' own output")
+    parser.add_argument("--worker", choices=list(WORKERS) + ["server"], help=argparse.SUPPRESS)
+    parser.add_argument("--worker-corpus", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker_stage(args.worker, CorpusConfig(**json.loads(args.worker_corpus)), args.port)
+        sys.exit(0)
+
+    run = {
+        "revision": git_revision(),
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "config": {"crosspost_ratio": args.crosspost_ratio, "subreddits": args.subreddits,
+                   "title_words": args.title_words, "selftext_words": args.selftext_words, "seed": args.seed},
+        "results": {}
+    }
+    for size in args.sizes:
+        corpus = CorpusConfig(posts=size, crosspost_ratio=args.crosspost_ratio, subreddits=args.subreddits,
+                              title_words=args.title_words, selftext_words=args.selftext_words, seed=args.seed)
+        run["results"][str(size)] = benchmark_size(corpus, args.stages, args.port, args.timeout, args.verbose)
+
+    baseline = find_baseline(load_runs(args.results), args.baseline)
+    regressions = print_results(run, baseline, args.threshold)
+    if baseline:
+        print(f"\nCompared with {baseline['revision']} from {baseline['timestamp']}: {len(regressions)} regressions")
+    if not args.no_save:
+        save_run(args.results, run)
+        print(f"Results appended to {args.results}")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
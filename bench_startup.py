@@ -0,0 +1,88 @@
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+
+def import_header(path):
+    """Source of a script's top-level statements up to its last import, so startup can be timed without running it"""
+    with open(path, "r", encoding="utf-8") as f:
+        source = f.read()
+    body = ast.parse(source).body
+    last_import = max((i for i, node in enumerate(body) if isinstance(node, (ast.Import, ast.ImportFrom))), default=-1)
+    return "\n".join(ast.get_source_segment(source, node) for node in body[:last_import + 1])
+
+
+def startup_commands(tree):
+    return {
+        "analysis1 imports": [sys.executable, "-c", import_header(os.path.join(tree, "analysis1.py"))],
+        "network.py --help": [sys.executable, "network.py", "--help"],
+        "cascades.py --help": [sys.executable, "cascades.py", "--help"],
+        "import image_server": [sys.executable, "-c", "import image_server"]
+    }
+
+
+def time_command(command, cwd, runs, timeout):
+    """Median wall time of a fresh interpreter running command, or None when it fails"""
+    timings = []
+    # One untimed run first so the comparison is not skewed by a cold disk cache
+    for run in range(runs + 1):
+        start = time.perf_counter()
+        try:
+            result = subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                    timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return None
+        if result.returncode != 0:
+            return None
+        if run:
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def checkout(revision, target):
+    """Extract a git revision of the repository into target"""
+    archive = os.path.join(target, "tree.tar")
+    subprocess.run(["git", "archive", "--format=tar", "-o", archive, revision], check=True)
+    with tarfile.open(archive) as tar:
+        tar.extractall(target)
+    os.remove(archive)
+
+
+def benchmark(trees, runs, timeout):
+    results = {}
+    for label, tree in trees.items():
+        for name, command in startup_commands(tree).items():
+            results.setdefault(name, {})[label] = time_command(command, tree, runs, timeout)
+    return results
+
+
+def format_seconds(value):
+    return "failed" if value is None else f"{value:.3f}s"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure interpreter startup and import time of the pipeline scripts")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per command; the median is reported")
+    parser.add_argument("--compare", metavar="REVISION", help="Also time this git revision, e.g. HEAD~1")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds before a run counts as failed")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        trees = {}
+        if args.compare:
+            checkout(args.compare, tmp_dir)
+            trees[args.compare] = tmp_dir
+        trees["working tree"] = os.getcwd()
+
+        results = benchmark(trees, args.runs, args.timeout)
+
+    labels = list(trees)
+    print(f"{'command':<24}" + "".join(f"{label:>16}" for label in labels))
+    for name, timings in results.items():
+        print(f"{name:<24}" + "".join(f"{format_seconds(timings[label]):>16}" for label in labels))
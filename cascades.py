@@ -0,0 +1,165 @@
+import argparse
+import json
+import os
+import time
+from collections import Counter, defaultdict
+
+
+def _post_fields(post_data):
+    parent = post_data.get("crosspost_parent")
+    return {
+        # crosspost_parent is a fullname ("t3_<id>")
+        "parent": parent.split("_", 1)[1] if parent else None,
+        "subreddit": post_data.get("subreddit"),
+        "created": post_data.get("created_utc"),
+        "title": post_data.get("title", ""),
+        "author": post_data.get("author", "[deleted]")
+    }
+
+
+def collect_posts(posts):
+    """
+    Map post id -> parent pointer and the fields cascades need, in one pass.
+    Parents that are not in the dump are filled in from crosspost_parent_list
+    (or left as bare placeholders) so every chain ends at a known root.
+    """
+    nodes = {}
+    embedded = {}
+    for post in posts:
+        post_data = post["data"]
+        if "id" not in post_data:
+            continue
+        fields = _post_fields(post_data)
+        nodes[post_data["id"]] = fields
+        if fields["parent"] and post_data.get("crosspost_parent_list"):
+            embedded.setdefault(fields["parent"], post_data["crosspost_parent_list"][0])
+
+    for post_id, fields in list(nodes.items()):
+        parent = fields["parent"]
+        if parent and parent not in nodes:
+            nodes[parent] = _post_fields(embedded[parent]) if parent in embedded else {
+                "parent": None, "subreddit": None, "created": None, "title": "", "author": None}
+            # The embedded copy may itself point further up; only follow pointers within the dump
+            if nodes[parent]["parent"] not in nodes:
+                nodes[parent]["parent"] = None
+    return nodes
+
+
+def resolve_roots(nodes):
+    """
+    Parent-pointer walk with path compression: every post gets its cascade root
+    and depth, and each post is walked at most once overall.
+    """
+    root_of = {}
+    depth = {}
+    for start in nodes:
+        path = []
+        on_path = set()
+        current = start
+        while current not in root_of:
+            parent = nodes[current]["parent"]
+            if parent is None or parent in on_path or parent == current:
+                # A root (or a malformed cycle, which is cut here)
+                root_of[current] = current
+                depth[current] = 0
+                break
+            path.append(current)
+            on_path.add(current)
+            current = parent
+        for post_id in reversed(path):
+            parent = nodes[post_id]["parent"]
+            root_of[post_id] = root_of[parent]
+            depth[post_id] = depth[parent] + 1
+    return root_of, depth
+
+
+def build_cascades(posts, min_size=1):
+    """
+    Reconstruct full crosspost trees (root post -> all descendants) and
+    measure each one: size, depth, breadth (widest level), subreddits reached,
+    and time from the root to the first and the last crosspost.
+    """
+    nodes = collect_posts(posts)
+    root_of, depth = resolve_roots(nodes)
+
+    members = defaultdict(list)
+    for post_id, root in root_of.items():
+        if post_id != root:
+            members[root].append(post_id)
+
+    cascades = []
+    for root, descendants in members.items():
+        if len(descendants) < min_size:
+            continue
+        root_fields = nodes[root]
+        levels = Counter(depth[post_id] for post_id in descendants)
+        times = sorted(nodes[post_id]["created"] for post_id in descendants if nodes[post_id]["created"] is not None)
+        root_time = root_fields["created"]
+        subreddits = {nodes[post_id]["subreddit"] for post_id in descendants} | {root_fields["subreddit"]}
+        subreddits.discard(None)
+
+        first_crosspost = last_crosspost = spread_rate = None
+        if root_time is not None and times:
+            first_crosspost = times[0] - root_time
+            last_crosspost = times[-1] - root_time
+            # Crossposts per hour over the time it took to spread
+            spread_rate = round(len(descendants) / max(last_crosspost / 3600, 1 / 60), 3)
+
+        cascades.append({
+            "root": root,
+            "subreddit": root_fields["subreddit"],
+            "title": root_fields["title"],
+            "author": root_fields["author"],
+            "created": root_time,
+            "size": len(descendants),
+            "depth": max(levels),
+            "breadth": max(levels.values()),
+            "subreddits": len(subreddits),
+            "time_to_first_crosspost": first_crosspost,
+            "time_to_spread": last_crosspost,
+            "spread_rate": spread_rate,
+            "edges": [[nodes[post_id]["parent"], post_id] for post_id in sorted(descendants, key=depth.get)]
+        })
+
+    cascades.sort(key=lambda cascade: (cascade["size"], cascade["spread_rate"] or 0), reverse=True)
+    return cascades
+
+
+def cascade_summary(cascades, top_n=10):
+    speed_ranked = sorted((c for c in cascades if c["spread_rate"] is not None),
+                          key=lambda c: c["spread_rate"], reverse=True)
+    brief = lambda c: {key: c[key] for key in ("root", "subreddit", "title", "size", "depth", "breadth",
+                                                 "subreddits", "time_to_spread", "spread_rate")}
+    return {
+        "total_cascades": len(cascades),
+        "total_crossposts": sum(c["size"] for c in cascades),
+        "max_depth": max((c["depth"] for c in cascades), default=0),
+        "multi_hop_cascades": sum(1 for c in cascades if c["depth"] > 1),
+        "largest": [brief(c) for c in cascades[:top_n]],
+        "fastest": [brief(c) for c in speed_ranked[:top_n]]
+    }
+
+
+def write_cascades(posts, output_file, top_n=10):
+    start_time = time.time()
+    cascades = build_cascades(posts)
+    document = {"summary": cascade_summary(cascades, top_n=top_n), "cascades": cascades}
+    tmp_file = output_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(document, f)
+    os.replace(tmp_file, output_file)
+    summary = document["summary"]
+    print(f"Found {summary['total_cascades']} crosspost cascades ({summary['multi_hop_cascades']} multi-hop, "
+          f"max depth {summary['max_depth']}) in {time.time() - start_time:.2f} seconds")
+    print(f"Cascades saved to {output_file}")
+    return document
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconstruct crosspost cascades from a Reddit dump")
+    parser.add_argument("--input", default="input.json", help="Input JSON file")
+    parser.add_argument("--output", default="reddit_crosspost_cascades.json", help="Output JSON file")
+    args = parser.parse_args()
+
+    with open(args.input, "r") as f:
+        write_cascades(json.load(f), args.output)
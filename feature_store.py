@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks on Windows; concurrent analysis1 runs there must share one worker
+    fcntl = None
+
+# Bump when sentiment, keyword or category extraction changes so stored features are recomputed
+FEATURE_VERSION = 2
+
+
+def content_hash(title, selftext, variant=""):
+    """
+    Hash of the text features are derived from and of how they were derived;
+    an edited post, or one analyzed with another variant, gets a new hash
+    """
+    text = f"{variant}\0{title or ''}\0{selftext or ''}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class PostFeatureStore:
+    """
+    Per-post text features (sentiment, subjectivity, keywords, categories)
+    persisted between runs, keyed by post id and checked against the content
+    hash, so a rerun only analyzes new or edited posts. variant names the
+    extraction mode (e.g. the keyword tokenizer); features stored under
+    another variant are recomputed.
+
+    The store holds an exclusive lock on "<path>.lock" from opening until
+    close(), so concurrent pipeline jobs (PIPELINE_WORKERS > 1) take turns
+    instead of overwriting or pruning each other's posts.
+    """
+
+    def __init__(self, path, variant=""):
+        self.path = path
+        self.variant = variant
+        self.posts = {}
+        self.hits = 0
+        self.misses = 0
+        self._seen = set()
+        self._dirty = False
+        self._lock_file = None
+        self._lock()
+        self._load()
+
+    def _lock(self):
+        if not self.path or fcntl is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock_file = open(self.path + ".lock", "w")
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+
+    def close(self):
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable feature store {self.path}: {e}")
+            return
+        if stored.get("version") != FEATURE_VERSION:
+            print(f"Feature store {self.path} is from another feature version; recomputing all posts")
+            return
+        self.posts = stored.get("posts", {})
+
+    def get(self, post_id, digest):
+        entry = self.posts.get(post_id) if post_id else None
+        if entry is not None and entry["hash"] == digest:
+            self.hits += 1
+            return entry["features"]
+        self.misses += 1
+        return None
+
+    def put(self, post_id, digest, features):
+        if not post_id:
+            return
+        self.posts[post_id] = {"hash": digest, "features": features}
+        self._dirty = True
+
+    def features(self, post_id, title, selftext, compute):
+        """Stored features for the post, or compute(title, selftext) and store them"""
+        digest = content_hash(title, selftext, self.variant)
+        if post_id:
+            self._seen.add(post_id)
+        features = self.get(post_id, digest)
+        if features is None:
+            features = compute(title, selftext)
+            self.put(post_id, digest, features)
+        return features
+
+    def prune_unseen(self):
+        """Drop posts not requested since the store was opened (gone from the dump); returns how many"""
+        stale = [post_id for post_id in self.posts if post_id not in self._seen]
+        for post_id in stale:
+            del self.posts[post_id]
+        if stale:
+            self._dirty = True
+        return len(stale)
+
+    def save(self):
+        if not self.path or not self._dirty:
+            return
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_file = tempfile.mkstemp(dir=directory, prefix=os.path.basename(self.path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": FEATURE_VERSION, "posts": self.posts}, f, separators=(",", ":"))
+            os.replace(tmp_file, self.path)
+        except BaseException:
+            os.remove(tmp_file)
+            raise
+        self._dirty = False
+        print(f"Feature store saved to {self.path} ({len(self.posts)} posts)")
@@ -0,0 +1,198 @@
+import json
+import os
+import re
+from xml.sax.saxutils import escape, quoteattr
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Attribute keys in the order network.py has always written them, so existing
+# GraphML consumers (Gephi, the dashboard) see the same schema
+NODE_ATTRIBUTES = [
+    ("type", "string"),
+    ("label", "string"),
+    ("source_count", "long"),
+    ("dest_count", "long"),
+    ("subscribers", "long"),
+    ("size", "long"),
+    ("title", "string"),
+    ("author", "string"),
+    # Subreddit analytics from graph_analytics.subreddit_metrics
+    ("pagerank", "double"),
+    ("betweenness", "double"),
+    ("community", "long"),
+    ("in_strength", "double"),
+    ("out_strength", "double")
+]
+EDGE_ATTRIBUTES = [("type", "string")]
+EDGE_TYPES = ["from_subreddit", "to_subreddit"]
+
+# Characters XML 1.0 cannot carry at all, even escaped
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _xml_text(value):
+    return escape(_INVALID_XML_CHARS.sub("", str(value)))
+
+
+class GraphMLStreamWriter:
+    """
+    Writes GraphML node by node instead of building a graph first.
+    Output matches nx.write_graphml for the crosspost network schema.
+    """
+
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self._tmp_file = output_file + ".tmp"
+        self._f = None
+        self._node_keys = {name: f"d{i}" for i, (name, _) in enumerate(NODE_ATTRIBUTES)}
+        self._edge_keys = {name: f"d{len(NODE_ATTRIBUTES) + i}" for i, (name, _) in enumerate(EDGE_ATTRIBUTES)}
+
+    def __enter__(self):
+        self._f = open(self._tmp_file, "w", encoding="utf-8")
+        self._f.write("<?xml version='1.0' encoding='utf-8'?>\n")
+        self._f.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns" '
+                      'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+                      'xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns '
+                      'http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">\n')
+        for name, attr_type in EDGE_ATTRIBUTES:
+            self._f.write(f'  <key id="{self._edge_keys[name]}" for="edge" attr.name="{name}" attr.type="{attr_type}" />\n')
+        for name, attr_type in reversed(NODE_ATTRIBUTES):
+            self._f.write(f'  <key id="{self._node_keys[name]}" for="node" attr.name="{name}" attr.type="{attr_type}" />\n')
+        self._f.write('  <graph edgedefault="directed">\n')
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._f.write("  </graph>\n</graphml>\n")
+        self._f.close()
+        if exc_type is None:
+            os.replace(self._tmp_file, self.output_file)
+        else:
+            os.remove(self._tmp_file)
+        return False
+
+    def add_node(self, node_id, **attrs):
+        lines = [f"    <node id={quoteattr(_INVALID_XML_CHARS.sub('', node_id))}>\n"]
+        for name, _ in NODE_ATTRIBUTES:
+            if attrs.get(name) is not None:
+                lines.append(f'      <data key="{self._node_keys[name]}">{_xml_text(attrs[name])}</data>\n')
+        lines.append("    </node>\n")
+        self._f.write("".join(lines))
+
+    def add_edge(self, source, target, **attrs):
+        lines = [f"    <edge source={quoteattr(_INVALID_XML_CHARS.sub('', source))} "
+                 f"target={quoteattr(_INVALID_XML_CHARS.sub('', target))}>\n"]
+        for name, _ in EDGE_ATTRIBUTES:
+            if attrs.get(name) is not None:
+                lines.append(f'      <data key="{self._edge_keys[name]}">{_xml_text(attrs[name])}</data>\n')
+        lines.append("    </edge>\n")
+        self._f.write("".join(lines))
+
+
+class CompactGraphBuilder:
+    """
+    Collects the network as columnar node arrays plus CSR adjacency
+    (indptr/indices), which is far smaller than GraphML or node-link JSON.
+    Edges must be added right after their source node, which is how the
+    export streams crossposts.
+    """
+
+    def __init__(self):
+        self.index = {}
+        self.columns = {name: [] for name, _ in NODE_ATTRIBUTES}
+        self.ids = []
+        self.indptr = [0]
+        self.indices = []
+        self.edge_types = []
+        self._pending = []
+
+    def add_node(self, node_id, **attrs):
+        self._flush()
+        self.index[node_id] = len(self.ids)
+        self.ids.append(node_id)
+        for name, _ in NODE_ATTRIBUTES:
+            self.columns[name].append(attrs.get(name))
+
+    def add_edge(self, source, target, type=None):
+        if source != self.ids[-1]:
+            raise ValueError(f"Edges must follow their source node ({source} added after {self.ids[-1]})")
+        self._pending.append((target, EDGE_TYPES.index(type)))
+
+    def _flush(self):
+        if self.ids:
+            for target, edge_type in self._pending:
+                self.indices.append(target)
+                self.edge_types.append(edge_type)
+            self.indptr.append(len(self.indices))
+        self._pending = []
+
+    def build(self):
+        self._flush()
+        self._pending = None
+        for target in self.indices:
+            if target not in self.index:
+                # Referenced but never exported (nx.add_edge would create it bare too)
+                self.index[target] = len(self.ids)
+                self.ids.append(target)
+                for column in self.columns.values():
+                    column.append(None)
+                self.indptr.append(len(self.indices))
+        return {
+            "format": "csr-v1",
+            "nodes": {"id": self.ids, **self.columns},
+            # Targets are resolved to indices once every node is known
+            "edges": {
+                "indptr": self.indptr,
+                "indices": [self.index[target] for target in self.indices],
+                "type": self.edge_types
+            },
+            "edge_types": EDGE_TYPES
+        }
+
+
+def write_compact(compact, output_file, write_msgpack=False):
+    """
+    Write the compact network as JSON, and as MessagePack when requested and installed.
+    Otherwise a MessagePack file left by an earlier run is removed.
+    """
+    tmp_file = output_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(compact, f, separators=(",", ":"))
+    os.replace(tmp_file, output_file)
+
+    written = [output_file]
+    msgpack_file = os.path.splitext(output_file)[0] + ".msgpack"
+    if write_msgpack and msgpack is not None:
+        with open(msgpack_file + ".tmp", "wb") as f:
+            f.write(msgpack.packb(compact, use_bin_type=True))
+        os.replace(msgpack_file + ".tmp", msgpack_file)
+        written.append(msgpack_file)
+    else:
+        if write_msgpack:
+            print("msgpack is not installed, skipping MessagePack output")
+        # A MessagePack file from an earlier run would no longer match the JSON
+        if os.path.exists(msgpack_file):
+            os.remove(msgpack_file)
+    return written
+
+
+def graph_from_compact(compact):
+    """Rebuild a NetworkX DiGraph from the compact format, for rendering and layout"""
+    import networkx as nx
+    G = nx.DiGraph()
+    nodes = compact["nodes"]
+    ids = nodes["id"]
+    attribute_names = [name for name in nodes if name != "id"]
+    for i, node_id in enumerate(ids):
+        G.add_node(node_id, **{name: nodes[name][i] for name in attribute_names if nodes[name][i] is not None})
+
+    edges = compact["edges"]
+    indptr, indices, types = edges["indptr"], edges["indices"], edges["type"]
+    edge_types = compact["edge_types"]
+    for i, node_id in enumerate(ids):
+        for j in range(indptr[i], indptr[i + 1]):
+            G.add_edge(node_id, ids[indices[j]], type=edge_types[types[j]])
+    return G
@@ -0,0 +1,187 @@
+import os
+
+from dotenv import load_dotenv
+
+try:
+    import neo4j
+except ImportError:
+    neo4j = None
+
+GRAPH_BACKENDS = ["py2neo", "neo4j", "fake"]
+DEFAULT_POOL_SIZE = 10
+DEFAULT_FETCH_SIZE = 1000
+DEFAULT_BATCH_SIZE = 1000
+
+
+class GraphStore:
+    """
+    The few operations network.py needs from Neo4j. Every backend returns
+    records as plain dicts, so callers do not depend on a client library.
+    """
+
+    def read(self, query, **params):
+        """Run a read query and return all records"""
+        raise NotImplementedError
+
+    def stream(self, query, **params):
+        """Run a read query and yield records as they arrive"""
+        yield from self.read(query, **params)
+
+    def write(self, query, **params):
+        """Run a write query in its own transaction and return all records"""
+        raise NotImplementedError
+
+    def write_batches(self, query, rows, batch_size=DEFAULT_BATCH_SIZE):
+        """Run an UNWIND $rows write query over rows, one transaction per batch"""
+        for start in range(0, len(rows), batch_size):
+            self.write(query, rows=rows[start:start + batch_size])
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class Py2neoGraphStore(GraphStore):
+    """py2neo backend, the client network.py has always used"""
+
+    def __init__(self, uri, user, password, pool_size=DEFAULT_POOL_SIZE):
+        from py2neo import Graph
+        self.graph = Graph(uri, auth=(user, password), max_size=pool_size)
+
+    def read(self, query, **params):
+        return self.graph.run(query, params).data()
+
+    def stream(self, query, **params):
+        for record in self.graph.run(query, params):
+            yield dict(record)
+
+    def write(self, query, **params):
+        return self.graph.run(query, params).data()
+
+    def write_batches(self, query, rows, batch_size=DEFAULT_BATCH_SIZE):
+        for start in range(0, len(rows), batch_size):
+            tx = self.graph.begin()
+            tx.run(query, {"rows": rows[start:start + batch_size]})
+            self.graph.commit(tx)
+
+
+class Neo4jDriverGraphStore(GraphStore):
+    """
+    Backend on the official neo4j driver: a managed connection pool, explicit
+    read and write transactions (retried on transient errors), and cluster
+    routing for neo4j:// and neo4j+s:// URIs such as Aura.
+    """
+
+    def __init__(self, uri, user, password, pool_size=DEFAULT_POOL_SIZE, fetch_size=DEFAULT_FETCH_SIZE,
+                 database=None):
+        if neo4j is None:
+            raise ImportError("The neo4j backend needs the official driver: pip install neo4j")
+        self.driver = neo4j.GraphDatabase.driver(uri, auth=(user, password), max_connection_pool_size=pool_size)
+        self.fetch_size = fetch_size
+        self.database = database
+
+    def _session(self, access_mode):
+        return self.driver.session(database=self.database, fetch_size=self.fetch_size,
+                                   default_access_mode=access_mode)
+
+    def read(self, query, **params):
+        with self._session(neo4j.READ_ACCESS) as session:
+            return session.execute_read(lambda tx: tx.run(query, params).data())
+
+    def stream(self, query, **params):
+        # Auto-commit query so records can be yielded while the session is open;
+        # the driver pulls them from the server fetch_size at a time
+        with self._session(neo4j.READ_ACCESS) as session:
+            for record in session.run(query, params):
+                yield record.data()
+
+    def write(self, query, **params):
+        with self._session(neo4j.WRITE_ACCESS) as session:
+            return session.execute_write(lambda tx: tx.run(query, params).data())
+
+    def write_batches(self, query, rows, batch_size=DEFAULT_BATCH_SIZE):
+        with self._session(neo4j.WRITE_ACCESS) as session:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                session.execute_write(lambda tx: tx.run(query, {"rows": batch}).consume())
+
+    def close(self):
+        self.driver.close()
+
+
+# Records the fake backend returns for the queries network.py reads a first record from,
+# keyed by a fragment of the query: the import's counts, the graph version and the analysis
+FAKE_RESPONSES = {
+    "RETURN COUNT(r) AS count": [{"count": 0}],
+    "RETURN COUNT(c) AS count": [{"count": 0}],
+    "RETURN version, node_count, relationship_count": [{"version": None, "node_count": 0, "relationship_count": 0}],
+    "RETURN top_posts, pair_counts": [{"top_posts": [], "pair_counts": [], "examples": [],
+                                       "subreddit_count": 0, "crosspost_count": 0}]
+}
+
+
+class FakeGraphStore(GraphStore):
+    """
+    In-memory stand-in for tests. responses maps a substring of the query to
+    the records to return (or a callable taking the parameters), on top of
+    FAKE_RESPONSES; other queries return no records. Reads are recorded in
+    self.reads, writes in self.writes and batched writes as (query, rows) in
+    self.batches.
+    """
+
+    def __init__(self, responses=None):
+        self.responses = {**FAKE_RESPONSES, **(responses or {})}
+        self.reads = []
+        self.writes = []
+        self.batches = []
+
+    def _respond(self, query, params):
+        for fragment, response in self.responses.items():
+            if fragment in query:
+                return list(response(params) if callable(response) else response)
+        return []
+
+    def read(self, query, **params):
+        self.reads.append((query, params))
+        return self._respond(query, params)
+
+    def write(self, query, **params):
+        self.writes.append((query, params))
+        return self._respond(query, params)
+
+    def write_batches(self, query, rows, batch_size=DEFAULT_BATCH_SIZE):
+        self.batches.append((query, list(rows)))
+
+
+def connect_graph_store(backend=None, uri=None, user=None, password=None, pool_size=None, fetch_size=None):
+    """
+    Open a graph store. Unset arguments fall back to GRAPH_BACKEND (default py2neo),
+    NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, NEO4J_POOL_SIZE and NEO4J_FETCH_SIZE.
+    """
+    load_dotenv()
+
+    backend = backend or os.getenv("GRAPH_BACKEND", "py2neo")
+    if backend not in GRAPH_BACKENDS:
+        raise ValueError(f"Unknown graph backend '{backend}'. Choose from: {', '.join(GRAPH_BACKENDS)}")
+    if backend == "fake":
+        return FakeGraphStore()
+
+    uri = uri or os.getenv("NEO4J_URI", "bolt://localhost:7687")
+    user = user or os.getenv("NEO4J_USER", "neo4j")
+    password = password or os.getenv("NEO4J_PASSWORD")
+    pool_size = pool_size or int(os.getenv("NEO4J_POOL_SIZE", DEFAULT_POOL_SIZE))
+    fetch_size = fetch_size or int(os.getenv("NEO4J_FETCH_SIZE", DEFAULT_FETCH_SIZE))
+
+    if not password:
+        raise ValueError("Neo4j password not provided. Set NEO4J_PASSWORD environment variable or pass as parameter.")
+
+    print(f"Connecting to Neo4j at {uri} ({backend} backend, pool size {pool_size})...")
+    if backend == "neo4j":
+        return Neo4jDriverGraphStore(uri, user, password, pool_size=pool_size, fetch_size=fetch_size)
+    return Py2neoGraphStore(uri, user, password, pool_size=pool_size)
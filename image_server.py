@@ -1,17 +1,38 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel
+from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import asyncio
 import json
 import os
+import re
+import time
 from pathlib import Path
 import logging
+import threading
+
+from jobs import JobRunner
+import metrics
+from temporal_network import TemporalCrosspostIndex, parse_time
 
 # Add this logging configuration near the top of your file
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app):
+    # Warm artifacts in the background so /healthz answers while the snapshot loads
+    warmup_task = asyncio.create_task(warm_artifacts())
+    yield
+    warmup_task.cancel()
+    job_runner.shutdown()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,50 +41,260 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost, so latency and sizes cover the whole stack; exposed at /metrics
+app.add_middleware(metrics.MetricsMiddleware)
 
 JSON_DATA_PATH_INPUT = Path(__file__).parent / "input" / "all_visualization_data.json"
 JSON_DATA_PATH_OUTPUT = Path(__file__).parent / "analysis_output" / "all_visualization_data.json"
 IMAGE_DIR = Path(__file__).parent / "input"
 ANALYSIS_OUTPUT_DIR = Path(__file__).parent / "analysis_output"
+CROSSPOST_JSON_PATH = Path(__file__).parent / "reddit_crosspost_network.json"
+CROSSPOST_GRAPHML_PATH = Path(__file__).parent / "reddit_crosspost_network.graphml"
+CROSSPOST_LOD_PATH = Path(__file__).parent / "reddit_crosspost_lod.json"
+CROSSPOST_COMPACT_PATH = Path(__file__).parent / "reddit_crosspost_network.csr.json"
+CROSSPOST_MSGPACK_PATH = Path(__file__).parent / "reddit_crosspost_network.csr.msgpack"
+CROSSPOST_TEMPORAL_PATH = Path(__file__).parent / "reddit_crosspost_temporal.json"
+CROSSPOST_CASCADES_PATH = Path(__file__).parent / "reddit_crosspost_cascades.json"
+
+# Populated by reload_artifacts() during startup and on every reload
+visualization_data = None
+
+# Parsed artifacts keyed by (path, kind); each entry remembers the file's mtime/size
+# so unchanged files are served from memory instead of being re-read and re-parsed
+_artifact_cache = {}
+# Guards writes to _artifact_cache: the event loop stores single entries while reload_artifacts
+# merges a whole snapshot from a worker thread. Held only for the dict update itself.
+_artifact_cache_lock = threading.Lock()
+ARTIFACT_CHECK_INTERVAL = float(os.getenv("ARTIFACT_CHECK_INTERVAL", "1.0"))
+
+def _read_text(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def _read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
 
-def load_data():
-    """Load data from JSON file, checking both input and analysis_output directories"""
-    if os.path.exists(JSON_DATA_PATH_OUTPUT):
-        with open(JSON_DATA_PATH_OUTPUT, 'r') as f:
-            data = json.load(f)
-            print(f"Successfully loaded data from {JSON_DATA_PATH_OUTPUT}")
-            return data
+MARKDOWN_HEADING_RE = re.compile(r"^## (.+?)[ \t]*$", re.MULTILINE)
+
+def _read_markdown_index(path):
+    """
+    Parse a report once into its level-2 sections.
+    Each section keeps the full block (heading included, up to the next "## "
+    heading) and the stripped body text up to the next "##" of any level.
+    """
+    content = _read_text(path)
+    sections = {}
+    matches = list(MARKDOWN_HEADING_RE.finditer(content))
+    for i, match in enumerate(matches):
+        heading = match.group(1)
+        if heading in sections:
+            continue
+        end = matches[i + 1].start() - 1 if i + 1 < len(matches) else len(content)
+        block = content[match.start():end]
+        body_end = content.find("##", match.end())
+        body = content[match.end():body_end if body_end >= 0 else len(content)].strip()
+        sections[heading] = {"block": block, "body": body}
+    return {"content": content, "sections": sections}
+
+def find_markdown_section(report, heading):
+    """
+    The section titled heading, else the first one whose title starts with it
+    (e.g. "## Key Findings and Recommendations" for "Key Findings"); None if neither
+    """
+    sections = report["sections"]
+    if heading in sections:
+        return sections[heading]
+    return next((section for title, section in sections.items() if title.startswith(heading)), None)
+
+def _artifact_label(path):
+    """Artifact name for metrics: the path relative to the server directory"""
+    try:
+        return str(Path(path).relative_to(Path(__file__).parent))
+    except ValueError:
+        return str(path)
+
+def _load_if_changed(path, reader, entry):
+    """Stat the file and only re-read it when it changed since the cached entry"""
+    checked_at = time.monotonic()
+    label = _artifact_label(path)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        metrics.artifact_cache.inc(label, "missing")
+        return {"checked_at": checked_at, "signature": None, "value": None}
     
-    if os.path.exists(JSON_DATA_PATH_INPUT):
-        with open(JSON_DATA_PATH_INPUT, 'r') as f:
-            data = json.load(f)
-            print(f"Successfully loaded data from {JSON_DATA_PATH_INPUT}")
-            return data
+    signature = (stat.st_mtime_ns, stat.st_size)
+    if entry is not None and entry["signature"] == signature:
+        metrics.artifact_cache.inc(label, "unchanged")
+        return {"checked_at": checked_at, "signature": signature, "value": entry["value"]}
+    start = time.perf_counter()
+    value = reader(path)
+    metrics.artifact_load.observe(time.perf_counter() - start, label)
+    metrics.artifact_cache.inc(label, "load")
+    return {"checked_at": checked_at, "signature": signature, "value": value}
+
+async def _read_artifact(path, reader):
+    key = (str(path), reader.__name__)
+    entry = _artifact_cache.get(key)
+    if entry is not None and time.monotonic() - entry["checked_at"] < ARTIFACT_CHECK_INTERVAL:
+        metrics.artifact_cache.inc(_artifact_label(path), "hit")
+        return entry["value"]
     
-    raise FileNotFoundError(f"JSON file not found at either {JSON_DATA_PATH_OUTPUT} or {JSON_DATA_PATH_INPUT}")
+    entry = await run_in_threadpool(_load_if_changed, path, reader, entry)
+    with _artifact_cache_lock:
+        _artifact_cache[key] = entry
+    return entry["value"]
 
-try:
-    visualization_data = load_data()
-    print("Data loaded successfully")
-except Exception as e:
-    print(f"ERROR: {e}")
-    print(f"Make sure the JSON file exists in either input or analysis_output folders")
+async def read_text_artifact(path):
+    """Read a text artifact off the event loop; returns None if the file is missing"""
+    return await _read_artifact(path, _read_text)
+
+async def read_json_artifact(path):
+    """Read and parse a JSON artifact off the event loop; returns None if the file is missing"""
+    return await _read_artifact(path, _read_json)
+
+async def read_markdown_index(path):
+    """Return the parsed section index of a markdown report; None if the file is missing"""
+    return await _read_artifact(path, _read_markdown_index)
+
+def _read_temporal_index(path):
+    return TemporalCrosspostIndex.load(path)
+
+async def read_temporal_index(path):
+    """Return the per-window crosspost index; None if the file is missing"""
+    return await _read_artifact(path, _read_temporal_index)
+
+def _validate_visualization_data(data):
+    if not isinstance(data, dict) or not data:
+        raise ValueError("expected a non-empty JSON object")
+
+def _validate_crosspost_network(data):
+    missing = [key for key in ("nodes", "edges", "stats") if key not in data]
+    if missing:
+        raise ValueError(f"missing keys: {', '.join(missing)}")
+
+def _validate_crosspost_lod(data):
+    missing = [key for key in ("nodes", "levels") if key not in data]
+    if missing:
+        raise ValueError(f"missing keys: {', '.join(missing)}")
+
+def _validate_cascades(data):
+    missing = [key for key in ("summary", "cascades") if key not in data]
+    if missing:
+        raise ValueError(f"missing keys: {', '.join(missing)}")
+
+def _validate_temporal_index(index):
+    if not index.starts:
+        raise ValueError("no time windows")
+
+def _validate_graphml(content):
+    if "<graphml" not in content[:2000]:
+        raise ValueError("not a GraphML document")
+
+def _validate_markdown_index(report):
+    if not report["sections"]:
+        raise ValueError("no '## ' sections found")
+
+# Everything the endpoints serve, loaded and validated together at startup and on reload
+WARMUP_ARTIFACTS = [
+    (JSON_DATA_PATH_OUTPUT, _read_json, _validate_visualization_data),
+    (JSON_DATA_PATH_INPUT, _read_json, _validate_visualization_data),
+    (CROSSPOST_JSON_PATH, _read_json, _validate_crosspost_network),
+    (CROSSPOST_GRAPHML_PATH, _read_text, _validate_graphml),
+    (CROSSPOST_LOD_PATH, _read_json, _validate_crosspost_lod),
+    (CROSSPOST_TEMPORAL_PATH, _read_temporal_index, _validate_temporal_index),
+    (CROSSPOST_CASCADES_PATH, _read_json, _validate_cascades),
+    (IMAGE_DIR / "analysis_report.md", _read_markdown_index, _validate_markdown_index),
+    (ANALYSIS_OUTPUT_DIR / "social_media_analysis_report.md", _read_markdown_index, _validate_markdown_index),
+]
+
+readiness = {
+    "ready": False,
+    "reloading": False,
+    "loaded_at": None,
+    "load_ms": None,
+    "data_source": None,
+    "artifacts": {}
+}
+_reload_lock = threading.Lock()
+
+def _warm_artifact(path, reader, validator):
+    start = time.perf_counter()
+    status = {"path": str(path.relative_to(Path(__file__).parent)), "loaded": False, "load_ms": None, "error": None}
+    entry = None
+    try:
+        entry = _load_if_changed(path, reader, None)
+        if entry["value"] is None:
+            status["error"] = "file not found"
+        else:
+            validator(entry["value"])
+            status["loaded"] = True
+    except Exception as e:
+        status["error"] = str(e)
+    status["load_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return entry if status["loaded"] else None, status
+
+def reload_artifacts():
+    """
+    Load and validate every artifact in parallel, then swap the new snapshot in.
+    Requests keep being served from the previous snapshot until the swap, and
+    artifacts that fail to load keep their previous cached version.
+    """
+    global visualization_data
+    with _reload_lock:
+        readiness["reloading"] = True
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=len(WARMUP_ARTIFACTS)) as pool:
+                results = list(pool.map(lambda artifact: _warm_artifact(*artifact), WARMUP_ARTIFACTS))
+            
+            entries = {}
+            statuses = {}
+            for (path, reader, _), (entry, status) in zip(WARMUP_ARTIFACTS, results):
+                statuses[status["path"]] = status
+                if entry is not None:
+                    entries[(str(path), reader.__name__)] = entry
+                elif status["error"]:
+                    logger.warning(f"Artifact {status['path']} not loaded: {status['error']}")
+            
+            data_source = next((path for path in (JSON_DATA_PATH_OUTPUT, JSON_DATA_PATH_INPUT)
+                                if (str(path), "_read_json") in entries), None)
+            
+            with _artifact_cache_lock:
+                _artifact_cache.update(entries)
+            if data_source is not None:
+                visualization_data = entries[(str(data_source), "_read_json")]["value"]
+                readiness["data_source"] = str(data_source)
+            
+            readiness.update({
+                "ready": visualization_data is not None,
+                "loaded_at": time.time(),
+                "load_ms": round((time.perf_counter() - start) * 1000, 2),
+                "artifacts": statuses
+            })
+            logger.info(f"Loaded {len(entries)}/{len(WARMUP_ARTIFACTS)} artifacts in {readiness['load_ms']} ms")
+        finally:
+            readiness["reloading"] = False
+    
+    if data_source is None:
+        raise FileNotFoundError(f"JSON file not found at either {JSON_DATA_PATH_OUTPUT} or {JSON_DATA_PATH_INPUT}")
+    return readiness
 
 @app.get("/api/posts-per-day")
 async def get_posts_per_day():
     """Return posts per day data from input directory"""
     try:
         json_path = Path(__file__).parent / "input" / "all_visualization_data.json"
-        if os.path.exists(json_path):
-            with open(json_path, 'r') as f:
-                data = json.load(f)
-                posts_data = data.get("posts_per_day")
-                if posts_data:
-                    return posts_data
+        data = await read_json_artifact(json_path)
+        if data:
+            posts_data = data.get("posts_per_day")
+            if posts_data:
+                return posts_data
     except Exception as e:
         print(f"Error loading posts per day data: {e}")
     
-    if 'visualization_data' not in globals():
+    if visualization_data is None:
         raise HTTPException(status_code=500, detail="Data not loaded")
     return visualization_data.get("posts_per_day")
 
@@ -73,16 +304,15 @@ async def get_content_categories():
     for dir_path in ["analysis_output", "input"]:
         try:
             json_path = Path(__file__).parent / dir_path / "all_visualization_data.json"
-            if os.path.exists(json_path):
-                with open(json_path, 'r') as f:
-                    data = json.load(f)
-                    categories_data = data.get("content_categories")
-                    if categories_data:
-                        return categories_data
+            data = await read_json_artifact(json_path)
+            if data:
+                categories_data = data.get("content_categories")
+                if categories_data:
+                    return categories_data
         except Exception as e:
             print(f"Error loading content categories from {dir_path}: {e}")
     
-    if 'visualization_data' not in globals():
+    if visualization_data is None:
         raise HTTPException(status_code=500, detail="Data not loaded")
     
     return visualization_data.get("content_categories")
@@ -95,20 +325,18 @@ async def get_top_subreddits():
     for dir_path in ["analysis_output", "input"]:
         try:
             json_path = Path(__file__).parent / dir_path / "all_visualization_data.json"
-            if os.path.exists(json_path):
-                with open(json_path, 'r') as f:
-                    data = json.load(f)
-                    
-                    # Try standard key first
-                    subreddits_data = data.get("top_subreddits")
-                    if subreddits_data:
-                        return subreddits_data
-                    
-                    # Try alternative keys if top_subreddits doesn't exist
-                    if dir_path == "input":
-                        for alt_key in ["subreddit_distribution", "subreddits", "top_subreddits_data"]:
-                            if alt_key in data:
-                                return data[alt_key]
+            data = await read_json_artifact(json_path)
+            if data:
+                # Try standard key first
+                subreddits_data = data.get("top_subreddits")
+                if subreddits_data:
+                    return subreddits_data
+                
+                # Try alternative keys if top_subreddits doesn't exist
+                if dir_path == "input":
+                    for alt_key in ["subreddit_distribution", "subreddits", "top_subreddits_data"]:
+                        if alt_key in data:
+                            return data[alt_key]
         except Exception as e:
             print(f"Error loading top subreddits from {dir_path}: {e}")
     
@@ -119,14 +347,14 @@ async def get_top_subreddits():
 @app.get("/api/sentiment-distribution")
 async def get_sentiment_distribution():
     """Return sentiment distribution data"""
-    if 'visualization_data' not in globals():
+    if visualization_data is None:
         raise HTTPException(status_code=500, detail="Data not loaded")
     return visualization_data.get("sentiment_distribution")
 
 @app.get("/api/subreddit-distribution")
 async def get_subreddit_distribution():
     """Return subreddit distribution data"""
-    if 'visualization_data' not in globals():
+    if visualization_data is None:
         raise HTTPException(status_code=500, detail="Data not loaded")
     return visualization_data.get("subreddit_distribution") 
 
@@ -135,16 +363,15 @@ async def get_top_bad_words():
     """Return top bad words data directly from analysis_output folder"""
     try:
         json_path = Path(__file__).parent / "analysis_output" / "all_visualization_data.json"
-        if os.path.exists(json_path):
-            with open(json_path, 'r') as f:
-                data = json.load(f)
-                bad_words_data = data.get("top_bad_words")
-                if bad_words_data:
-                    return bad_words_data
+        data = await read_json_artifact(json_path)
+        if data:
+            bad_words_data = data.get("top_bad_words")
+            if bad_words_data:
+                return bad_words_data
     except Exception as e:
         print(f"Error loading bad words directly: {e}")
     
-    if 'visualization_data' not in globals():
+    if visualization_data is None:
         raise HTTPException(status_code=500, detail="Data not loaded")
     return visualization_data.get("top_bad_words")
 
@@ -153,16 +380,15 @@ async def get_top_political_words():
     """Return top political words data directly from analysis_output folder"""
     try:
         json_path = Path(__file__).parent / "analysis_output" / "all_visualization_data.json"
-        if os.path.exists(json_path):
-            with open(json_path, 'r') as f:
-                data = json.load(f)
-                political_words_data = data.get("top_political_words")
-                if political_words_data:
-                    return political_words_data
+        data = await read_json_artifact(json_path)
+        if data:
+            political_words_data = data.get("top_political_words")
+            if political_words_data:
+                return political_words_data
     except Exception as e:
         print(f"Error loading political words directly: {e}")
     
-    if 'visualization_data' not in globals():
+    if visualization_data is None:
         raise HTTPException(status_code=500, detail="Data not loaded")
     return visualization_data.get("top_political_words")
 
@@ -198,13 +424,10 @@ async def get_sentiment_analysis():
     """Return sentiment analysis markdown content"""
     try:
         file_path = Path(__file__).parent / "analysis_output" / "social_media_analysis_report.md"
-        if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            if "## Sentiment Analysis" in content:
-                section = content.split("## Sentiment Analysis")[1].split("##")[0].strip()
-                return {"content": section}
+        report = await read_markdown_index(file_path)
+        section = find_markdown_section(report, "Sentiment Analysis") if report is not None else None
+        if section is not None:
+            return {"content": section["body"]}
     except Exception as e:
         print(f"Error loading sentiment analysis content: {e}")
     
@@ -216,13 +439,10 @@ async def get_network_analysis():
     """Return network analysis markdown content"""
     try:
         file_path = Path(__file__).parent / "analysis_output" / "social_media_analysis_report.md"
-        if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            if "## Network Analysis" in content:
-                section = content.split("## Network Analysis")[1].split("##")[0].strip()
-                return {"content": section}
+        report = await read_markdown_index(file_path)
+        section = find_markdown_section(report, "Network Analysis") if report is not None else None
+        if section is not None:
+            return {"content": section["body"]}
     except Exception as e:
         print(f"Error loading network analysis content: {e}")
     
@@ -235,9 +455,8 @@ async def get_crosspost_network_graphml():
         graphml_path = Path(__file__).parent / "reddit_crosspost_network.graphml"
         logger.info(f"Loading GraphML data from: {graphml_path}")
         
-        if os.path.exists(graphml_path):
-            with open(graphml_path, 'r', encoding='utf-8') as f:
-                graphml_content = f.read()
+        graphml_content = await read_text_artifact(graphml_path)
+        if graphml_content is not None:
             return {"graphml": graphml_content}
         else:
             logger.error(f"GraphML file not found: {graphml_path}")
@@ -246,23 +465,72 @@ async def get_crosspost_network_graphml():
         logger.error(f"Error loading GraphML data: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error loading GraphML data: {str(e)}")
     
+@app.get("/api/crosspost-network-lod")
+async def get_crosspost_network_lod(level: Optional[int] = None):
+    """
+    Return the subreddit-level crosspost network written by network.py.
+    Without level all detail levels are returned; with level=N only levels 0..N,
+    so the frontend can draw the heaviest connections first and fetch the rest later.
+    """
+    data = await read_json_artifact(CROSSPOST_LOD_PATH)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Crosspost level-of-detail file not found")
+    if level is None:
+        return data
+    return {**data, "levels": data["levels"][:max(level, 0) + 1], "total_levels": len(data["levels"])}
+
+@app.get("/api/crosspost-network")
+async def get_crosspost_network(start: Optional[str] = Query(None, alias="from"),
+                                end: Optional[str] = Query(None, alias="to")):
+    """
+    Return the subreddit crosspost network for a time range.
+    from/to take unix seconds or ISO dates; the result is combined from the
+    precomputed per-window counts, so it is rounded out to whole windows.
+    """
+    try:
+        start_time, end_time = parse_time(start), parse_time(end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid time range: {e}")
+    if start_time is not None and end_time is not None and end_time <= start_time:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+
+    index = await read_temporal_index(CROSSPOST_TEMPORAL_PATH)
+    if index is None:
+        raise HTTPException(status_code=404, detail="Temporal crosspost network file not found")
+    return index.network(start_time, end_time)
+
+@app.get("/api/crosspost-network-compact")
+async def get_crosspost_network_compact(request: Request, output_format: Optional[str] = Query(None, alias="format")):
+    """
+    Serve the compact (columnar nodes + CSR edges) crosspost network file as-is.
+    MessagePack is returned for ?format=msgpack or an Accept: application/msgpack
+    header when network.py was run with --msgpack.
+    """
+    wants_msgpack = output_format == "msgpack" or "application/msgpack" in request.headers.get("accept", "")
+    if wants_msgpack and os.path.exists(CROSSPOST_MSGPACK_PATH):
+        return FileResponse(CROSSPOST_MSGPACK_PATH, media_type="application/msgpack")
+    if os.path.exists(CROSSPOST_COMPACT_PATH):
+        return FileResponse(CROSSPOST_COMPACT_PATH, media_type="application/json")
+    raise HTTPException(status_code=404, detail="Compact crosspost network file not found")
+
 @app.get("/api/crosspost-stats")
 async def get_crosspost_stats():
     try:
         json_path = Path(__file__).parent / "reddit_crosspost_network.json"
-        if os.path.exists(json_path):
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                stats = data.get("stats", {})
-                
-                # Return properly formatted stats data
-                return {
-                    "subredditCount": len(data.get("nodes", [])),
-                    "crosspostCount": stats.get("total_crossposts", 0),
-                    "connectionCount": stats.get("unique_connections", 0),
-                    "userCount": len(set([crosspost.get("original", {}).get("author", "") 
-                                       for crosspost in data.get("crossposts", [])]))
-                }
+        data = await read_json_artifact(json_path)
+        if data is not None:
+            stats = data.get("stats", {})
+            
+            # Return properly formatted stats data
+            return {
+                "subredditCount": len(data.get("nodes", [])),
+                "crosspostCount": stats.get("total_crossposts", 0),
+                "connectionCount": stats.get("unique_connections", 0),
+                # Precomputed by network.py; older files only have the raw crossposts
+                "userCount": stats["user_count"] if "user_count" in stats else
+                             len(set([crosspost.get("original", {}).get("author", "") 
+                                      for crosspost in data.get("crossposts", [])]))
+            }
         else:
             # Return mock data when file not found (for development purposes)
             print("Warning: reddit_crosspost_network.json not found, returning mock data")
@@ -281,18 +549,16 @@ async def get_crosspost_top():
     """Return top source and destination subreddits from the JSON file"""
     try:
         json_path = Path(__file__).parent / "reddit_crosspost_network.json"
-        if os.path.exists(json_path):
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-                # Get top sources and destinations from the stats
-                top_sources = data.get("stats", {}).get("top_source_subreddits", [])
-                top_destinations = data.get("stats", {}).get("top_destination_subreddits", [])
-                
-                return {
-                    "sources": [{"name": s.get("name"), "count": s.get("count")} for s in top_sources],
-                    "destinations": [{"name": s.get("name"), "count": s.get("count")} for s in top_destinations]
-                }
+        data = await read_json_artifact(json_path)
+        if data is not None:
+            # Get top sources and destinations from the stats
+            top_sources = data.get("stats", {}).get("top_source_subreddits", [])
+            top_destinations = data.get("stats", {}).get("top_destination_subreddits", [])
+            
+            return {
+                "sources": [{"name": s.get("name"), "count": s.get("count")} for s in top_sources],
+                "destinations": [{"name": s.get("name"), "count": s.get("count")} for s in top_destinations]
+            }
         else:
             raise HTTPException(status_code=404, detail="Crosspost network data file not found")
     except Exception as e:
@@ -312,19 +578,131 @@ async def debug_info():
         "output_files": [str(f.name) for f in output_image_files],
         "json_in_input": os.path.exists(JSON_DATA_PATH_INPUT),
         "json_in_output": os.path.exists(JSON_DATA_PATH_OUTPUT),
-        "data_loaded": 'visualization_data' in globals()
+        "data_loaded": visualization_data is not None
     }
 
-@app.get("/api/reload-data")
+@app.api_route("/api/reload-data", methods=["GET", "POST"])
 async def reload_data():
     """Force reload data from JSON file"""
-    global visualization_data
     try:
-        visualization_data = load_data()
+        # Previous snapshot keeps serving until the reload swaps the new one in
+        await run_in_threadpool(reload_artifacts)
         return {"status": "Data reloaded successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to reload data: {str(e)}")
 
+async def warm_artifacts():
+    try:
+        await run_in_threadpool(reload_artifacts)
+    except Exception as e:
+        logger.error(f"Artifact warmup failed: {e}")
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness probe: the process is up and handling requests"""
+    return {"status": "ok"}
+
+@app.get("/metrics")
+async def get_metrics():
+    """Request counts, latency and size histograms and artifact cache stats in Prometheus text format"""
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness probe: artifacts are warmed, with per-artifact load timings"""
+    return JSONResponse(status_code=200 if readiness["ready"] else 503, content=readiness)
+
+def reload_after_job(job):
+    """Pick up freshly promoted artifacts once a pipeline job succeeds"""
+    reload_artifacts()
+    logger.info(f"Reloaded artifacts after job {job.id}")
+
+job_runner = JobRunner(max_workers=int(os.getenv("PIPELINE_WORKERS", "1")), on_complete=reload_after_job)
+
+class JobRequest(BaseModel):
+    stages: Optional[List[str]] = None
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(request: Optional[JobRequest] = None):
+    """Queue a pipeline refresh (analysis1, analysis2, network) in the background"""
+    stages = request.stages if request else None
+    try:
+        job = await run_in_threadpool(job_runner.submit, stages)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return job.to_dict()
+
+@app.get("/api/jobs")
+async def list_jobs():
+    """Return all pipeline jobs, newest first"""
+    return [job.to_dict() for job in job_runner.list()]
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Return the status of a pipeline job"""
+    job = job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job.to_dict()
+
+@app.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running pipeline job"""
+    job = job_runner.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job.to_dict()
+
+CASCADE_SORT_KEYS = ["size", "depth", "breadth", "subreddits", "spread_rate"]
+
+@app.get("/api/crosspost-cascades")
+async def get_crosspost_cascades(sort: str = "size", limit: int = 20, min_depth: int = 1):
+    """
+    Return crosspost cascades (root post and every crosspost descended from it)
+    ranked by size, depth, breadth, subreddits reached or spread rate.
+    """
+    if sort not in CASCADE_SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"Unknown sort key '{sort}'. Choose from: {', '.join(CASCADE_SORT_KEYS)}")
+    data = await read_json_artifact(CROSSPOST_CASCADES_PATH)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Crosspost cascades file not found")
+
+    cascades = [cascade for cascade in data["cascades"] if cascade["depth"] >= min_depth and cascade[sort] is not None]
+    cascades = sorted(cascades, key=lambda cascade: cascade[sort], reverse=True)[:max(limit, 0)]
+    return {"summary": data["summary"], "sort": sort, "cascades": cascades}
+
+ANALYTICS_METRICS = ["pagerank", "betweenness", "in_strength", "out_strength"]
+
+@app.get("/api/crosspost-analytics")
+async def get_crosspost_analytics(metric: str = "pagerank", limit: int = 20, community: Optional[int] = None):
+    """
+    Return subreddits ranked by a precomputed graph metric (PageRank, betweenness,
+    weighted in/out strength) with their community, optionally for one community only.
+    """
+    if metric not in ANALYTICS_METRICS:
+        raise HTTPException(status_code=400, detail=f"Unknown metric '{metric}'. Choose from: {', '.join(ANALYTICS_METRICS)}")
+    data = await read_json_artifact(CROSSPOST_JSON_PATH)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Crosspost network data file not found")
+
+    nodes = [node for node in data.get("nodes", []) if metric in node]
+    if not nodes:
+        raise HTTPException(status_code=404, detail="Crosspost network file has no analytics, re-run network.py")
+    if community is not None:
+        nodes = [node for node in nodes if node.get("community") == community]
+    nodes = sorted(nodes, key=lambda node: node[metric], reverse=True)[:max(limit, 0)]
+
+    return {
+        "metric": metric,
+        "summary": data.get("stats", {}).get("analytics", {}),
+        "subreddits": [{
+            "name": node["id"],
+            "value": node[metric],
+            "community": node.get("community"),
+            **{name: node.get(name) for name in ANALYTICS_METRICS}
+        } for node in nodes]
+    }
+
 @app.get("/")
 async def root():
     data_source = str(JSON_DATA_PATH_OUTPUT if os.path.exists(JSON_DATA_PATH_OUTPUT) else JSON_DATA_PATH_INPUT)
@@ -339,60 +717,57 @@ async def root():
             "/api/sentiment-distribution",
             "/api/subreddit-distribution",
             "/api/top-bad-words",
-            "/api/top-political-words"
+            "/api/top-political-words",
+            "/api/crosspost-network",
+            "/api/crosspost-analytics",
+            "/api/crosspost-cascades",
+            "/api/jobs",
+            "/metrics"
         ]
     }
 
+# Map markdown endpoint names to actual files and sections
+MARKDOWN_SECTIONS = {
+    "overview": {"file": "analysis_report.md", "section": "Overview"},
+    "content-analysis": {"file": "social_media_analysis_report.md", "section": "Content Analysis"},
+    "sentiment-analysis": {"file": "social_media_analysis_report.md", "section": "Sentiment Analysis"},
+    "engagement-analysis": {"file": "social_media_analysis_report.md", "section": "Engagement Metrics"},
+    "recommendations": {"file": "social_media_analysis_report.md", "section": "Key Findings"},
+    "community": {"file": "social_media_analysis_report.md", "section": "Overall Summary"},
+    "political-analysis": {"file": "social_media_analysis_report.md", "section": "Political Words and Engagement Analysis"},
+    "bad-words": {"file": "social_media_analysis_report.md", "section": "Bad Words Analysis"}
+}
+
 @app.get("/api/markdown/{section}")
 async def get_markdown_content(section: str):
     """Serve markdown content from files"""
-    # Map endpoint names to actual files and sections
-    section_mapping = {
-        "overview": {"file": "analysis_report.md", "section": "Overview"},
-        "content-analysis": {"file": "social_media_analysis_report.md", "section": "Content Analysis"},
-        "sentiment-analysis": {"file": "social_media_analysis_report.md", "section": "Sentiment Analysis"},
-        "engagement-analysis": {"file": "social_media_analysis_report.md", "section": "Engagement Metrics"},
-        "recommendations": {"file": "social_media_analysis_report.md", "section": "Key Findings"},
-        "community": {"file": "social_media_analysis_report.md", "section": "Overall Summary"},
-        "political-analysis": {"file": "social_media_analysis_report.md", "section": "Political Words and Engagement Analysis"},
-        "bad-words": {"file": "social_media_analysis_report.md", "section": "Bad Words Analysis"}
-    }
-    
-    if section not in section_mapping:
+    if section not in MARKDOWN_SECTIONS:
         raise HTTPException(status_code=404, detail=f"Markdown section '{section}' not found")
     
-    file_info = section_mapping[section]
+    file_info = MARKDOWN_SECTIONS[section]
     md_file = file_info["file"]
     section_heading = file_info["section"]
     
     # Try both directories
     for directory in ["input", "analysis_output"]:
         file_path = Path(__file__).parent / directory / md_file
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Return whole file for overview
-                if section == "overview":
-                    return {"content": content}
-                
-                # Extract specific section
-                section_pattern = f"## {section_heading}"
-                if section_pattern in content:
-                    section_start = content.find(section_pattern)
-                    section_content = content[section_start:]
-                    
-                    next_section = section_content.find("\n## ", 5)
-                    if next_section > 0:
-                        section_content = section_content[:next_section]
-                    
-                    return {"content": section_content}
-                
-                # Default to whole content if section not found
-                return {"content": content}
-            except Exception as e:
-                print(f"Error reading markdown file: {e}")
+        try:
+            report = await read_markdown_index(file_path)
+        except Exception as e:
+            print(f"Error reading markdown file: {e}")
+            continue
+        if report is not None:
+            # Return whole file for overview
+            if section == "overview":
+                return {"content": report["content"]}
+            
+            # Extract specific section
+            found = find_markdown_section(report, section_heading)
+            if found is not None:
+                return {"content": found["block"]}
+            
+            # Default to whole content if section not found
+            return {"content": report["content"]}
     
     raise HTTPException(status_code=404, detail=f"Markdown file not found: {md_file}")
 
@@ -0,0 +1,266 @@
+import importlib
+import multiprocessing
+import os
+import runpy
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+JOBS_DIR = os.path.join(BASE_DIR, ".jobs")
+
+# Each stage runs in a staging directory that only links to its inputs, so a
+# half-finished run never overwrites the artifacts the server is reading.
+# Stages with a "module" are called through its run() API; the others run as scripts.
+PIPELINE_STAGES = {
+    "analysis1": {
+        "module": "analysis1",
+        "inputs": ["input.json", ".env"],
+        "outputs": ["input"]
+    },
+    "analysis2": {
+        "module": "analysis2",
+        "inputs": ["output1.json", ".env"],
+        "outputs": ["analysis_output"]
+    },
+    "network": {
+        "script": "network.py",
+        "args": ["--output-dir", "."],
+        # The temporal index is extended, not rebuilt, so the live one is an input too
+        "inputs": ["input.json", ".env", "reddit_crosspost_temporal.json"],
+        "outputs": [
+            "reddit_crosspost_network.graphml",
+            "reddit_crosspost_network.json",
+            "reddit_crosspost_temporal.json",
+            "reddit_crosspost_cascades.json",
+            "reddit_crosspost_lod.json",
+            "reddit_crosspost_network.csr.json",
+            "reddit_crosspost_network.csr.msgpack",
+            "reddit_crosspost_network.png",
+            "reddit_crosspost_network.svg"
+        ]
+    },
+    # analysis1 and crosspost discovery from one read of input.json
+    "pipeline": {
+        "module": "pipeline",
+        "inputs": ["input.json", ".env", "reddit_crosspost_temporal.json"],
+        "outputs": [
+            "input",
+            "reddit_crosspost_network.json",
+            "reddit_crosspost_temporal.json",
+            "reddit_crosspost_cascades.json"
+        ]
+    }
+}
+
+DEFAULT_STAGES = ["analysis1", "analysis2", "network"]
+
+
+def run_stage(stage_name, staging_dir):
+    """
+    Run one pipeline stage inside a worker process.
+    Executes in the staging directory so every relative output path lands there.
+    """
+    stage = PIPELINE_STAGES[stage_name]
+    os.chdir(staging_dir)
+
+    start_time = time.time()
+    if "module" in stage:
+        if BASE_DIR not in sys.path:
+            sys.path.insert(0, BASE_DIR)
+        result = importlib.import_module(stage["module"]).run()
+        return {"stage": stage_name, "duration": round(time.time() - start_time, 3), "timings": result.timings}
+
+    script_path = os.path.join(BASE_DIR, stage["script"])
+    sys.argv = [script_path] + stage["args"]
+    try:
+        runpy.run_path(script_path, run_name="__main__")
+    except SystemExit as e:
+        # The scripts only call exit() when they bail out early
+        raise RuntimeError(f"{stage['script']} exited early (code {e.code})")
+
+    return {"stage": stage_name, "duration": round(time.time() - start_time, 3)}
+
+
+class Job:
+    def __init__(self, stages):
+        self.id = uuid.uuid4().hex
+        self.stages = list(stages)
+        self.status = "queued"
+        self.current_stage = None
+        self.completed_stages = []
+        self.error = None
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self.staging_dir = None
+        self.future = None
+        self.cancel_requested = False
+
+    def to_dict(self):
+        status = self.status
+        if status == "queued" and self.future is not None and self.future.running():
+            status = "running"
+        return {
+            "id": self.id,
+            "status": status,
+            "stages": self.stages,
+            "current_stage": self.current_stage,
+            "completed_stages": self.completed_stages,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "finished_at": self.finished_at
+        }
+
+
+class JobRunner:
+    """
+    Runs pipeline stages for submitted jobs in a background process pool.
+    Stages of one job run in order; finished artifacts are promoted into place
+    only when every stage succeeded, then on_complete is called.
+    """
+
+    def __init__(self, max_workers=1, on_complete=None):
+        self.max_workers = max_workers
+        self.on_complete = on_complete
+        self.jobs = {}
+        self._lock = threading.RLock()
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            # A fresh spawned interpreter per stage keeps script globals and cwd isolated
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=1
+            )
+        return self._executor
+
+    def submit(self, stages=None):
+        stages = stages or DEFAULT_STAGES
+        unknown = [s for s in stages if s not in PIPELINE_STAGES]
+        if unknown:
+            raise ValueError(f"Unknown pipeline stages: {', '.join(unknown)}")
+
+        job = Job(stages)
+        os.makedirs(JOBS_DIR, exist_ok=True)
+        job.staging_dir = tempfile.mkdtemp(prefix=f"{job.id}_", dir=JOBS_DIR)
+
+        with self._lock:
+            self.jobs[job.id] = job
+            self._submit_next_stage(job)
+
+        logger.info(f"Submitted job {job.id} with stages {', '.join(stages)}")
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def list(self):
+        return sorted(self.jobs.values(), key=lambda job: job.submitted_at, reverse=True)
+
+    def cancel(self, job_id):
+        """
+        Cancel a job. A queued stage is dropped immediately; a running stage is
+        allowed to finish but its outputs are discarded.
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.status not in ("queued", "running"):
+                return job
+
+            job.cancel_requested = True
+            if job.future is not None and job.future.cancel():
+                self._finish(job, "cancelled")
+            else:
+                job.status = "cancelling"
+        return job
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _submit_next_stage(self, job):
+        stage_name = job.stages[len(job.completed_stages)]
+        for input_name in PIPELINE_STAGES[stage_name]["inputs"]:
+            source = os.path.join(BASE_DIR, input_name)
+            target = os.path.join(job.staging_dir, input_name)
+            if os.path.exists(source) and not os.path.lexists(target):
+                os.symlink(source, target)
+
+        job.current_stage = stage_name
+        try:
+            job.future = self._get_executor().submit(run_stage, stage_name, job.staging_dir)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a new pool rather than failing every later job
+            logger.warning("Process pool was broken, starting a new one")
+            self._executor = None
+            job.future = self._get_executor().submit(run_stage, stage_name, job.staging_dir)
+        job.future.add_done_callback(lambda future: self._stage_done(job, future))
+
+    def _stage_done(self, job, future):
+        with self._lock:
+            if future.cancelled():
+                return
+
+            error = future.exception()
+            if job.cancel_requested:
+                self._finish(job, "cancelled")
+                return
+            if error is not None:
+                job.error = str(error)
+                logger.error(f"Job {job.id} failed in stage {job.current_stage}: {error}")
+                self._finish(job, "failed")
+                return
+
+            job.completed_stages.append(future.result())
+            if len(job.completed_stages) < len(job.stages):
+                job.status = "running"
+                self._submit_next_stage(job)
+                return
+
+            try:
+                self._promote_artifacts(job)
+            except OSError as e:
+                job.error = f"Failed to promote artifacts: {e}"
+                self._finish(job, "failed")
+                return
+            self._finish(job, "succeeded")
+
+        if self.on_complete is not None:
+            try:
+                self.on_complete(job)
+            except Exception as e:
+                logger.error(f"Error running completion hook for job {job.id}: {e}")
+
+    def _promote_artifacts(self, job):
+        """Move staged outputs over the live ones, one atomic rename per file"""
+        for stage_name in job.stages:
+            for output_name in PIPELINE_STAGES[stage_name]["outputs"]:
+                staged = os.path.join(job.staging_dir, output_name)
+                if os.path.isdir(staged):
+                    for root, _, files in os.walk(staged):
+                        relative_root = os.path.relpath(root, job.staging_dir)
+                        os.makedirs(os.path.join(BASE_DIR, relative_root), exist_ok=True)
+                        for name in files:
+                            os.replace(os.path.join(root, name), os.path.join(BASE_DIR, relative_root, name))
+                elif os.path.isfile(staged) and not os.path.islink(staged):
+                    # A linked input the stage did not rewrite is still the live file
+                    os.replace(staged, os.path.join(BASE_DIR, output_name))
+
+    def _finish(self, job, status):
+        job.status = status
+        job.current_stage = None
+        job.finished_at = time.time()
+        if job.staging_dir:
+            shutil.rmtree(job.staging_dir, ignore_errors=True)
+        logger.info(f"Job {job.id} {status}")
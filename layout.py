@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+# Graphs up to this size use the exact O(n^2) repulsion in one vectorized step
+DIRECT_REPULSION_LIMIT = 1500
+# Graphs above this size get the grid-approximated engine when engine="auto"
+AUTO_SPRING_LIMIT = 500
+# Reuse previous positions when at most this fraction of nodes is new
+INCREMENTAL_MAX_NEW_FRACTION = 0.25
+
+
+def _direct_repulsion(coords, k, chunk_size=None):
+    """Exact pairwise repulsion (k^2 / d), computed in row chunks to bound memory"""
+    n = len(coords)
+    disp = np.zeros_like(coords)
+    chunk_size = chunk_size or max(1, (1 << 22) // max(n, 1))
+    for start in range(0, n, chunk_size):
+        delta = coords[start:start + chunk_size, None, :] - coords[None, :, :]
+        dist2 = np.maximum((delta ** 2).sum(axis=-1), 1e-6)
+        disp[start:start + chunk_size] = (delta * (k * k / dist2)[..., None]).sum(axis=1)
+    return disp
+
+
+def _grid_repulsion(coords, k, depth=0):
+    """
+    Barnes-Hut style repulsion on a uniform grid of about sqrt(n) cells.
+    Nodes in other cells are approximated by the cell's centre of mass; nodes
+    in the same cell interact exactly, or recursively on a finer grid when the
+    cell is still large. Costs roughly O(n^1.5) per call instead of O(n^2).
+    """
+    n = len(coords)
+    mins = coords.min(axis=0)
+    span = (coords.max(axis=0) - mins).max()
+    if n <= DIRECT_REPULSION_LIMIT or depth >= 4 or span < 1e-9:
+        return _direct_repulsion(coords, k)
+
+    grid = max(2, int(np.sqrt(np.sqrt(n))))
+    cell_xy = np.minimum(((coords - mins) / span * grid).astype(np.int64), grid - 1)
+    cell = cell_xy[:, 0] * grid + cell_xy[:, 1]
+
+    mass = np.bincount(cell, minlength=grid * grid)
+    occupied = np.nonzero(mass)[0]
+    weights = mass[occupied].astype(float)
+    centroids = np.stack([
+        np.bincount(cell, weights=coords[:, 0], minlength=grid * grid)[occupied],
+        np.bincount(cell, weights=coords[:, 1], minlength=grid * grid)[occupied]
+    ], axis=1) / weights[:, None]
+
+    # Far field: every node against every other occupied cell's centre of mass
+    disp = np.zeros_like(coords)
+    chunk_size = max(1, (1 << 22) // len(occupied))
+    for start in range(0, n, chunk_size):
+        delta = coords[start:start + chunk_size, None, :] - centroids[None, :, :]
+        dist2 = np.maximum((delta ** 2).sum(axis=-1), 1e-6)
+        strength = k * k * weights / dist2
+        strength[cell[start:start + chunk_size, None] == occupied[None, :]] = 0.0
+        disp[start:start + chunk_size] = (delta * strength[..., None]).sum(axis=1)
+
+    # Near field: nodes sharing a cell
+    order = np.argsort(cell, kind="stable")
+    bounds = np.searchsorted(cell[order], occupied, side="left")
+    ends = np.append(bounds[1:], n)
+    for start, end in zip(bounds, ends):
+        if end - start > 1:
+            members = order[start:end]
+            disp[members] += _grid_repulsion(coords[members], k, depth + 1)
+
+    return disp
+
+
+def force_directed_layout(G, pos=None, iterations=50, seed=42, temperature=0.1, gravity=0.5):
+    """
+    Fruchterman-Reingold force-directed layout on NumPy arrays with grid
+    approximated repulsion, for graphs too large for nx.spring_layout.
+    pos optionally seeds positions (in spring_layout's [-1, 1] space) for some
+    or all nodes. Returns a {node: array([x, y])} dict scaled to [-1, 1].
+    """
+    nodes = list(G.nodes())
+    n = len(nodes)
+    if n == 0:
+        return {}
+    if n == 1:
+        return {nodes[0]: np.zeros(2)}
+
+    index = {node: i for i, node in enumerate(nodes)}
+    rng = np.random.default_rng(seed)
+    coords = rng.random((n, 2))
+    if pos:
+        for node, xy in pos.items():
+            if node in index:
+                coords[index[node]] = (np.asarray(xy, dtype=float) + 1) / 2
+
+    edges = np.array([(index[u], index[v]) for u, v in G.edges() if u != v], dtype=np.int64).reshape(-1, 2)
+    k = 1 / np.sqrt(n)
+    step = temperature / (iterations + 1)
+
+    for _ in range(iterations):
+        disp = _grid_repulsion(coords, k)
+
+        if len(edges):
+            delta = coords[edges[:, 0]] - coords[edges[:, 1]]
+            dist = np.maximum(np.sqrt((delta ** 2).sum(axis=1)), 1e-6)
+            pull = delta * (dist / k)[:, None]
+            for axis in (0, 1):
+                disp[:, axis] -= np.bincount(edges[:, 0], weights=pull[:, axis], minlength=n)
+                disp[:, axis] += np.bincount(edges[:, 1], weights=pull[:, axis], minlength=n)
+
+        # Keep disconnected components from drifting apart
+        disp -= gravity * (coords - coords.mean(axis=0))
+
+        length = np.maximum(np.sqrt((disp ** 2).sum(axis=1)), 1e-9)
+        coords += disp * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= step
+
+    import networkx as nx
+    coords = nx.rescale_layout(coords - coords.mean(axis=0))
+    return dict(zip(nodes, coords))
+
+
+def spring_layout(G, pos=None, iterations=100, seed=42):
+    """NetworkX spring layout, the original engine used by visualize_network"""
+    import networkx as nx
+    return nx.spring_layout(G, pos=pos, k=0.3, iterations=iterations, seed=seed)
+
+
+LAYOUT_ENGINES = {
+    "spring": spring_layout,
+    "force": force_directed_layout
+}
+
+
+def graph_signature(G, engine):
+    """Stable hash of the graph structure and layout engine, used as the cache key"""
+    digest = hashlib.sha1(engine.encode("utf-8"))
+    for node in sorted(str(node) for node in G.nodes()):
+        digest.update(node.encode("utf-8") + b"\0")
+    digest.update(b"\1")
+    for u, v in sorted((str(u), str(v)) for u, v in G.edges()):
+        digest.update(u.encode("utf-8") + b"\0" + v.encode("utf-8") + b"\0")
+    return digest.hexdigest()
+
+
+def _load_positions(path, G):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            stored = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    by_name = {str(node): node for node in G.nodes()}
+    return {by_name[name]: np.array(xy) for name, xy in stored.items() if name in by_name}
+
+
+def _save_positions(path, pos):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({str(node): [float(x), float(y)] for node, (x, y) in pos.items()}, f)
+    os.replace(tmp_path, path)
+
+
+def compute_layout(G, engine="auto", cache_dir=None, iterations=None, seed=42, kind="graph"):
+    """
+    Compute node positions with the chosen engine ("spring", "force" or "auto").
+    With a cache_dir, layouts are cached by graph_signature, and when the exact
+    graph is not cached but the previous layout covers most nodes, only a short
+    incremental run is done starting from the previous positions.
+    kind names the graph being laid out, so different graphs sharing a cache_dir
+    (e.g. the full network and its subreddit aggregate) each keep their own previous layout.
+    """
+    if engine == "auto":
+        engine = "spring" if G.number_of_nodes() <= AUTO_SPRING_LIMIT else "force"
+    if engine not in LAYOUT_ENGINES:
+        raise ValueError(f"Unknown layout engine '{engine}'. Choose from: {', '.join(LAYOUT_ENGINES)}")
+    layout_fn = LAYOUT_ENGINES[engine]
+    full_iterations = iterations or (100 if engine == "spring" else 50)
+
+    start_time = time.time()
+    cache_path = latest_path = None
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_path = os.path.join(cache_dir, f"{graph_signature(G, engine)}.json")
+        latest_path = os.path.join(cache_dir, f"latest_{kind}_{engine}.json")
+
+        cached = _load_positions(cache_path, G)
+        if cached is not None and len(cached) == G.number_of_nodes():
+            print(f"Using cached {engine} layout ({os.path.basename(cache_path)})")
+            return cached
+
+    previous = _load_positions(latest_path, G) if latest_path else None
+    new_nodes = G.number_of_nodes() - len(previous or {})
+    if previous and new_nodes <= INCREMENTAL_MAX_NEW_FRACTION * G.number_of_nodes():
+        print(f"Incremental {engine} layout: reusing {len(previous)} positions, placing {new_nodes} new nodes")
+        # A cooler, shorter run settles the new nodes without reshuffling the rest
+        extra = {"temperature": 0.02} if engine == "force" else {}
+        pos = layout_fn(G, pos=_seed_new_nodes(G, previous, seed), iterations=max(10, full_iterations // 5), seed=seed, **extra)
+    else:
+        print(f"Computing {engine} layout for {G.number_of_nodes()} nodes...")
+        pos = layout_fn(G, iterations=full_iterations, seed=seed)
+
+    print(f"Layout computed in {time.time() - start_time:.2f} seconds")
+    if cache_path:
+        _save_positions(cache_path, pos)
+        _save_positions(latest_path, pos)
+    return pos
+
+
+def _seed_new_nodes(G, previous, seed):
+    """Start each new node next to the mean of its already placed neighbours"""
+    rng = np.random.default_rng(seed)
+    pos = dict(previous)
+    undirected = G.to_undirected(as_view=True)
+    for node in G.nodes():
+        if node in pos:
+            continue
+        placed = [pos[neighbor] for neighbor in undirected.neighbors(node) if neighbor in pos]
+        center = np.mean(placed, axis=0) if placed else np.zeros(2)
+        pos[node] = center + rng.normal(scale=0.02, size=2)
+    return pos
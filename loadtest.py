@@ -0,0 +1,242 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+DEFAULT_ENDPOINTS = [
+    "/api/posts-per-day",
+    "/api/content-categories",
+    "/api/top-subreddits",
+    "/api/top-bad-words",
+    "/api/markdown/overview",
+    "/api/markdown/bad-words",
+    "/api/crosspost-network-graphml",
+    "/api/crosspost-stats",
+    "/api/crosspost-top"
+]
+
+# cold: traffic starts as soon as the process answers, while artifacts are still warming
+# warm: artifacts loaded and every endpoint requested once before measuring
+# reload: warm, with /api/reload-data called repeatedly while traffic runs
+SCENARIOS = ["cold", "warm", "reload"]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def parse_mix(entries):
+    """["/api/a=3", "/api/b"] -> {"/api/a": 3.0, "/api/b": 1.0}"""
+    mix = {}
+    for entry in entries:
+        endpoint, _, weight = entry.partition("=")
+        mix[endpoint] = float(weight) if weight else 1.0
+    return mix
+
+
+def build_schedule(mix, total_requests, seed):
+    """Endpoint of every request, drawn from the weighted mix; the same seed gives the same run"""
+    rng = random.Random(seed)
+    return rng.choices(list(mix), weights=list(mix.values()), k=total_requests)
+
+
+def start_server(port, quiet=False):
+    """Start image_server under uvicorn and wait until it answers"""
+    output = subprocess.DEVNULL if quiet else None
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "image_server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=output,
+        stderr=output
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/healthz", timeout=1)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError("Server did not start within 30 seconds")
+
+
+def stop_server(process):
+    process.terminate()
+    process.wait()
+
+
+def wait_until_warm(base_url, timeout=300):
+    """Block until the artifact snapshot has loaded (whether or not every artifact was found)"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if httpx.get(f"{base_url}/readyz", timeout=60).json().get("loaded_at") is not None:
+            return
+        time.sleep(0.1)
+    raise RuntimeError(f"Artifacts did not finish loading within {timeout} seconds")
+
+
+def cache_counts(base_url):
+    """Artifact cache reads by result (hit, unchanged, load, missing) from /metrics; empty if unavailable"""
+    counts = {}
+    try:
+        response = httpx.get(f"{base_url}/metrics", timeout=10)
+    except httpx.HTTPError:
+        return counts
+    if response.status_code != 200:
+        return counts
+    for line in response.text.splitlines():
+        if line.startswith("image_server_artifact_cache_total{"):
+            labels, value = line.rsplit(" ", 1)
+            result = labels.split('result="', 1)[1].split('"', 1)[0]
+            counts[result] = counts.get(result, 0) + float(value)
+    return counts
+
+
+async def run_load(base_url, schedule, concurrency, reload_interval=None):
+    """Send the scheduled requests with concurrency workers; optionally trigger reloads meanwhile"""
+    latencies = {endpoint: [] for endpoint in dict.fromkeys(schedule)}
+    errors = {endpoint: 0 for endpoint in latencies}
+    reloads = []
+    queue = asyncio.Queue()
+    for endpoint in schedule:
+        queue.put_nowait(endpoint)
+
+    async def worker(client):
+        while not queue.empty():
+            endpoint = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                response = await client.get(endpoint)
+                if response.status_code >= 500:
+                    errors[endpoint] += 1
+            except httpx.HTTPError:
+                errors[endpoint] += 1
+            latencies[endpoint].append((time.perf_counter() - start) * 1000)
+
+    async def reloader(client):
+        while not queue.empty():
+            await asyncio.sleep(reload_interval)
+            start = time.perf_counter()
+            response = await client.post("/api/reload-data")
+            reloads.append({"status": response.status_code, "ms": (time.perf_counter() - start) * 1000})
+
+    start_time = time.perf_counter()
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        workers = [worker(client) for _ in range(concurrency)]
+        if reload_interval:
+            reload_task = asyncio.create_task(reloader(client))
+            await asyncio.gather(*workers)
+            reload_task.cancel()
+        else:
+            await asyncio.gather(*workers)
+    elapsed = time.perf_counter() - start_time
+
+    return latencies, errors, elapsed, reloads
+
+
+def summarize(latencies, errors, elapsed):
+    """Per-endpoint and overall request count, throughput, errors and p50/p95/p99 latency"""
+    def row(values, error_count):
+        return {
+            "requests": len(values),
+            "throughput": round(len(values) / elapsed, 1) if elapsed else 0.0,
+            "errors": error_count,
+            "p50_ms": round(percentile(values, 50), 2),
+            "p95_ms": round(percentile(values, 95), 2),
+            "p99_ms": round(percentile(values, 99), 2)
+        }
+
+    endpoints = {endpoint: row(values, errors[endpoint]) for endpoint, values in latencies.items()}
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {"elapsed": round(elapsed, 3), "endpoints": endpoints, "all": row(all_latencies, sum(errors.values()))}
+
+
+def print_report(scenario, summary):
+    print(f"\n== {scenario} ==")
+    print(f"{'Endpoint':<40} {'n':>6} {'req/s':>8} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = list(summary["endpoints"].items()) + [("ALL", summary["all"])]
+    for endpoint, stats in rows:
+        print(f"{endpoint:<40} {stats['requests']:>6} {stats['throughput']:>8.1f} {stats['errors']:>5} "
+              f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}")
+    print(f"\nThroughput: {summary['all']['throughput']:.1f} req/s over {summary['elapsed']:.2f}s, "
+          f"{summary['all']['errors']} errors")
+    if summary.get("snapshot_load_ms") is not None:
+        print(f"Last artifact snapshot load: {summary['snapshot_load_ms']:.1f} ms")
+    if summary.get("reloads"):
+        reload_ms = [reload["ms"] for reload in summary["reloads"]]
+        failed = sum(1 for reload in summary["reloads"] if reload["status"] != 200)
+        print(f"Reloads during traffic: {len(reload_ms)}, median {percentile(reload_ms, 50):.1f} ms, {failed} failed")
+    if summary.get("cache"):
+        print("Artifact cache reads: " + ", ".join(f"{result} {int(count)}" for result, count in
+                                                   sorted(summary["cache"].items())))
+
+
+def run_scenario(scenario, args, schedule):
+    """Run one scenario, against its own fresh local server unless --url is given"""
+    if scenario == "cold" and args.url:
+        raise ValueError("The cold scenario needs a freshly started local server; drop --url")
+    server = None
+    base_url = args.url
+    if not base_url:
+        server = start_server(args.port, quiet=not args.server_output)
+        base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        if scenario != "cold":
+            wait_until_warm(base_url)
+            asyncio.run(run_load(base_url, list(dict.fromkeys(schedule)), 1))
+        # A cold server starts from zero, so its warmup reads count towards the scenario
+        cache_before = {} if scenario == "cold" else cache_counts(base_url)
+        reload_interval = args.reload_interval if scenario == "reload" else None
+        latencies, errors, elapsed, reloads = asyncio.run(
+            run_load(base_url, schedule, args.concurrency, reload_interval))
+        summary = summarize(latencies, errors, elapsed)
+        summary["reloads"] = reloads
+        cache_after = cache_counts(base_url)
+        summary["cache"] = {result: count - cache_before.get(result, 0) for result, count in cache_after.items()}
+        summary["snapshot_load_ms"] = httpx.get(f"{base_url}/readyz", timeout=60).json().get("load_ms")
+        return summary
+    finally:
+        if server is not None:
+            stop_server(server)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent latency test for the dashboard API")
+    parser.add_argument("--url", help="Base URL of a running server (default: start one locally per scenario)")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the locally started server")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=50, help="Number of concurrent clients")
+    parser.add_argument("--endpoints", nargs="+", default=DEFAULT_ENDPOINTS, metavar="ENDPOINT[=WEIGHT]",
+                        help="Endpoint mix; requests are drawn by weight (default 1)")
+    parser.add_argument("--scenarios", nargs="+", default=["warm"], choices=SCENARIOS, help="Scenarios to run")
+    parser.add_argument("--reload-interval", type=float, default=0.5,
+                        help="Seconds between /api/reload-data calls in the reload scenario")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the request order")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    parser.add_argument("--server-output", action="store_true", help="Show the local server's own output")
+
+    args = parser.parse_args()
+
+    schedule = build_schedule(parse_mix(args.endpoints), args.requests, args.seed)
+    results = {}
+    for scenario in args.scenarios:
+        results[scenario] = run_scenario(scenario, args, schedule)
+        print_report(scenario, results[scenario])
+
+    if args.json:
+        tmp_file = args.json + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"requests": args.requests, "concurrency": args.concurrency, "seed": args.seed,
+                       "mix": parse_mix(args.endpoints), "scenarios": results}, f, indent=2)
+        os.replace(tmp_file, args.json)
+        print(f"\nResults saved to {args.json}")
@@ -0,0 +1,192 @@
+import threading
+import time
+
+# Prometheus text exposition format, written by hand so the server needs no client library
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+SIZE_BUCKETS = [256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216]
+# Requests that matched no route share one label, so random URLs cannot grow the series count
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, description, labels=()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def header(self):
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def values(self):
+        with self._lock:
+            return dict(self._values)
+
+    def render(self):
+        lines = self.header()
+        for labels, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {_format_number(value)}")
+        return lines
+
+
+class Gauge(Metric):
+    """A gauge whose samples are computed when the registry is rendered"""
+    kind = "gauge"
+
+    def __init__(self, name, description, labels=(), collect=None):
+        super().__init__(name, description, labels)
+        self.collect = collect
+
+    def render(self):
+        lines = self.header()
+        for labels, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {_format_number(value)}")
+        return lines
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, description, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = list(buckets)
+
+    def observe(self, value, *labels):
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry["counts"][i] += 1
+                    break
+            entry["sum"] += value
+            entry["count"] += 1
+
+    def render(self):
+        with self._lock:
+            values = {labels: {"counts": list(entry["counts"]), "sum": entry["sum"], "count": entry["count"]}
+                      for labels, entry in self._values.items()}
+        lines = self.header()
+        for labels, entry in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry["counts"]):
+                cumulative += count
+                bucket = _format_labels(self.labels, labels, f'le="{_format_number(float(bound))}"')
+                lines.append(f"{self.name}_bucket{bucket} {cumulative}")
+            bucket = _format_labels(self.labels, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{bucket} {entry['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {_format_number(entry['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {entry['count']}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "image_server_http_requests_total", "HTTP requests by route and status", ["method", "route", "status"]))
+http_latency = registry.register(Histogram(
+    "image_server_http_request_duration_seconds", "Time from request to the last response byte",
+    ["method", "route"], LATENCY_BUCKETS))
+http_response_size = registry.register(Histogram(
+    "image_server_http_response_size_bytes", "Response body size", ["method", "route"], SIZE_BUCKETS))
+artifact_cache = registry.register(Counter(
+    "image_server_artifact_cache_total",
+    "Artifact reads: hit (served from memory), unchanged (stat only), load (re-read) or missing",
+    ["artifact", "result"]))
+artifact_load = registry.register(Histogram(
+    "image_server_artifact_load_seconds", "Time to read and parse an artifact", ["artifact"], LATENCY_BUCKETS))
+
+
+def _cache_hit_ratios():
+    totals = {}
+    for (artifact, result), count in artifact_cache.values().items():
+        hits, total = totals.get(artifact, (0, 0))
+        totals[artifact] = (hits + (count if result in ("hit", "unchanged") else 0), total + count)
+    return {(artifact,): round(hits / total, 4) for artifact, (hits, total) in totals.items() if total}
+
+
+registry.register(Gauge(
+    "image_server_artifact_cache_hit_ratio", "Share of artifact reads served without re-reading the file",
+    ["artifact"], _cache_hit_ratios))
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route request counts, latency and response size.
+    Routes are labelled by their template (/api/jobs/{job_id}), not the raw path.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        response = {"status": 500, "size": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the scope it was given
+            route = scope.get("route")
+            route = getattr(route, "path", None) or UNMATCHED_ROUTE
+            method = scope["method"]
+            http_requests.inc(method, route, str(response["status"]))
+            http_latency.observe(time.perf_counter() - start, method, route)
+            http_response_size.observe(response["size"], method, route)
@@ -1,64 +1,159 @@
 import json
-from py2neo import Graph, Node, Relationship
-import networkx as nx
-import matplotlib.pyplot as plt
-from matplotlib.cm import get_cmap
-import numpy as np
 from tqdm import tqdm
 import time
 import argparse
 import os
-from dotenv import load_dotenv
+from collections import Counter
+
+from cascades import write_cascades
+from graph_store import GRAPH_BACKENDS, connect_graph_store
+from graph_export import CompactGraphBuilder, GraphMLStreamWriter, graph_from_compact, write_compact
+from layout import LAYOUT_ENGINES, compute_layout
+from profiling import span, start_session
+from renderer import RENDER_MODES, NetworkRenderer
+from temporal_network import WINDOW_SECONDS, TemporalCrosspostIndex
+
+# Caches live next to the code, not in the output directory: job stages write to a staging directory that is deleted afterwards
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 def create_reddit_crosspost_graph(input_file, neo4j_uri=None, 
                                 neo4j_user=None, neo4j_password=None,
-                                top_posts_limit=None): 
+                                top_posts_limit=None, json_output=None,
+                                temporal_output=None, temporal_window="day", cascade_output=None,
+                                store=None, posts=None, temporal_retention=None): 
     """
     Create a Neo4j graph database of Reddit posts and their crossposting relationships
     Creates nodes for ALL crossposts to show the complete network
+    Writes go through the given graph store, or a new one from the Neo4j arguments/environment
+    When json_output is given, the dashboard's crosspost network JSON is written from the same scan,
+    and temporal_output gets per-window (hour/day/week) crosspost counts, added to the index
+    already there and aged out after temporal_retention days,
+    and cascade_output gets the reconstructed multi-hop crosspost trees
+    Pass posts to reuse an already-parsed dump instead of reading input_file
     """
     start_time = time.time()
     
-    load_dotenv()
+    if store is None:
+        store = connect_graph_store(uri=neo4j_uri, user=neo4j_user, password=neo4j_password)
     
-    neo4j_uri = neo4j_uri or os.getenv('NEO4J_URI', 'bolt://localhost:7687')
-    neo4j_user = neo4j_user or os.getenv('NEO4J_USER', 'neo4j')
-    neo4j_password = neo4j_password or os.getenv('NEO4J_PASSWORD')
+    if posts is None:
+        print(f"Loading data from {input_file}...")
+        with open(input_file, "r") as f:
+            posts = json.load(f)
     
-    if not neo4j_password:
-        raise ValueError("Neo4j password not provided. Set NEO4J_PASSWORD environment variable or pass as parameter.")
+    print("Clearing existing data...")
+    store.write("MATCH (n) DETACH DELETE n")
     
-    print("Connecting to Neo4j...")
-    graph = Graph(neo4j_uri, auth=(neo4j_user, neo4j_password))
+    print("Creating indices...")
+    store.write("CREATE INDEX post_id_index IF NOT EXISTS FOR (p:Post) ON (p.id)")
+    store.write("CREATE INDEX subreddit_name_index IF NOT EXISTS FOR (s:Subreddit) ON (s.name)")
+    store.write("CREATE INDEX crosspost_id_index IF NOT EXISTS FOR (c:Crosspost) ON (c.id)")
     
-    print(f"Loading data from {input_file}...")
-    with open(input_file, "r") as f:
-        posts = json.load(f)
+    with span("crosspost_discovery", items=len(posts)):
+        crosspost_info, sorted_pairs, subreddit_subscribers = discover_crossposts(posts)
+    with span("crosspost_outputs", items=len(crosspost_info)):
+        write_crosspost_outputs(posts, crosspost_info, sorted_pairs, subreddit_subscribers, json_output=json_output,
+                                temporal_output=temporal_output, temporal_window=temporal_window,
+                                cascade_output=cascade_output, temporal_retention=temporal_retention)
     
-    print("Clearing existing data...")
-    graph.run("MATCH (n) DETACH DELETE n")
+    # Create subreddit nodes for all relevant subreddits
+    all_subreddits = set()
+    for info in crosspost_info:
+        all_subreddits.add(info["source_subreddit"])
+        all_subreddits.add(info["dest_subreddit"])
     
-    print("Creating indices...")
-    graph.run("CREATE INDEX post_id_index IF NOT EXISTS FOR (p:Post) ON (p.id)")
-    graph.run("CREATE INDEX subreddit_name_index IF NOT EXISTS FOR (s:Subreddit) ON (s.name)")
-    graph.run("CREATE INDEX crosspost_id_index IF NOT EXISTS FOR (c:Crosspost) ON (c.id)")
+    print(f"Creating {len(all_subreddits)} subreddit nodes...")
+    with span("neo4j_write", items=len(all_subreddits)):
+        store.write_batches(CREATE_SUBREDDITS_QUERY, [
+            {"name": subreddit_name, "subscribers": subreddit_subscribers.get(subreddit_name, 0)}
+            for subreddit_name in all_subreddits
+        ])
+    
+    # Create nodes for ALL crossposts and their relationships
+    print(f"Creating nodes for all {len(crosspost_info)} crosspost relationships...")
+    crosspost_rows = []
+    for info in crosspost_info:
+        post_id = info["post_id"]
+        parent_id = info["parent_id"]
+        post_data = info["post_data"]
+        parent_data = info["parent_data"]
+        
+        crosspost_rows.append({
+            "source_subreddit": info["source_subreddit"],
+            "dest_subreddit": info["dest_subreddit"],
+            "crosspost": {
+                "id": f"{parent_id}_{post_id}",
+                "title": post_data.get("title", ""),
+                "parent_title": parent_data.get("title", ""),
+                "author": post_data.get("author", "[deleted]"),
+                "parent_author": parent_data.get("author", "[deleted]"),
+                "score": post_data.get("score", 0),
+                "parent_score": parent_data.get("score", 0),
+                "created_utc": post_data.get("created_utc", 0)
+            },
+            "parent": {
+                "id": parent_id,
+                "title": parent_data.get("title", ""),
+                "author": parent_data.get("author", "[deleted]"),
+                "score": parent_data.get("score", 0)
+            },
+            "post": {
+                "id": post_id,
+                "title": post_data.get("title", ""),
+                "author": post_data.get("author", "[deleted]"),
+                "score": post_data.get("score", 0)
+            }
+        })
+    with span("neo4j_write", items=len(crosspost_rows)):
+        store.write_batches(CREATE_CROSSPOSTS_QUERY, crosspost_rows)
     
+    print("Creating aggregated crosspost relationships between subreddits...")
+    pair_rows = [
+        {"source": source, "dest": dest, "weight": count}
+        for (source, dest), count in sorted_pairs if source != dest
+    ]
+    with span("neo4j_write", items=len(pair_rows)):
+        store.write_batches(CREATE_CROSSPOST_FROM_QUERY, pair_rows)
+    
+    # Bumped on every import so cached analysis results for the old data are not reused
+    store.write("MERGE (m:GraphMeta {name: 'crosspost'}) SET m.version = $version", version=f"{time.time():.0f}")
+    
+    edge_count = store.read("MATCH ()-[r:CROSSPOST_FROM]->() RETURN COUNT(r) AS count")[0]["count"]
+    print(f"Created {edge_count} aggregated subreddit relationships in the database")
+    
+    crosspost_count = store.read("MATCH (c:Crosspost) RETURN COUNT(c) AS count")[0]["count"]
+    print(f"Created {crosspost_count} individual crosspost nodes in the database")
+    
+    print(f"Graph creation complete!")
+    print(f"Total time: {time.time() - start_time:.2f} seconds")
+    
+    return store
+
+def discover_crossposts(posts):
+    """
+    Find every crosspost in the dump and count them per (source, dest) subreddit pair.
+    Returns (crosspost_info, sorted_pairs, subreddit_subscribers); needs no database.
+    """
     # Identifying all crosspost relationships
     print("Scanning for crossposts...")
     crosspost_info = []
+    subreddit_subscribers = {}
+    posts_by_id = {}
+    for post in posts:
+        # First post with an id wins, as the old linear search did
+        posts_by_id.setdefault(post["data"].get("id"), post["data"])
     for post in tqdm(posts, desc="Scanning posts"):
         post_data = post["data"]
+        # First post seen for a subreddit provides its subscriber count
+        if post_data.get("subreddit") not in subreddit_subscribers:
+            subreddit_subscribers[post_data.get("subreddit")] = post_data.get("subreddit_subscribers", 0)
         try:
             if "crosspost_parent" in post_data and post_data["crosspost_parent"]:
                 post_id = post_data["id"]
                 parent_id = post_data["crosspost_parent"].split("_")[1]
                 
                 # Find the parent post
-                parent_data = None
-                for p in posts:
-                    if p["data"]["id"] == parent_id:
-                        parent_data = p["data"]
-                        break
+                parent_data = posts_by_id.get(parent_id)
                 
                 if parent_data is None and "crosspost_parent_list" in post_data:
                     if post_data["crosspost_parent_list"] and len(post_data["crosspost_parent_list"]) > 0:
@@ -121,130 +216,273 @@ def create_reddit_crosspost_graph(input_file, neo4j_uri=None,
     
     print(f"Found {len(sorted_pairs)} subreddit crosspost relationships")
     
-    # Start transaction
-    tx = graph.begin()
+    return crosspost_info, sorted_pairs, subreddit_subscribers
+
+def write_crosspost_outputs(posts, crosspost_info, sorted_pairs, subreddit_subscribers, json_output=None,
+                            temporal_output=None, temporal_window="day", cascade_output=None,
+                            temporal_retention=None):
+    """
+    Write the dashboard network JSON, the temporal index and the cascades from one discovery pass.
+    The temporal index is updated in place: only crossposts it has not counted yet are added, and
+    with temporal_retention (days) windows older than that before the newest one are dropped.
+    """
+    if json_output:
+        write_crosspost_network_json(crosspost_info, sorted_pairs, subreddit_subscribers, json_output)
+    
+    if temporal_output:
+        temporal_index = TemporalCrosspostIndex.load_or_create(temporal_output, temporal_window)
+        added = sum(temporal_index.add(info["source_subreddit"], info["dest_subreddit"],
+                                       info["post_data"].get("created_utc"), crosspost_id=info["post_id"])
+                    for info in crosspost_info)
+        print(f"Added {added} new crossposts to the temporal index")
+        if temporal_retention and temporal_index.latest() is not None:
+            # Relative to the newest crosspost, not the clock, so older dumps keep their history
+            dropped = temporal_index.prune(temporal_index.latest() - temporal_retention * 86400)
+            if dropped:
+                print(f"Dropped {dropped} {temporal_window} windows older than {temporal_retention} days")
+        temporal_index.save(temporal_output)
+    
+    if cascade_output:
+        write_cascades(posts, cascade_output)
+
+# Import statements, run with UNWIND over batches of rows instead of one
+# statement per node and relationship
+CREATE_SUBREDDITS_QUERY = """
+    UNWIND $rows AS row
+    MERGE (s:Subreddit {name: row.name})
+    SET s.subscribers = row.subscribers
+"""
+
+CREATE_CROSSPOSTS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (source:Subreddit {name: row.source_subreddit})
+    MATCH (dest:Subreddit {name: row.dest_subreddit})
+    MERGE (parent:Post {id: row.parent.id})
+    SET parent += row.parent
+    MERGE (post:Post {id: row.post.id})
+    SET post += row.post
+    CREATE (c:Crosspost)
+    SET c = row.crosspost
+    CREATE (c)-[:FROM_SUBREDDIT]->(source), (c)-[:TO_SUBREDDIT]->(dest),
+           (parent)-[:POSTED_IN]->(source), (post)-[:POSTED_IN]->(dest),
+           (c)-[:ORIGINAL_POST]->(parent), (c)-[:REPOSTED_AS]->(post),
+           (post)-[:CROSSPOST_OF]->(parent)
+"""
+
+CREATE_CROSSPOST_FROM_QUERY = """
+    UNWIND $rows AS row
+    MATCH (source:Subreddit {name: row.source})
+    MATCH (dest:Subreddit {name: row.dest})
+    CREATE (dest)-[:CROSSPOST_FROM {weight: row.weight}]->(source)
+"""
+
+def build_crosspost_network_json(crosspost_info, sorted_pairs, subreddit_subscribers, top_n=10):
+    """
+    Build the nodes/edges/crossposts/stats document served by image_server.py.
+    Everything the dashboard shows (user count, top sources and destinations,
+    unique connections, subreddit analytics) is precomputed here so the server
+    never rescans crossposts.
+    """
+    as_source = Counter(info["source_subreddit"] for info in crosspost_info)
+    as_destination = Counter(info["dest_subreddit"] for info in crosspost_info)
+    subreddit_names = list(dict.fromkeys(
+        name for info in crosspost_info for name in (info["source_subreddit"], info["dest_subreddit"])))
     
-    # Create subreddit nodes for all relevant subreddits
-    all_subreddits = set()
+    crossposts_by_pair = {}
     for info in crosspost_info:
-        all_subreddits.add(info["source_subreddit"])
-        all_subreddits.add(info["dest_subreddit"])
-    
-    print(f"Creating {len(all_subreddits)} subreddit nodes...")
-    subreddits = {} 
-    for subreddit_name in all_subreddits:
-        subscribers = 0
-        for post in posts:
-            if post["data"]["subreddit"] == subreddit_name:
-                subscribers = post["data"].get("subreddit_subscribers", 0)
-                break
-        
-        subreddit_node = Node("Subreddit", 
-                            name=subreddit_name,
-                            subscribers=subscribers)
-        tx.merge(subreddit_node, "Subreddit", "name")
-        subreddits[subreddit_name] = subreddit_node
-    
-    # Create nodes for ALL crossposts and their relationships
-    print(f"Creating nodes for all {len(crosspost_info)} crosspost relationships...")
-    for i, info in enumerate(tqdm(crosspost_info, desc="Creating crosspost nodes")):
-        post_id = info["post_id"]
-        parent_id = info["parent_id"]
-        source_subreddit = info["source_subreddit"]
-        dest_subreddit = info["dest_subreddit"]
-        post_data = info["post_data"]
-        parent_data = info["parent_data"]
-        
-        crosspost_node = Node("Crosspost",
-                             id=f"{parent_id}_{post_id}",
-                             title=post_data.get("title", ""),
-                             parent_title=parent_data.get("title", ""),
-                             author=post_data.get("author", "[deleted]"),
-                             parent_author=parent_data.get("author", "[deleted]"),
-                             score=post_data.get("score", 0),
-                             parent_score=parent_data.get("score", 0),
-                             created_utc=post_data.get("created_utc", 0))
-        tx.create(crosspost_node)
-        
-        source_node = subreddits[source_subreddit]
-        dest_node = subreddits[dest_subreddit]
-        
-        from_rel = Relationship(crosspost_node, "FROM_SUBREDDIT", source_node)
-        to_rel = Relationship(crosspost_node, "TO_SUBREDDIT", dest_node)
-        tx.create(from_rel)
-        tx.create(to_rel)
-        
-        # Create parent and child post nodes
-        parent_node = Node("Post", 
-                        id=parent_id, 
-                        title=parent_data.get("title", ""),
-                        author=parent_data.get("author", "[deleted]"),
-                        score=parent_data.get("score", 0))
-        tx.merge(parent_node, "Post", "id")
-        
-        post_node = Node("Post", 
-                       id=post_id, 
-                       title=post_data.get("title", ""),
-                       author=post_data.get("author", "[deleted]"),
-                       score=post_data.get("score", 0))
-        tx.merge(post_node, "Post", "id")
-        
-        # Link posts
-        source_posted_rel = Relationship(parent_node, "POSTED_IN", source_node)
-        dest_posted_rel = Relationship(post_node, "POSTED_IN", dest_node)
-        tx.create(source_posted_rel)
-        tx.create(dest_posted_rel)
-        
-        orig_rel = Relationship(crosspost_node, "ORIGINAL_POST", parent_node)
-        repost_rel = Relationship(crosspost_node, "REPOSTED_AS", post_node)
-        tx.create(orig_rel)
-        tx.create(repost_rel)
-        
-        crosspost_rel = Relationship(post_node, "CROSSPOST_OF", parent_node)
-        tx.create(crosspost_rel)
-    
-    print("Creating aggregated crosspost relationships between subreddits...")
-    for (source, dest), count in sorted_pairs:
-        if source != dest: 
-            source_node = subreddits[source]
-            dest_node = subreddits[dest]
-            
-            rel = Relationship(dest_node, "CROSSPOST_FROM", source_node, weight=count)
-            tx.create(rel)
-    
-    graph.commit(tx)
-    
-    edge_count = graph.run("MATCH ()-[r:CROSSPOST_FROM]->() RETURN COUNT(r) AS count").data()[0]["count"]
-    print(f"Created {edge_count} aggregated subreddit relationships in the database")
-    
-    crosspost_count = graph.run("MATCH (c:Crosspost) RETURN COUNT(c) AS count").data()[0]["count"]
-    print(f"Created {crosspost_count} individual crosspost nodes in the database")
-    
-    print(f"Graph creation complete!")
-    print(f"Total time: {time.time() - start_time:.2f} seconds")
-    
-    return graph
+        crossposts_by_pair.setdefault((info["source_subreddit"], info["dest_subreddit"]), []).append(
+            f"{info['parent_id']}_{info['post_id']}")
+    
+    # SciPy is only loaded once a network is actually built
+    from graph_analytics import subreddit_metrics
+    metrics, analytics = subreddit_metrics((source, dest, count) for (source, dest), count in sorted_pairs)
+    
+    nodes = [{
+        "id": name,
+        "label": f"r/{name}",
+        "type": "subreddit",
+        "as_source": as_source[name],
+        "as_destination": as_destination[name],
+        "subscribers": subreddit_subscribers.get(name, 0) or 0,
+        "value": 10 + as_source[name] + as_destination[name],
+        **metrics.get(name, {})
+    } for name in subreddit_names]
+    
+    edges = [{
+        "id": f"{source}->{dest}",
+        "from": source,
+        "to": dest,
+        "weight": count,
+        "value": count,
+        "title": f"{count} crossposts from r/{source} to r/{dest}",
+        "crossposts": crossposts_by_pair[(source, dest)]
+    } for (source, dest), count in sorted_pairs if source != dest]
+    
+    def summary(post):
+        return {
+            "title": post.get("title", ""),
+            "author": post.get("author", "[deleted]"),
+            "score": post.get("score", 0),
+            "subreddit": post.get("subreddit", "")
+        }
+    
+    crossposts = [{
+        "id": f"{info['parent_id']}_{info['post_id']}",
+        "original": {**summary(info["parent_data"]), "subreddit": info["source_subreddit"]},
+        "repost": {**summary(info["post_data"]), "subreddit": info["dest_subreddit"]},
+        "timestamp": info["post_data"].get("created_utc")
+    } for info in crosspost_info]
+    
+    stats = {
+        "top_source_subreddits": [{"name": name, "count": count} for name, count in as_source.most_common(top_n)],
+        "top_destination_subreddits": [{"name": name, "count": count} for name, count in as_destination.most_common(top_n)],
+        "total_crossposts": len(crosspost_info),
+        "total_subreddits": len(nodes),
+        "unique_connections": len(edges),
+        "user_count": len({crosspost["original"]["author"] for crosspost in crossposts}),
+        "analytics": {
+            **analytics,
+            "top_pagerank": [{"name": name, "value": metrics[name]["pagerank"]}
+                             for name in sorted(metrics, key=lambda n: metrics[n]["pagerank"], reverse=True)[:top_n]],
+            "top_betweenness": [{"name": name, "value": metrics[name]["betweenness"]}
+                                for name in sorted(metrics, key=lambda n: metrics[n]["betweenness"], reverse=True)[:top_n]]
+        }
+    }
+    
+    return {"nodes": nodes, "edges": edges, "crossposts": crossposts, "stats": stats}
 
-def analyze_crosspost_network(graph):
+def write_crosspost_network_json(crosspost_info, sorted_pairs, subreddit_subscribers, output_file):
+    network_json = build_crosspost_network_json(crosspost_info, sorted_pairs, subreddit_subscribers)
+    tmp_file = output_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(network_json, f)
+    os.replace(tmp_file, output_file)
+    print(f"Crosspost network JSON with {len(network_json['edges'])} connections saved to {output_file}")
+    return network_json
+
+# Everything analyze_crosspost_network reports, fetched in one round-trip. The
+# Crosspost -> Subreddit pattern is scanned once (pair_counts); top sources,
+# busiest paths and unique connections are derived from it client-side.
+ANALYSIS_QUERY = """
+    CALL {
+        MATCH (p:Post)<-[r:CROSSPOST_OF]-()
+        WITH p, COUNT(r) AS crosspost_count
+        ORDER BY crosspost_count DESC
+        LIMIT 10
+        RETURN collect({
+            post_id: p.id, title: p.title, author: p.author, score: p.score,
+            crosspost_count: crosspost_count,
+            original_subreddit: [(p)-[:POSTED_IN]->(s) | s.name][0],
+            crossposted_to: [(p)<-[:CROSSPOST_OF]-(repost)-[:POSTED_IN]->(dest) | dest.name]
+        }) AS top_posts
+    }
+    CALL {
+        MATCH (source:Subreddit)<-[:FROM_SUBREDDIT]-(c:Crosspost)-[:TO_SUBREDDIT]->(dest:Subreddit)
+        WITH source.name AS source_subreddit, dest.name AS dest_subreddit, COUNT(c) AS crosspost_count
+        RETURN collect({source_subreddit: source_subreddit, dest_subreddit: dest_subreddit,
+                        crosspost_count: crosspost_count}) AS pair_counts
+    }
+    CALL {
+        MATCH (c:Crosspost)-[:FROM_SUBREDDIT]->(source:Subreddit)
+        MATCH (c)-[:TO_SUBREDDIT]->(dest:Subreddit)
+        WHERE source.name <> dest.name
+        WITH c, source, dest
+        LIMIT 10
+        RETURN collect({title: c.title, author: c.author, from_subreddit: source.name,
+                        to_subreddit: dest.name}) AS examples
+    }
+    CALL {
+        MATCH (s:Subreddit)
+        RETURN COUNT(s) AS subreddit_count
+    }
+    CALL {
+        MATCH (c:Crosspost)
+        RETURN COUNT(c) AS crosspost_count
+    }
+    RETURN top_posts, pair_counts, examples, subreddit_count, crosspost_count
+"""
+
+# Version stamp written by create_reddit_crosspost_graph, plus node/relationship
+# counts (answered from Neo4j's count store) for databases loaded without one
+GRAPH_VERSION_QUERY = """
+    OPTIONAL MATCH (m:GraphMeta {name: 'crosspost'})
+    WITH m.version AS version
+    CALL { MATCH (n) RETURN COUNT(n) AS node_count }
+    CALL { MATCH ()-[r]->() RETURN COUNT(r) AS relationship_count }
+    RETURN version, node_count, relationship_count
+"""
+
+_analysis_cache = {}
+
+def graph_version(store):
+    record = store.read(GRAPH_VERSION_QUERY)[0]
+    return f"{record['version'] or 'unversioned'}-{record['node_count']}-{record['relationship_count']}"
+
+def fetch_crosspost_analysis(store, cache_dir=None):
+    """
+    Fetch the crosspost analysis in at most two round-trips: the graph version,
+    then (only when that version is not cached in memory or in cache_dir) the
+    consolidated analysis query. The result carries per-query timings in ms.
+    """
+    timings = {}
+    start = time.perf_counter()
+    version = graph_version(store)
+    timings["graph_version"] = round((time.perf_counter() - start) * 1000, 2)
+    
+    cache_path = None
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_path = os.path.join(cache_dir, f"analysis_{version}.json")
+    
+    results = _analysis_cache.get(version)
+    if results is None and cache_path and os.path.exists(cache_path):
+        with open(cache_path, "r") as f:
+            results = json.load(f)
+        _analysis_cache[version] = results
+    if results is not None:
+        return {**results, "version": version, "cached": True, "timings": timings}
+    
+    start = time.perf_counter()
+    record = store.read(ANALYSIS_QUERY)[0]
+    timings["analysis"] = round((time.perf_counter() - start) * 1000, 2)
+    
+    start = time.perf_counter()
+    pairs = record["pair_counts"]
+    source_counts = Counter()
+    for pair in pairs:
+        source_counts[pair["source_subreddit"]] += pair["crosspost_count"]
+    paths = sorted((pair for pair in pairs if pair["source_subreddit"] != pair["dest_subreddit"]),
+                   key=lambda pair: pair["crosspost_count"], reverse=True)
+    results = {
+        "top_posts": record["top_posts"],
+        "top_sources": [{"subreddit": name, "crosspost_count": count} for name, count in source_counts.most_common(10)],
+        "top_paths": paths[:15],
+        "examples": record["examples"],
+        "subreddit_count": record["subreddit_count"],
+        "crosspost_count": record["crosspost_count"],
+        "subreddit_connections": len(paths)
+    }
+    timings["aggregation"] = round((time.perf_counter() - start) * 1000, 2)
+    
+    _analysis_cache[version] = results
+    if cache_path:
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(results, f)
+        os.replace(tmp_path, cache_path)
+    return {**results, "version": version, "cached": False, "timings": timings}
+
+def analyze_crosspost_network(store, cache_dir=None):
     """
     Run subreddit-focused analysis on the crosspost network
     """
     print("\n=== SUBREDDIT CROSSPOST ANALYSIS ===")
     
+    results = fetch_crosspost_analysis(store, cache_dir=cache_dir)
+    
     # Overall top crossposted posts regardless of subreddit
     print("\nTop posts by crosspost count (across all subreddits):")
-    result = graph.run("""
-        MATCH (p:Post)<-[r:CROSSPOST_OF]-() 
-        WITH p, COUNT(r) AS crosspost_count
-        ORDER BY crosspost_count DESC
-        LIMIT 10
-        RETURN p.id AS post_id, p.title AS title, p.author AS author, 
-               p.score AS score, crosspost_count,
-               [(p)-[:POSTED_IN]->(s) | s.name][0] AS original_subreddit,
-               [(p)<-[:CROSSPOST_OF]-(repost)-[:POSTED_IN]->(dest) | dest.name] AS crossposted_to
-    """)
-    
-    for record in result:
+    for record in results["top_posts"]:
         destinations = list(set(record["crossposted_to"])) 
         top_destinations = destinations[:5] if len(destinations) > 5 else destinations
         more_count = len(destinations) - len(top_destinations)
@@ -258,199 +496,240 @@ def analyze_crosspost_network(graph):
     
     # Subreddits with the most crossposted content
     print("\nSubreddits with most crossposted content (sources):")
-    result = graph.run("""
-        MATCH (source:Subreddit)<-[:FROM_SUBREDDIT]-(c:Crosspost)
-        WITH source, COUNT(c) AS crosspost_count
-        ORDER BY crosspost_count DESC
-        LIMIT 10
-        RETURN source.name AS subreddit, crosspost_count
-    """)
-    
-    for record in result:
+    for record in results["top_sources"]:
         print(f"  r/{record['subreddit']}: {record['crosspost_count']} crossposts from this subreddit")
     
     #  Most active crosspost paths between subreddits
     print("\nMost active crosspost paths between subreddits:")
-    result = graph.run("""
-        MATCH (source:Subreddit)<-[:FROM_SUBREDDIT]-(c:Crosspost)-[:TO_SUBREDDIT]->(dest:Subreddit)
-        WHERE source.name <> dest.name
-        WITH source.name AS source_subreddit, dest.name AS dest_subreddit, COUNT(c) AS crosspost_count
-        ORDER BY crosspost_count DESC
-        LIMIT 15
-        RETURN source_subreddit, dest_subreddit, crosspost_count
-    """)
-    
-    for record in result:
+    for record in results["top_paths"]:
         print(f"  r/{record['source_subreddit']} → r/{record['dest_subreddit']}: {record['crosspost_count']} crossposts")
     
     #  Individual examples of crossposts
     print("\nExamples of individual crossposts:")
-    result = graph.run("""
-        MATCH (c:Crosspost)
-        MATCH (c)-[:FROM_SUBREDDIT]->(source:Subreddit)
-        MATCH (c)-[:TO_SUBREDDIT]->(dest:Subreddit)
-        WHERE source.name <> dest.name
-        RETURN c.title AS title, c.author AS author, source.name AS from_subreddit, dest.name AS to_subreddit
-        LIMIT 10
-    """)
-    
-    for record in result:
+    for record in results["examples"]:
         print(f"  '{record['title']}' by u/{record['author']}")
         print(f"    From r/{record['from_subreddit']} to r/{record['to_subreddit']}")
     
     # Summary stats
-    result = graph.run("""
-        MATCH (s:Subreddit)
-        RETURN COUNT(s) AS subreddit_count
-    """).data()[0]
     print(f"\nSummary statistics:")
-    print(f"  Total subreddits: {result['subreddit_count']}")
+    print(f"  Total subreddits: {results['subreddit_count']}")
+    print(f"  Total crosspost relationships: {results['crosspost_count']}")
+    print(f"  Unique subreddit connections: {results['subreddit_connections']}")
     
-    result = graph.run("""
-        MATCH (c:Crosspost)
-        RETURN COUNT(c) AS crosspost_count
-    """).data()[0]
-    print(f"  Total crosspost relationships: {result['crosspost_count']}")
-    
-    result = graph.run("""
-        MATCH (source:Subreddit)<-[:FROM_SUBREDDIT]-(c:Crosspost)-[:TO_SUBREDDIT]->(dest:Subreddit)
-        WHERE source.name <> dest.name
-        RETURN COUNT(DISTINCT [source.name, dest.name]) AS subreddit_connections
-    """).data()[0]
-    print(f"  Unique subreddit connections: {result['subreddit_connections']}")
+    timing_text = ", ".join(f"{name} {ms:.0f} ms" for name, ms in results["timings"].items())
+    print(f"\nAnalysis queries ({'cached' if results['cached'] else 'fresh'}, graph {results['version']}): {timing_text}")
+    return results
 
-def export_for_visualization(graph, output_file="reddit_crosspost_network.graphml"):
+def export_for_visualization(store, output_file="reddit_crosspost_network.graphml",
+                             compact_file="reddit_crosspost_network.csr.json", write_msgpack=False):
     """
     Export the full crosspost network to GraphML format for visualization in tools like Gephi
     Includes all individual crosspost nodes connecting source and destination subreddits
+    Rows are streamed straight from Cypher into the GraphML file and a compact CSR JSON
+    (plus MessagePack when write_msgpack is set); no NetworkX graph is built.
+    Returns the compact network; use graph_from_compact() when a NetworkX graph is needed.
     """
     print(f"\nExporting complete crosspost network for visualization...")
     
-    # Create a NetworkX graph
-    G = nx.DiGraph()
-    
-    subreddit_result = graph.run("""
-        MATCH (s:Subreddit)
-        OPTIONAL MATCH (s)<-[:FROM_SUBREDDIT]-(c1:Crosspost)
-        WITH s, COUNT(c1) AS source_count
-        OPTIONAL MATCH (s)<-[:TO_SUBREDDIT]-(c2:Crosspost)
-        WITH s, source_count, COUNT(c2) AS dest_count
-        RETURN s.name AS name, source_count, dest_count, s.subscribers AS subscribers
+    # Subreddit analytics over the aggregated CROSSPOST_FROM (dest -> source) weights,
+    # turned around so edges follow the crosspost from the original subreddit
+    weight_result = store.read("""
+        MATCH (dest:Subreddit)-[r:CROSSPOST_FROM]->(source:Subreddit)
+        RETURN source.name AS source, dest.name AS dest, r.weight AS weight
     """)
-    
-    for record in subreddit_result:
-        name = record["name"]
-        source_count = record["source_count"]
-        dest_count = record["dest_count"]
+    from graph_analytics import subreddit_metrics
+    metrics, analytics = subreddit_metrics((r["source"], r["dest"], r["weight"] or 1) for r in weight_result)
+    print(f"Computed subreddit analytics: {analytics['communities']} communities, "
+          f"modularity {analytics['modularity']}")
+    
+    compact_builder = CompactGraphBuilder()
+    subreddit_count = 0
+    crosspost_count = 0
+    seen_crossposts = set()
+    
+    with GraphMLStreamWriter(output_file) as graphml:
+        subreddit_result = store.stream("""
+            MATCH (s:Subreddit)
+            OPTIONAL MATCH (s)<-[:FROM_SUBREDDIT]-(c1:Crosspost)
+            WITH s, COUNT(c1) AS source_count
+            OPTIONAL MATCH (s)<-[:TO_SUBREDDIT]-(c2:Crosspost)
+            WITH s, source_count, COUNT(c2) AS dest_count
+            RETURN s.name AS name, source_count, dest_count, s.subscribers AS subscribers
+        """)
         
-        G.add_node(
-            f"sub_{name}", 
-            type="subreddit",
-            label=f"r/{name}",
-            source_count=source_count,
-            dest_count=dest_count,
-            subscribers=record["subscribers"] or 0,
-            size=10 + source_count + dest_count 
-        )
-    
-    crosspost_result = graph.run("""
-        MATCH (c:Crosspost)
-        MATCH (c)-[:FROM_SUBREDDIT]->(source:Subreddit)
-        MATCH (c)-[:TO_SUBREDDIT]->(dest:Subreddit)
-        WHERE source.name <> dest.name
-        RETURN c.id AS id, c.title AS title, c.author AS author, 
-               source.name AS source_subreddit, dest.name AS dest_subreddit
-    """)
-    
-    for record in crosspost_result:
-        crosspost_id = record["id"]
-        source = record["source_subreddit"]
-        dest = record["dest_subreddit"]
+        for record in subreddit_result:
+            name = record["name"]
+            source_count = record["source_count"]
+            dest_count = record["dest_count"]
+            
+            attrs = dict(
+                type="subreddit",
+                label=f"r/{name}",
+                source_count=source_count,
+                dest_count=dest_count,
+                subscribers=record["subscribers"] or 0,
+                size=10 + source_count + dest_count,
+                **metrics.get(name, {})
+            )
+            graphml.add_node(f"sub_{name}", **attrs)
+            compact_builder.add_node(f"sub_{name}", **attrs)
+            subreddit_count += 1
         
-        G.add_node(
-            f"cp_{crosspost_id}", 
-            type="crosspost",
-            label=record["title"][:20] + "..." if len(record["title"]) > 20 else record["title"],
-            title=record["title"],
-            author=record["author"],
-            size=5  
-        )
+        crosspost_result = store.stream("""
+            MATCH (c:Crosspost)
+            MATCH (c)-[:FROM_SUBREDDIT]->(source:Subreddit)
+            MATCH (c)-[:TO_SUBREDDIT]->(dest:Subreddit)
+            WHERE source.name <> dest.name
+            RETURN c.id AS id, c.title AS title, c.author AS author, 
+                   source.name AS source_subreddit, dest.name AS dest_subreddit
+        """)
         
-        G.add_edge(f"cp_{crosspost_id}", f"sub_{source}", type="from_subreddit")
-        G.add_edge(f"cp_{crosspost_id}", f"sub_{dest}", type="to_subreddit")
-    
-    # Write to GraphML format
-    nx.write_graphml(G, output_file)
+        for record in crosspost_result:
+            crosspost_id = record["id"]
+            if crosspost_id in seen_crossposts:
+                continue
+            seen_crossposts.add(crosspost_id)
+            node_id = f"cp_{crosspost_id}"
+            
+            attrs = dict(
+                type="crosspost",
+                label=record["title"][:20] + "..." if len(record["title"]) > 20 else record["title"],
+                title=record["title"],
+                author=record["author"],
+                size=5  
+            )
+            graphml.add_node(node_id, **attrs)
+            compact_builder.add_node(node_id, **attrs)
+            
+            for target, edge_type in [(f"sub_{record['source_subreddit']}", "from_subreddit"),
+                                      (f"sub_{record['dest_subreddit']}", "to_subreddit")]:
+                graphml.add_edge(node_id, target, type=edge_type)
+                compact_builder.add_edge(node_id, target, type=edge_type)
+            crosspost_count += 1
     
-    crosspost_count = len([n for n in G.nodes() if G.nodes[n]["type"] == "crosspost"])
-    subreddit_count = len([n for n in G.nodes() if G.nodes[n]["type"] == "subreddit"])
+    compact = compact_builder.build()
+    compact_outputs = write_compact(compact, compact_file, write_msgpack=write_msgpack)
     
     print(f"Exported network with {subreddit_count} subreddits and {crosspost_count} crosspost nodes")
     print(f"Network saved to {output_file} for visualization in Gephi or other tools")
+    print(f"Compact network saved to {', '.join(compact_outputs)}")
+    
+    return compact
+
+def aggregate_crosspost_graph(G, expand_top=0):
+    """
+    Collapse individual crosspost nodes into weighted subreddit -> subreddit edges
+    (the same aggregate as the CROSSPOST_FROM relationships in Neo4j).
+    The expand_top heaviest edges keep their individual crosspost nodes instead.
+    """
+    import networkx as nx
+    A = nx.DiGraph(crosspost_count=0)
+    for node, attrs in G.nodes(data=True):
+        if attrs.get("type") == "subreddit":
+            A.add_node(node, **attrs)
+    
+    pairs = {}
+    for node, attrs in G.nodes(data=True):
+        if attrs.get("type") != "crosspost":
+            continue
+        source = dest = None
+        for _, target, edge_attrs in G.out_edges(node, data=True):
+            if edge_attrs.get("type") == "from_subreddit":
+                source = target
+            elif edge_attrs.get("type") == "to_subreddit":
+                dest = target
+        if source is not None and dest is not None:
+            pairs.setdefault((source, dest), []).append(node)
+    
+    ranked = sorted(pairs.items(), key=lambda item: len(item[1]), reverse=True)
+    for rank, ((source, dest), crossposts) in enumerate(ranked):
+        A.graph["crosspost_count"] += len(crossposts)
+        if rank < expand_top:
+            for crosspost in crossposts:
+                A.add_node(crosspost, **G.nodes[crosspost])
+                A.add_edge(crosspost, source, type="from_subreddit")
+                A.add_edge(crosspost, dest, type="to_subreddit")
+        else:
+            A.add_edge(source, dest, type="crosspost", weight=len(crossposts), crossposts=crossposts)
     
-    return G
+    print(f"Aggregated {A.graph['crosspost_count']} crossposts into {len(ranked)} subreddit connections"
+          + (f" ({min(expand_top, len(ranked))} expanded)" if expand_top else ""))
+    return A
 
-def visualize_network(G, output_file="reddit_crosspost_network.png"):
+def export_level_of_detail(G, output_file="reddit_crosspost_lod.json", layout="auto", layout_cache_dir=None,
+                           level_sizes=(50, 200, 1000)):
+    """
+    Write a compact subreddit-level network the frontend can render progressively.
+    Nodes carry precomputed positions; edges are [source_index, target_index, weight]
+    sorted by weight and split into levels, so level 0 holds the heaviest connections
+    and each further level adds finer detail. Remaining edges go into a final level.
+    """
+    A = aggregate_crosspost_graph(G)
+    pos = compute_layout(A, engine=layout, cache_dir=layout_cache_dir, seed=42, kind="lod")
+    
+    nodes = list(A.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = sorted(((index[u], index[v], d["weight"]) for u, v, d in A.edges(data=True)),
+                   key=lambda edge: edge[2], reverse=True)
+    
+    levels = []
+    start = 0
+    for size in list(level_sizes) + [len(edges)]:
+        if start >= len(edges):
+            break
+        chunk = edges[start:start + size]
+        levels.append({"min_weight": chunk[-1][2], "edges": [list(edge) for edge in chunk]})
+        start += len(chunk)
+    
+    lod = {
+        "nodes": [{
+            "id": A.nodes[node].get("label", node).replace("r/", "", 1),
+            "x": round(float(pos[node][0]), 4),
+            "y": round(float(pos[node][1]), 4),
+            "size": A.nodes[node].get("size", 10)
+        } for node in nodes],
+        "levels": levels,
+        "stats": {
+            "subreddits": len(nodes),
+            "connections": len(edges),
+            "crossposts": A.graph["crosspost_count"]
+        }
+    }
+    
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(lod, f, separators=(",", ":"))
+    
+    print(f"Level-of-detail network with {len(levels)} levels saved to {output_file}")
+    return lod
+
+def visualize_network(G, output_file="reddit_crosspost_network.png", layout="auto", layout_cache_dir=None,
+                      formats=("png", "svg"), wait=True, layout_kind="render"):
     """
     Create a visualization of the complete crosspost network
     Shows subreddits and all individual crosspost nodes
+    layout picks the engine from layout.py; layout_cache_dir enables cached and incremental layouts,
+    seeded from the previous layout of the same layout_kind
+    The layout is computed here and each format is rendered in its own process by renderer.py.
+    Returns the written files, or with wait=False the NetworkRenderer to wait() on later.
     """
-    print(f"\nCreating visualization of all crosspost relationships...")
-    
-    plt.figure(figsize=(24, 18), dpi=300)
-    
-    subreddit_nodes = [n for n in G.nodes() if G.nodes[n].get("type") == "subreddit"]
-    crosspost_nodes = [n for n in G.nodes() if G.nodes[n].get("type") == "crosspost"]
-    
-    print(f"Visualizing {len(subreddit_nodes)} subreddits and {len(crosspost_nodes)} crossposts")
-    
-    print("Calculating network layout (this may take a while)...")
-    pos = nx.spring_layout(G, k=0.3, iterations=100, seed=42)
-    
-    from_edges = [(u, v) for u, v in G.edges() if "from_subreddit" in G.edges[u, v].get("type", "")]
-    to_edges = [(u, v) for u, v in G.edges() if "to_subreddit" in G.edges[u, v].get("type", "")]
-    
-    nx.draw_networkx_edges(G, pos, edgelist=from_edges, alpha=0.4, edge_color="green", arrows=True, width=0.8)
-    nx.draw_networkx_edges(G, pos, edgelist=to_edges, alpha=0.4, edge_color="red", arrows=True, width=0.8)
-    
-    subreddit_sizes = [G.nodes[n].get("size", 10) * 10 for n in subreddit_nodes] 
-    nx.draw_networkx_nodes(G, pos, nodelist=subreddit_nodes, node_size=subreddit_sizes, 
-                           node_color="skyblue", alpha=0.8, edgecolors="black", linewidths=1)
+    print(f"\nCreating visualization of crosspost relationships...")
     
-    nx.draw_networkx_nodes(G, pos, nodelist=crosspost_nodes, node_size=30, 
-                           node_color="orange", alpha=0.6)
+    subreddit_count = sum(1 for n in G.nodes() if G.nodes[n].get("type") == "subreddit")
+    crosspost_count = sum(1 for n in G.nodes() if G.nodes[n].get("type") == "crosspost")
+    print(f"Visualizing {subreddit_count} subreddits and {crosspost_count} crossposts")
     
-    labels = {n: G.nodes[n].get("label", n) for n in subreddit_nodes}
-    nx.draw_networkx_labels(G, pos, labels=labels, font_size=10, font_weight="bold")
+    print("Calculating network layout...")
+    with span("layout", items=G.number_of_nodes()):
+        pos = compute_layout(G, engine=layout, cache_dir=layout_cache_dir, seed=42, kind=layout_kind)
     
-    plt.plot([0], [0], 'o', color='skyblue', markersize=10, label='Subreddit')
-    plt.plot([0], [0], 'o', color='orange', markersize=5, label='Crosspost')
-    plt.plot([0], [0], '-', color='green', linewidth=2, label='From Subreddit')
-    plt.plot([0], [0], '-', color='red', linewidth=2, label='To Subreddit')
-    plt.legend(loc='upper left', fontsize=12)
+    renderer = NetworkRenderer()
+    renderer.submit(G, pos, os.path.splitext(output_file)[0], list(formats))
+    if not wait:
+        return renderer
     
-    subreddit_count = len(subreddit_nodes)
-    crosspost_count = len(crosspost_nodes)
-    
-    plt.suptitle(f"Reddit Crosspost Network: {crosspost_count} Crossposts Between {subreddit_count} Subreddits", 
-                 fontsize=24, y=0.98)
-    
-    plt.figtext(0.5, 0.01, 
-                "Each orange node represents an individual crosspost connecting two subreddits.\n" +
-                "Green lines show the original subreddit, red lines show the destination subreddit.", 
-                ha='center', fontsize=14)
-    
-    plt.axis('off')
-    plt.tight_layout()
-    
-    plt.savefig(output_file, dpi=300, bbox_inches="tight")
-    
-    svg_file = os.path.splitext(output_file)[0] + ".svg"
-    plt.savefig(svg_file, format="svg", bbox_inches="tight")
-    
-    print(f"Visualization saved to {output_file} and {svg_file}")
-    
-    return plt
+    written = renderer.wait()
+    print(f"Visualization saved to {', '.join(written)}")
+    return written
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Reddit Crosspost Network Analysis - All Crossposts")
@@ -458,11 +737,33 @@ if __name__ == "__main__":
     parser.add_argument("--neo4j-uri", default="neo4j+s://8bc46ceb.databases.neo4j.io", help="Neo4j URI")
     parser.add_argument("--neo4j-user", default="neo4j", help="Neo4j username")
     parser.add_argument("--neo4j-password", default="RximALodxdQCU-1wGEd8KAQvSTkRnoFuiadWb86ElxY", help="Neo4j password")
+    parser.add_argument("--graph-backend", choices=GRAPH_BACKENDS,
+                        help="Neo4j client: py2neo or neo4j (official driver); default GRAPH_BACKEND or py2neo")
+    parser.add_argument("--pool-size", type=int, help="Maximum Neo4j connections in the pool")
+    parser.add_argument("--fetch-size", type=int, help="Records fetched per batch when streaming (neo4j backend)")
     parser.add_argument("--skip-import", action="store_true", help="Skip data import and use existing database")
     parser.add_argument("--analysis-only", action="store_true", help="Only run analysis on existing database")
     parser.add_argument("--output-dir", default=".", help="Directory for output files")
+    parser.add_argument("--layout", default="auto", choices=["auto"] + list(LAYOUT_ENGINES),
+                        help="Layout engine: spring (networkx), force (grid-approximated, for large graphs) or auto")
+    parser.add_argument("--layout-cache", default=".layout_cache",
+                        help="Directory for cached layouts, relative to the repository directory ('' disables caching)")
+    parser.add_argument("--msgpack", action="store_true", help="Also write the compact network as MessagePack")
+    parser.add_argument("--render", default="both", choices=list(RENDER_MODES),
+                        help="Images to render: both (PNG and SVG), raster (PNG), vector (SVG) or none")
+    parser.add_argument("--render-mode", default="full", choices=["full", "aggregate"],
+                        help="Draw every crosspost as a node (full) or subreddit-to-subreddit edges (aggregate)")
+    parser.add_argument("--expand-top", type=int, default=0,
+                        help="In aggregate mode, keep individual crossposts for the N busiest connections")
+    parser.add_argument("--analysis-cache", default=".analysis_cache",
+                        help="Directory for cached analysis results, relative to the repository directory ('' disables caching)")
+    parser.add_argument("--window", default="day", choices=list(WINDOW_SECONDS),
+                        help="Time window for the temporal crosspost network")
+    parser.add_argument("--temporal-retention", type=float,
+                        help="Days of temporal windows to keep, counted back from the newest crosspost (default: all)")
     
     args = parser.parse_args()
+    start_session()
     start_time = time.time()
     
     output_dir = args.output_dir
@@ -472,31 +773,63 @@ if __name__ == "__main__":
     graphml_path = os.path.join(output_dir, "reddit_crosspost_network.graphml")
     png_path = os.path.join(output_dir, "reddit_crosspost_network.png")
     json_path = os.path.join(output_dir, "reddit_crosspost_network.json")
-    
-    # Connect to Neo4j
+    lod_path = os.path.join(output_dir, "reddit_crosspost_lod.json")
+    compact_path = os.path.join(output_dir, "reddit_crosspost_network.csr.json")
+    temporal_path = os.path.join(output_dir, "reddit_crosspost_temporal.json")
+    cascades_path = os.path.join(output_dir, "reddit_crosspost_cascades.json")
+    
+    # Connect to Neo4j once; the same pool serves import, analysis and export
+    store = connect_graph_store(args.graph_backend, uri=args.neo4j_uri, user=args.neo4j_user,
+                                password=args.neo4j_password, pool_size=args.pool_size, fetch_size=args.fetch_size)
     if args.analysis_only:
-        print("Connecting to Neo4j for analysis only...")
-        graph = Graph(args.neo4j_uri, auth=(args.neo4j_user, args.neo4j_password))
+        print("Running analysis only...")
     elif args.skip_import:
-        print("Connecting to existing database...")
-        graph = Graph(args.neo4j_uri, auth=(args.neo4j_user, args.neo4j_password))
+        print("Using existing database...")
     else:
-        graph = create_reddit_crosspost_graph(
+        create_reddit_crosspost_graph(
             args.input,
-            neo4j_uri=args.neo4j_uri,
-            neo4j_user=args.neo4j_user, 
-            neo4j_password=args.neo4j_password,
-            top_posts_limit=None 
+            top_posts_limit=None,
+            json_output=json_path,
+            temporal_output=temporal_path,
+            temporal_window=args.window,
+            temporal_retention=args.temporal_retention,
+            cascade_output=cascades_path,
+            store=store
         )
     
-    analyze_crosspost_network(graph)
+    analysis_cache_dir = os.path.join(BASE_DIR, args.analysis_cache) if args.analysis_cache else None
+    with span("neo4j_analysis"):
+        analyze_crosspost_network(store, cache_dir=analysis_cache_dir)
+    
+    with span("neo4j_export"):
+        compact = export_for_visualization(store, output_file=graphml_path, compact_file=compact_path,
+                                           write_msgpack=args.msgpack)
+    store.close()
+    G = graph_from_compact(compact)
+    
+    layout_cache_dir = os.path.join(BASE_DIR, args.layout_cache) if args.layout_cache else None
     
-    G = export_for_visualization(graph, output_file=graphml_path)
+    # Images render in worker processes while the level-of-detail export runs here
+    renderer = None
+    if RENDER_MODES[args.render]:
+        render_graph = aggregate_crosspost_graph(G, expand_top=args.expand_top) if args.render_mode == "aggregate" else G
+        renderer = visualize_network(render_graph, output_file=png_path, layout=args.layout,
+                                     layout_cache_dir=layout_cache_dir, formats=RENDER_MODES[args.render], wait=False,
+                                     layout_kind=f"render_{args.render_mode}")
     
-    plt = visualize_network(G, output_file=png_path)
+    with span("lod_export", items=G.number_of_nodes()):
+        export_level_of_detail(G, output_file=lod_path, layout=args.layout, layout_cache_dir=layout_cache_dir)
     
+    rendered = renderer.wait() if renderer else []
  
     print(f"\nTotal script execution time: {time.time() - start_time:.2f} seconds")
     print(f"\nOutputs:")
-    print(f"- Network Visualization: {png_path}")
+    for image_path in rendered:
+        print(f"- Network Visualization: {image_path}")
     print(f"- GraphML Network File: {graphml_path}")
+    print(f"- Compact Network File: {compact_path}")
+    if not (args.analysis_only or args.skip_import):
+        print(f"- Crosspost Network JSON: {json_path}")
+        print(f"- Temporal Crosspost Network: {temporal_path}")
+        print(f"- Crosspost Cascades: {cascades_path}")
+    print(f"- Level-of-Detail Network: {lod_path}")
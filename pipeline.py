@@ -0,0 +1,117 @@
+import argparse
+import json
+import os
+from dataclasses import dataclass, field
+
+import analysis1
+from graph_store import GRAPH_BACKENDS, connect_graph_store
+from network import create_reddit_crosspost_graph, discover_crossposts, write_crosspost_outputs
+from profiling import DETAIL_MODES, span, start_session
+from temporal_network import WINDOW_SECONDS
+
+# Steps fed from the one parsed dump; "llm" sends it to Gemini, so it only runs when asked for
+PIPELINE_STEPS = ["analysis", "crossposts", "graph", "llm"]
+DEFAULT_STEPS = ["analysis", "crossposts"]
+
+
+@dataclass
+class PipelineConfig:
+    input_file: str = "input.json"
+    steps: list = field(default_factory=lambda: list(DEFAULT_STEPS))
+    # Crosspost network, temporal index and cascade files go here
+    output_dir: str = "."
+    temporal_window: str = "day"
+    # Days of temporal windows to keep; None keeps them all
+    temporal_retention: float = None
+    analysis: analysis1.AnalysisConfig = field(default_factory=analysis1.AnalysisConfig)
+    graph_backend: str = None
+
+
+@dataclass
+class PipelineResult:
+    post_count: int
+    analysis: analysis1.AnalysisResult = None
+    crosspost_count: int = None
+    timings: dict = field(default_factory=dict)
+
+
+def load_dump(input_file):
+    """Read and decode the Reddit dump; every step shares the returned list"""
+    print(f"Loading data from {input_file}...")
+    with open(input_file, "r") as f:
+        return json.load(f)
+
+
+def run(config=None):
+    """
+    Full refresh from one read of the dump: analysis1 featurization and report,
+    crosspost discovery (network JSON, temporal index, cascades), optionally the
+    Neo4j import and the Gemini batches, all fed the same parsed posts.
+    """
+    config = config or PipelineConfig()
+    unknown = [step for step in config.steps if step not in PIPELINE_STEPS]
+    if unknown:
+        raise ValueError(f"Unknown pipeline steps: {', '.join(unknown)}")
+    timings = {}
+
+    def timed(step, func, *args, **kwargs):
+        with span(f"pipeline.{step}") as record:
+            value = func(*args, **kwargs)
+        timings[step] = round(record.wall, 3)
+        return value
+
+    posts = timed("load", load_dump, config.input_file)
+    result = PipelineResult(post_count=len(posts), timings=timings)
+
+    if "analysis" in config.steps:
+        result.analysis = timed("analysis", analysis1.run, config.analysis, posts=posts)
+
+    outputs = {
+        "json_output": os.path.join(config.output_dir, "reddit_crosspost_network.json"),
+        "temporal_output": os.path.join(config.output_dir, "reddit_crosspost_temporal.json"),
+        "temporal_window": config.temporal_window,
+        "temporal_retention": config.temporal_retention,
+        "cascade_output": os.path.join(config.output_dir, "reddit_crosspost_cascades.json")
+    }
+    if "graph" in config.steps:
+        # The import runs its own discovery over the same posts and writes the same files
+        with connect_graph_store(config.graph_backend) as store:
+            timed("graph", create_reddit_crosspost_graph, config.input_file, store=store, posts=posts, **outputs)
+    elif "crossposts" in config.steps:
+        def crossposts():
+            with span("crosspost_discovery", items=len(posts)):
+                crosspost_info, sorted_pairs, subreddit_subscribers = discover_crossposts(posts)
+            with span("crosspost_outputs", items=len(crosspost_info)):
+                write_crosspost_outputs(posts, crosspost_info, sorted_pairs, subreddit_subscribers, **outputs)
+            return len(crosspost_info)
+        result.crosspost_count = timed("crossposts", crossposts)
+
+    if "llm" in config.steps:
+        from script import generate
+        timed("llm", generate, all_data=posts)
+
+    print("Pipeline step timings: " + ", ".join(f"{step} {seconds:.2f}s" for step, seconds in timings.items()))
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run every stage of the Reddit refresh from a single parse of the dump")
+    parser.add_argument("--input", default="input.json", help="Reddit listing dump")
+    parser.add_argument("--steps", nargs="+", default=DEFAULT_STEPS, choices=PIPELINE_STEPS,
+                        help="Steps to run; graph imports into Neo4j (and covers crossposts), llm calls Gemini")
+    parser.add_argument("--output-dir", default=".", help="Directory for the crosspost network outputs")
+    parser.add_argument("--window", default="day", choices=list(WINDOW_SECONDS),
+                        help="Time window for the temporal crosspost index")
+    parser.add_argument("--temporal-retention", type=float,
+                        help="Days of temporal windows to keep, counted back from the newest crosspost (default: all)")
+    parser.add_argument("--graph-backend", choices=GRAPH_BACKENDS, help="Graph store backend for the graph step")
+    parser.add_argument("--trace", help="Write a JSON profiling trace of every stage to this file")
+    parser.add_argument("--profile-stage", help="Also run this span under cProfile or tracemalloc, e.g. analysis1.featurize")
+    parser.add_argument("--profile-mode", choices=DETAIL_MODES, help="Profiler for --profile-stage (default cprofile)")
+    args = parser.parse_args()
+
+    start_session(trace_file=args.trace, detail_stage=args.profile_stage, detail_mode=args.profile_mode)
+
+    run(PipelineConfig(input_file=args.input, steps=args.steps, output_dir=args.output_dir,
+                       temporal_window=args.window, temporal_retention=args.temporal_retention,
+                       graph_backend=args.graph_backend))
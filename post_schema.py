@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+# Dtypes of the processed posts DataFrame. Repeated strings become categoricals
+# (stored once, rows hold small integer codes), numbers use fixed-width types.
+CATEGORY_COLUMNS = ['subreddit', 'author', 'domain', 'categories']
+FLOAT_COLUMNS = [
+    'upvote_ratio',
+    'title_sentiment', 'content_sentiment', 'combined_sentiment',
+    'title_subjectivity', 'content_subjectivity', 'combined_subjectivity'
+]
+INT_COLUMNS = ['score', 'ups', 'downs', 'num_comments']
+BOOL_COLUMNS = ['is_crosspost', 'over_18', 'stickied']
+# Keywords are mostly unique per post, so they stay a list per row rather than a categorical
+LIST_COLUMNS = ['keywords']
+
+ORDERED_DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+LIST_SEPARATOR = ', '
+# Decimal places kept when float32 columns are written to JSON
+EXPORT_PRECISION = 4
+
+
+def apply_schema(df):
+    """Cast the columns of a processed posts frame to their compact dtypes, in place"""
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].fillna('').astype(str).astype('category')
+    for column in FLOAT_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('float32')
+    for column in INT_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce').fillna(0).astype('int32')
+    for column in BOOL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].fillna(False).astype(bool)
+    return df
+
+
+def add_time_columns(df):
+    """date, day_of_week (ordered categorical) and hour_of_day (int8) from created_utc"""
+    if 'created_utc' not in df.columns or df['created_utc'].isnull().all():
+        return df
+    created = pd.to_datetime(df['created_utc'])
+    df['date'] = created.dt.date
+    df['day_of_week'] = pd.Categorical(created.dt.day_name(), categories=ORDERED_DAYS, ordered=True)
+    df['hour_of_day'] = created.dt.hour.astype('Int8' if created.isnull().any() else 'int8')
+    return df
+
+
+def build_posts_frame(records):
+    """
+    Build the posts DataFrame from processed post dicts. 'categories' and
+    'keywords' may be lists; categories are stored as one categorical of the
+    joined combination (a handful of distinct values), keywords as lists.
+    """
+    df = pd.DataFrame(records)
+    if 'categories' in df.columns:
+        df['categories'] = [LIST_SEPARATOR.join(value) if isinstance(value, list) else value
+                            for value in df['categories']]
+    for column in LIST_COLUMNS:
+        if column in df.columns:
+            df[column] = [value if isinstance(value, list) else
+                          [item for item in str(value).split(LIST_SEPARATOR) if item] if isinstance(value, str) else []
+                          for value in df[column]]
+    apply_schema(df)
+    return add_time_columns(df)
+
+
+def category_matrix(df, column='categories'):
+    """
+    Multi-hot encoding of a comma-joined category column: one bool column per
+    category. Only the distinct combinations are split; rows pick theirs by code.
+    """
+    values = df[column].astype('category')
+    combos = values.cat.categories.to_series().str.get_dummies(sep=LIST_SEPARATOR)
+    combos = combos.loc[:, combos.columns != '']
+    # Missing values have code -1, which picks the all-False row appended last
+    lookup = np.vstack([combos.to_numpy(dtype=bool), np.zeros((1, combos.shape[1]), dtype=bool)])
+    return pd.DataFrame(lookup[values.cat.codes.to_numpy()], index=df.index, columns=combos.columns)
+
+
+def flat_frame(df):
+    """Copy with list columns joined back into strings, for CSV output"""
+    flat = df.copy()
+    for column in LIST_COLUMNS:
+        if column in flat.columns:
+            flat[column] = flat[column].map(LIST_SEPARATOR.join)
+    return flat
+
+
+def export_floats(series):
+    """float32 values as plain, rounded Python floats for JSON output"""
+    return series.astype('float64').round(EXPORT_PRECISION).tolist()
+
+
+def memory_usage(df):
+    """Deep memory footprint of a frame in bytes"""
+    return int(df.memory_usage(deep=True).sum())
@@ -0,0 +1,240 @@
+import atexit
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Individual span records kept per name in the trace; the summary counts every call
+MAX_EVENTS_PER_SPAN = 100
+DETAIL_MODES = ["cprofile", "tracemalloc"]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None where unsupported)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class SpanRecord:
+    def __init__(self, name, parent, items):
+        self.name = name
+        self.parent = parent
+        self.items = items
+        self.start = time.time()
+        self.wall = None
+        self.cpu = None
+        self.peak_rss_mb = None
+        self.rss_growth_mb = None
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "parent": self.parent,
+            "start": round(self.start, 6),
+            "wall": round(self.wall, 6),
+            "cpu": round(self.cpu, 6),
+            "items": self.items,
+            "peak_rss_mb": self.peak_rss_mb,
+            "rss_growth_mb": self.rss_growth_mb
+        }
+
+
+class Profiler:
+    """
+    Collects named spans: wall time, CPU time, peak RSS and item counts.
+    Repeated spans with the same name (e.g. one per post) are summed in the
+    summary. With detail_stage set, that span also runs under cProfile or
+    tracemalloc.
+    """
+
+    def __init__(self, detail_stage=None, detail_mode="cprofile"):
+        if detail_mode not in DETAIL_MODES:
+            raise ValueError(f"Unknown profiling mode '{detail_mode}'. Choose from: {', '.join(DETAIL_MODES)}")
+        self.detail_stage = detail_stage
+        self.detail_mode = detail_mode
+        self.summary = {}
+        self.events = {}
+        self.started = time.time()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._cprofile = None
+        self._tracemalloc_snapshot = None
+        self._tracemalloc_stats = None
+        self._detail_depth = 0
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name, items=None):
+        stack = self._stack()
+        record = SpanRecord(name, stack[-1] if stack else None, items)
+        stack.append(name)
+        detailed = name == self.detail_stage
+        if detailed:
+            self._start_detail()
+        rss_before = peak_rss_mb()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall = time.perf_counter() - wall_start
+            record.cpu = time.process_time() - cpu_start
+            record.peak_rss_mb = peak_rss_mb()
+            if rss_before is not None:
+                record.rss_growth_mb = round(record.peak_rss_mb - rss_before, 1)
+            if detailed:
+                self._stop_detail()
+            stack.pop()
+            self._add(record)
+
+    def _add(self, record):
+        with self._lock:
+            entry = self.summary.setdefault(record.name, {
+                "calls": 0, "wall": 0.0, "cpu": 0.0, "items": None, "peak_rss_mb": None, "rss_growth_mb": 0.0})
+            entry["calls"] += 1
+            entry["wall"] += record.wall
+            entry["cpu"] += record.cpu
+            if record.items is not None:
+                entry["items"] = (entry["items"] or 0) + record.items
+            if record.peak_rss_mb is not None:
+                entry["peak_rss_mb"] = max(entry["peak_rss_mb"] or 0, record.peak_rss_mb)
+                entry["rss_growth_mb"] += record.rss_growth_mb
+            events = self.events.setdefault(record.name, [])
+            if len(events) < MAX_EVENTS_PER_SPAN:
+                events.append(record.to_dict())
+
+    def _start_detail(self):
+        self._detail_depth += 1
+        if self._detail_depth > 1:
+            return
+        if self.detail_mode == "cprofile":
+            self._cprofile = self._cprofile or cProfile.Profile()
+            self._cprofile.enable()
+        else:
+            tracemalloc.start()
+            self._tracemalloc_snapshot = tracemalloc.take_snapshot()
+
+    def _stop_detail(self):
+        self._detail_depth -= 1
+        if self._detail_depth:
+            return
+        if self.detail_mode == "cprofile":
+            self._cprofile.disable()
+        else:
+            # Allocations still held when the stage ends; a repeated stage reports its last run
+            self._tracemalloc_stats = tracemalloc.take_snapshot().compare_to(self._tracemalloc_snapshot, "lineno")
+            self._tracemalloc_snapshot = None
+            tracemalloc.stop()
+
+    def detail_report(self, limit=20):
+        """Top functions (cProfile) or allocation sites (tracemalloc) of the detail stage"""
+        if self.detail_mode == "cprofile" and self._cprofile is not None:
+            output = io.StringIO()
+            pstats.Stats(self._cprofile, stream=output).sort_stats("cumulative").print_stats(limit)
+            return output.getvalue()
+        if self.detail_mode == "tracemalloc" and self._tracemalloc_stats is not None:
+            return "\n".join(str(stat) for stat in self._tracemalloc_stats[:limit])
+        return None
+
+    def to_dict(self):
+        return {
+            "started": self.started,
+            "total_wall": round(time.time() - self.started, 6),
+            "peak_rss_mb": peak_rss_mb(),
+            "spans": {name: {key: round(value, 6) if isinstance(value, float) else value
+                             for key, value in entry.items()}
+                      for name, entry in self.summary.items()},
+            "events": self.events
+        }
+
+    def summary_table(self):
+        rows = sorted(self.summary.items(), key=lambda item: item[1]["wall"], reverse=True)
+        lines = [f"{'span':<24}{'calls':>8}{'wall s':>10}{'cpu s':>10}{'items':>10}{'peak MB':>10}"]
+        for name, entry in rows:
+            items = "-" if entry["items"] is None else entry["items"]
+            peak = "-" if entry["peak_rss_mb"] is None else f"{entry['peak_rss_mb']:.1f}"
+            lines.append(f"{name:<24}{entry['calls']:>8}{entry['wall']:>10.3f}{entry['cpu']:>10.3f}"
+                         f"{items:>10}{peak:>10}")
+        return "\n".join(lines)
+
+    def write_trace(self, path):
+        if self.detail_mode == "cprofile" and self._cprofile is not None:
+            self._cprofile.dump_stats(os.path.splitext(path)[0] + ".prof")
+        tmp_file = path + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_file, path)
+
+
+# Process-wide profiler, so any module can open a span without threading an object through
+_profiler = Profiler()
+
+
+def get_profiler():
+    return _profiler
+
+
+def span(name, items=None):
+    """Time a block: with span("sentiment"): ..."""
+    return _profiler.span(name, items)
+
+
+def profiled(name=None):
+    """Decorator form of span, named after the function by default"""
+    def decorate(func):
+        span_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with _profiler.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def start_session(trace_file=None, detail_stage=None, detail_mode=None):
+    """
+    Start a fresh profiler for a CLI run. Unset arguments fall back to
+    PROFILE_TRACE, PROFILE_STAGE and PROFILE_MODE. At exit the summary table
+    is printed when anything was recorded, and the JSON trace is written
+    when a trace file is set.
+    """
+    global _profiler
+    trace_file = trace_file or os.getenv("PROFILE_TRACE")
+    detail_stage = detail_stage or os.getenv("PROFILE_STAGE")
+    detail_mode = detail_mode or os.getenv("PROFILE_MODE", "cprofile")
+    _profiler = Profiler(detail_stage=detail_stage, detail_mode=detail_mode)
+    profiler = _profiler
+
+    def finish():
+        if not profiler.summary:
+            return
+        print("\n" + profiler.summary_table())
+        detail = profiler.detail_report()
+        if detail:
+            print(f"\n{profiler.detail_mode} for stage '{profiler.detail_stage}':\n{detail}")
+        if trace_file:
+            profiler.write_trace(trace_file)
+            print(f"Profiling trace saved to {trace_file}")
+
+    atexit.register(finish)
+    return profiler
@@ -0,0 +1,145 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from profiling import span
+
+# Output formats a render mode produces; savefig options per format
+RENDER_MODES = {
+    "both": ["png", "svg"],
+    "raster": ["png"],
+    "vector": ["svg"],
+    "none": []
+}
+FORMAT_OPTIONS = {
+    "png": {"dpi": 300},
+    "svg": {}
+}
+
+
+def draw_network(G, pos):
+    """Draw the crosspost network onto a new matplotlib figure and return it"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import networkx as nx
+    import numpy as np
+
+    fig = plt.figure(figsize=(24, 18), dpi=300)
+
+    subreddit_nodes = [n for n in G.nodes() if G.nodes[n].get("type") == "subreddit"]
+    crosspost_nodes = [n for n in G.nodes() if G.nodes[n].get("type") == "crosspost"]
+
+    from_edges = [(u, v) for u, v in G.edges() if "from_subreddit" in G.edges[u, v].get("type", "")]
+    to_edges = [(u, v) for u, v in G.edges() if "to_subreddit" in G.edges[u, v].get("type", "")]
+
+    nx.draw_networkx_edges(G, pos, edgelist=from_edges, alpha=0.4, edge_color="green", arrows=True, width=0.8)
+    nx.draw_networkx_edges(G, pos, edgelist=to_edges, alpha=0.4, edge_color="red", arrows=True, width=0.8)
+
+    # Aggregated subreddit -> subreddit edges, drawn wider for more crossposts
+    aggregate_edges = [(u, v) for u, v in G.edges() if G.edges[u, v].get("type") == "crosspost"]
+    if aggregate_edges:
+        widths = [0.5 + np.log1p(G.edges[u, v].get("weight", 1)) for u, v in aggregate_edges]
+        nx.draw_networkx_edges(G, pos, edgelist=aggregate_edges, alpha=0.5, edge_color="purple", arrows=True, width=widths)
+
+    subreddit_sizes = [G.nodes[n].get("size", 10) * 10 for n in subreddit_nodes]
+    nx.draw_networkx_nodes(G, pos, nodelist=subreddit_nodes, node_size=subreddit_sizes,
+                           node_color="skyblue", alpha=0.8, edgecolors="black", linewidths=1)
+
+    nx.draw_networkx_nodes(G, pos, nodelist=crosspost_nodes, node_size=30,
+                           node_color="orange", alpha=0.6)
+
+    labels = {n: G.nodes[n].get("label", n) for n in subreddit_nodes}
+    nx.draw_networkx_labels(G, pos, labels=labels, font_size=10, font_weight="bold")
+
+    plt.plot([0], [0], 'o', color='skyblue', markersize=10, label='Subreddit')
+    plt.plot([0], [0], 'o', color='orange', markersize=5, label='Crosspost')
+    plt.plot([0], [0], '-', color='green', linewidth=2, label='From Subreddit')
+    plt.plot([0], [0], '-', color='red', linewidth=2, label='To Subreddit')
+    if aggregate_edges:
+        plt.plot([0], [0], '-', color='purple', linewidth=2, label='Crossposts (aggregated)')
+    plt.legend(loc='upper left', fontsize=12)
+
+    subreddit_count = len(subreddit_nodes)
+    crosspost_count = G.graph.get("crosspost_count", len(crosspost_nodes))
+
+    plt.suptitle(f"Reddit Crosspost Network: {crosspost_count} Crossposts Between {subreddit_count} Subreddits",
+                 fontsize=24, y=0.98)
+
+    if aggregate_edges:
+        caption = ("Purple arrows aggregate all crossposts from one subreddit to another; width grows with the count.\n" +
+                   "Orange nodes are individual crossposts on the busiest connections.")
+    else:
+        caption = ("Each orange node represents an individual crosspost connecting two subreddits.\n" +
+                   "Green lines show the original subreddit, red lines show the destination subreddit.")
+    plt.figtext(0.5, 0.01, caption, ha='center', fontsize=14)
+
+    plt.axis('off')
+    plt.tight_layout()
+    return fig
+
+
+def render_to_files(G, pos, targets):
+    """
+    Draw the network once and save it to each (output_file, format) target.
+    Runs in a worker process; returns (output_file, seconds) per target.
+    """
+    import matplotlib.pyplot as plt
+
+    start_time = time.time()
+    fig = draw_network(G, pos)
+    draw_seconds = time.time() - start_time
+    written = []
+    for output_file, fmt in targets:
+        save_start = time.time()
+        fig.savefig(output_file, format=fmt, bbox_inches="tight", **FORMAT_OPTIONS[fmt])
+        written.append((output_file, round(draw_seconds + time.time() - save_start, 2)))
+    plt.close(fig)
+    return written
+
+
+class NetworkRenderer:
+    """
+    Renders the network to several formats at once, one process per format,
+    so a slow SVG no longer waits behind the 300 dpi PNG (or the other way
+    round) and the caller can keep working until wait() is called.
+    On a single CPU, or with parallel=False, it draws once in-process and
+    saves every format from the same figure instead.
+    """
+
+    def __init__(self, parallel=None):
+        self.parallel = (os.cpu_count() or 1) > 1 if parallel is None else parallel
+        self._executor = None
+        self._pending = []
+
+    def submit(self, G, pos, output_base, formats):
+        targets = [(f"{output_base}.{fmt}", fmt) for fmt in formats]
+        if not self.parallel or len(targets) < 2:
+            with span("render", items=len(targets)):
+                self._pending.append(render_to_files(G, pos, targets))
+            return
+        if self._executor is None:
+            # Spawned workers keep matplotlib state out of the parent process
+            self._executor = ProcessPoolExecutor(max_workers=len(FORMAT_OPTIONS),
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        for target in targets:
+            self._pending.append(self._executor.submit(render_to_files, G, pos, [target]))
+
+    def wait(self):
+        """Block until every submitted format is written; returns the file paths"""
+        written = []
+        try:
+            # Worker processes draw in parallel; this is the time the caller blocks on them
+            with span("render_wait") as record:
+                for pending in self._pending:
+                    for output_file, duration in pending.result() if hasattr(pending, "result") else pending:
+                        print(f"Rendered {output_file} in {duration:.2f} seconds")
+                        written.append(output_file)
+                record.items = len(written)
+        finally:
+            self._pending = []
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+        return written
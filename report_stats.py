@@ -0,0 +1,144 @@
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Optional
+
+import pandas as pd
+
+from post_schema import ORDERED_DAYS, category_matrix
+
+# Polarity beyond +/- SENTIMENT_THRESHOLD is positive or negative; the threshold itself is still neutral.
+# generate_fallback_analysis labels the average tone with the same sentiment_label
+SENTIMENT_THRESHOLD = 0.1
+SENTIMENT_LABELS = ["negative", "neutral", "positive"]
+
+
+def sentiment_label(polarity):
+    if polarity > SENTIMENT_THRESHOLD:
+        return "positive"
+    if polarity < -SENTIMENT_THRESHOLD:
+        return "negative"
+    return "neutral"
+
+
+def sentiment_labels(polarity):
+    """sentiment_label over a Series, as a categorical; missing polarity stays unlabelled"""
+    labels = pd.Series("neutral", index=polarity.index, dtype="object")
+    labels[polarity > SENTIMENT_THRESHOLD] = "positive"
+    labels[polarity < -SENTIMENT_THRESHOLD] = "negative"
+    labels[polarity.isna()] = None
+    return labels.astype(pd.CategoricalDtype(SENTIMENT_LABELS))
+
+
+@dataclass
+class GroupStats:
+    """Post count and mean score per value of one dimension"""
+    counts: Dict[str, int] = field(default_factory=dict)
+    mean_scores: Dict[str, float] = field(default_factory=dict)
+
+    def most_common(self):
+        return max(self.counts, key=self.counts.get) if self.counts else None
+
+    def best(self, n=1):
+        """Values with the highest mean score, best first"""
+        return sorted(self.mean_scores, key=self.mean_scores.get, reverse=True)[:n]
+
+
+@dataclass
+class ReportStats:
+    total_posts: int
+    date_start: Optional[str]
+    date_end: Optional[str]
+    subreddit_count: int
+    author_count: int
+    avg_sentiment: float
+    avg_subjectivity: float
+    avg_score: float
+    avg_comments: float
+    avg_upvote_ratio: Optional[float]
+    sentiment_score_corr: Optional[float]
+    crosspost_share: Optional[float]
+    most_positive_post: Optional[Dict]
+    most_negative_post: Optional[Dict]
+    by_hour: GroupStats
+    by_weekday: GroupStats
+    by_category: GroupStats
+    by_sentiment: GroupStats
+
+    @property
+    def tone(self):
+        return 'positive' if self.avg_sentiment > 0 else 'negative' if self.avg_sentiment < 0 else 'neutral'
+
+    @property
+    def top_categories(self):
+        """Most frequent categories"""
+        return sorted(self.by_category.counts, key=self.by_category.counts.get, reverse=True)[:3]
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def _group_stats(keys, scores, order=None):
+    """One grouped pass: count and mean score per key, optionally in a fixed key order"""
+    grouped = scores.groupby(keys, observed=True, sort=True).agg(['size', 'mean'])
+    if order is not None:
+        grouped = grouped.reindex([key for key in order if key in grouped.index])
+    return GroupStats(
+        counts={str(key): int(row['size']) for key, row in grouped.iterrows()},
+        mean_scores={str(key): round(float(row['mean']), 4) for key, row in grouped.iterrows()}
+    )
+
+
+def _extreme_post(df, idx):
+    return {"title": df.at[idx, 'title'], "sentiment": round(float(df.at[idx, 'combined_sentiment']), 4)}
+
+
+def _optional_float(value):
+    return None if pd.isna(value) else round(float(value), 4)
+
+
+def compute_report_stats(df):
+    """
+    Compute every statistic the analysis report and its JSON output show,
+    with one vectorized groupby per dimension (hour, weekday, category and
+    binned sentiment) instead of per-value filtering.
+    """
+    has_dates = 'date' in df.columns and not df['date'].isnull().all()
+    by_hour = _group_stats(df['hour_of_day'], df['score']) if 'hour_of_day' in df.columns else GroupStats()
+    by_weekday = (_group_stats(df['day_of_week'], df['score'], order=ORDERED_DAYS)
+                  if 'day_of_week' in df.columns else GroupStats())
+
+    by_category = GroupStats()
+    if 'categories' in df.columns:
+        # Posts count towards each of their categories: column sums and a
+        # score-weighted product over the multi-hot matrix
+        matrix = category_matrix(df)
+        counts = matrix.sum()
+        counts = counts[counts > 0]
+        totals = matrix[counts.index].T.astype('float64') @ df['score'].astype('float64')
+        by_category = GroupStats(
+            counts={str(key): int(count) for key, count in counts.sort_index().items()},
+            mean_scores={str(key): round(float(totals[key] / count), 4) for key, count in counts.sort_index().items()}
+        )
+
+    by_sentiment = _group_stats(sentiment_labels(df['combined_sentiment']), df['score'], order=SENTIMENT_LABELS)
+
+    sentiment = df['combined_sentiment']
+    return ReportStats(
+        total_posts=len(df),
+        date_start=str(df['date'].min()) if has_dates else None,
+        date_end=str(df['date'].max()) if has_dates else None,
+        subreddit_count=int(df['subreddit'].nunique()),
+        author_count=int(df['author'].nunique()),
+        avg_sentiment=round(float(sentiment.mean()), 4),
+        avg_subjectivity=round(float(df['combined_subjectivity'].mean()), 4),
+        avg_score=round(float(df['score'].mean()), 4),
+        avg_comments=round(float(df['num_comments'].mean()), 4),
+        avg_upvote_ratio=_optional_float(df['upvote_ratio'].mean()) if 'upvote_ratio' in df.columns else None,
+        sentiment_score_corr=_optional_float(sentiment.corr(df['score'])),
+        crosspost_share=_optional_float(df['is_crosspost'].mean()) if 'is_crosspost' in df.columns and len(df) else None,
+        most_positive_post=_extreme_post(df, sentiment.idxmax()) if sentiment.notna().any() else None,
+        most_negative_post=_extreme_post(df, sentiment.idxmin()) if sentiment.notna().any() else None,
+        by_hour=by_hour,
+        by_weekday=by_weekday,
+        by_category=by_category,
+        by_sentiment=by_sentiment
+    )
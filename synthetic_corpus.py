@@ -0,0 +1,199 @@
+import argparse
+import json
+import math
+import os
+import random
+import string
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+# Filler vocabulary plus the words analysis1's categorizer and the LLM results look for,
+# so generated posts spread over every category and word count
+FILLER_WORDS = [
+    "the", "a", "of", "and", "to", "in", "is", "that", "for", "it", "on", "with", "as", "this", "was",
+    "people", "community", "today", "week", "local", "city", "news", "post", "thread", "update", "story",
+    "group", "work", "time", "year", "world", "report", "change", "support", "history", "future", "idea"
+]
+TOPIC_WORDS = [
+    "political", "government", "democracy", "election", "vote", "policy", "freedom", "rights", "anarchism",
+    "learn", "education", "book", "reading", "guide", "tutorial", "explain", "understanding",
+    "discussion", "debate", "opinion", "thoughts", "question"
+]
+BAD_WORDS = ["damn", "hell", "crap", "idiot", "stupid", "moron", "jerk", "loser", "trash", "bs"]
+POLITICAL_WORDS = ["election", "democracy", "policy", "government", "senate", "congress", "protest", "union",
+                   "liberal", "conservative", "socialism", "capitalism", "vote", "rights", "freedom"]
+MISINFO_CLAIMS = ["rigged election", "fake statistics", "staged protest", "secret law", "hidden cure",
+                  "doctored video", "paid actors", "cover-up"]
+DOMAINS = ["youtube.com", "i.redd.it", "twitter.com", "nytimes.com", "theguardian.com", "github.com"]
+
+# Posts per LLM batch, as sent by script.py
+LLM_BATCH_SIZE = 10
+
+
+@dataclass
+class CorpusConfig:
+    posts: int = 1000
+    # Share of posts that are crossposts of an earlier post in another subreddit
+    crosspost_ratio: float = 0.1
+    subreddits: int = 50
+    authors: int = None
+    # Mean words per title and per selftext; lengths are log-normally distributed
+    title_words: int = 10
+    selftext_words: int = 60
+    # Share of link posts, which have no selftext
+    link_ratio: float = 0.4
+    start_utc: float = 1735689600.0
+    days: int = 30
+    seed: int = 0
+
+
+def _lognormal_length(rng, mean, sigma=0.75):
+    """Word count with the given mean and a long tail, like real post lengths"""
+    if mean <= 0:
+        return 0
+    return max(1, int(rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)))
+
+
+def _text(rng, mean_words):
+    length = _lognormal_length(rng, mean_words)
+    words = rng.choices(FILLER_WORDS, k=length)
+    # Roughly one word in eight is a topic word
+    for index in rng.sample(range(length), k=max(1, length // 8) if rng.random() < 0.6 else 0):
+        words[index] = rng.choice(TOPIC_WORDS)
+    return " ".join(words)
+
+
+def _post_id(index):
+    """Reddit-style base36 id"""
+    digits = string.digits + string.ascii_lowercase
+    value = index + 36 ** 5
+    encoded = ""
+    while value:
+        value, remainder = divmod(value, 36)
+        encoded = digits[remainder] + encoded
+    return encoded
+
+
+def generate_posts(config):
+    """A Reddit listing dump ([{"kind": "t3", "data": {...}}, ...]) shaped by config"""
+    rng = random.Random(config.seed)
+    subreddits = [f"subreddit_{i}" for i in range(config.subreddits)]
+    # Zipf-like popularity: a few large subreddits and a long tail
+    subreddit_weights = [1 / (rank + 1) for rank in range(config.subreddits)]
+    subscribers = {name: int(2_000_000 * weight) + 100 for name, weight in zip(subreddits, subreddit_weights)}
+    authors = [f"user_{i}" for i in range(config.authors or max(1, config.posts // 5))]
+    span_seconds = config.days * 86400
+
+    posts = []
+    created = sorted(config.start_utc + rng.random() * span_seconds for _ in range(config.posts))
+    post_subreddits = rng.choices(subreddits, weights=subreddit_weights, k=config.posts)
+    for index in range(config.posts):
+        subreddit = post_subreddits[index]
+        post_id = _post_id(index)
+        score = int(rng.paretovariate(1.2)) - 1
+        data = {
+            "id": post_id,
+            "name": f"t3_{post_id}",
+            "subreddit": subreddit,
+            "subreddit_subscribers": subscribers[subreddit],
+            "author": rng.choice(authors),
+            "created_utc": round(created[index], 1),
+            "score": score,
+            "ups": score,
+            "downs": 0,
+            "upvote_ratio": round(rng.uniform(0.5, 1.0), 2),
+            "num_comments": int(rng.paretovariate(1.5)) - 1,
+            "over_18": rng.random() < 0.02,
+            "stickied": rng.random() < 0.01
+        }
+        if posts and rng.random() < config.crosspost_ratio:
+            # Any earlier post can be the parent, so some crossposts are crossposted again
+            parent = posts[rng.randrange(len(posts))]["data"]
+            if parent["subreddit"] == subreddit and config.subreddits > 1:
+                subreddit = rng.choice([name for name in subreddits if name != parent["subreddit"]])
+                data["subreddit"] = subreddit
+                data["subreddit_subscribers"] = subscribers[subreddit]
+            data.update({
+                "title": parent["title"],
+                "selftext": "",
+                "domain": f"self.{parent['subreddit']}",
+                "url": f"/r/{parent['subreddit']}/comments/{parent['id']}/",
+                "crosspost_parent": parent["name"],
+                "crosspost_parent_list": [{key: parent[key] for key in
+                                           ("id", "subreddit", "title", "author", "score", "created_utc")}]
+            })
+        else:
+            is_link = rng.random() < config.link_ratio
+            domain = rng.choice(DOMAINS) if is_link else f"self.{subreddit}"
+            data.update({
+                "title": _text(rng, config.title_words),
+                "selftext": "" if is_link else _text(rng, config.selftext_words),
+                "domain": domain,
+                "url": f"https://{domain}/{post_id}" if is_link else f"/r/{subreddit}/comments/{post_id}/"
+            })
+        posts.append({"kind": "t3", "data": data})
+    return posts
+
+
+def generate_llm_results(posts, batch_size=LLM_BATCH_SIZE, seed=0):
+    """Batches in the shape script.py saves from Gemini, which analysis2 reads"""
+    rng = random.Random(seed)
+    batches = []
+    for start in range(0, len(posts), batch_size):
+        batch_posts = []
+        for post in posts[start:start + batch_size]:
+            data = post["data"]
+            batch_posts.append({
+                "ID": data["id"],
+                "user": data["author"],
+                "Bad words": rng.sample(BAD_WORDS, k=rng.choice([0, 0, 0, 1, 2])),
+                "Political words": rng.sample(POLITICAL_WORDS, k=rng.choice([0, 0, 1, 2, 3])),
+                "Potential Misinfo": rng.sample(MISINFO_CLAIMS, k=1) if rng.random() < 0.05 else [],
+                "banned": rng.random() < 0.01,
+                "subreddit": data["subreddit"],
+                "extra": data["title"],
+                "timestamp": datetime.fromtimestamp(data["created_utc"], tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+            })
+        end = start + len(batch_posts)
+        batches.append({
+            "Specific Findings": [f"Batch {start}-{end - 1} mixes political and general discussion."],
+            "Attraction": ["Political threads draw the most comments."],
+            "Post": batch_posts,
+            "batch_info": {"start_index": start, "end_index": end}
+        })
+    return batches
+
+
+def write_json(path, value):
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(value, f)
+    os.replace(tmp_file, path)
+
+
+def write_corpus(config, output_dir, input_file="input.json", llm_file="output1.json"):
+    """Write the listing dump and the matching LLM results; returns their paths"""
+    os.makedirs(output_dir, exist_ok=True)
+    posts = generate_posts(config)
+    input_path = os.path.join(output_dir, input_file)
+    llm_path = os.path.join(output_dir, llm_file)
+    write_json(input_path, posts)
+    write_json(llm_path, generate_llm_results(posts, seed=config.seed))
+    return input_path, llm_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic Reddit dump and LLM results for benchmarks")
+    parser.add_argument("--posts", type=int, default=1000, help="Number of posts")
+    parser.add_argument("--crosspost-ratio", type=float, default=0.1, help="Share of posts that are crossposts")
+    parser.add_argument("--subreddits", type=int, default=50, help="Number of subreddits")
+    parser.add_argument("--title-words", type=int, default=10, help="Mean title length in words")
+    parser.add_argument("--selftext-words", type=int, default=60, help="Mean selftext length in words")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--output-dir", default=".", help="Directory for input.json and output1.json")
+    args = parser.parse_args()
+
+    config = CorpusConfig(posts=args.posts, crosspost_ratio=args.crosspost_ratio, subreddits=args.subreddits,
+                          title_words=args.title_words, selftext_words=args.selftext_words, seed=args.seed)
+    for path in write_corpus(config, args.output_dir):
+        print(f"Wrote {path}")
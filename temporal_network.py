@@ -0,0 +1,195 @@
+import json
+import math
+import os
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import datetime, timezone
+
+WINDOW_SECONDS = {
+    "hour": 3600,
+    "day": 86400,
+    "week": 7 * 86400
+}
+
+
+def parse_time(value):
+    """Accept unix seconds or an ISO 8601 date/datetime (UTC when no offset is given)"""
+    if value is None or value == "":
+        return None
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        pass
+    else:
+        if not math.isfinite(seconds):
+            raise ValueError(f"time must be finite, got {value!r}")
+        return seconds
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class TemporalCrosspostIndex:
+    """
+    Crosspost counts per (source, dest) subreddit pair, bucketed into fixed
+    time windows. Adding a crosspost only touches its own window, and a time
+    range query sums the per-window aggregates it covers instead of rescanning
+    individual crossposts.
+
+    The index is kept across runs: crossposts are remembered by id, so adding
+    a dump again only counts the new ones, and prune() ages out old windows.
+    """
+
+    def __init__(self, window="day"):
+        if window not in WINDOW_SECONDS:
+            raise ValueError(f"Unknown window '{window}'. Choose from: {', '.join(WINDOW_SECONDS)}")
+        self.window = window
+        self.window_seconds = WINDOW_SECONDS[window]
+        self.starts = []
+        self.windows = {}
+        # Crossposts without a timestamp still count towards queries without a range
+        self.undated = Counter()
+        # Crossposts already counted, by id, with the window they went into (None when undated)
+        self.crossposts = {}
+
+    def window_start(self, timestamp):
+        return int(timestamp // self.window_seconds * self.window_seconds)
+
+    def add(self, source, dest, timestamp, count=1, crosspost_id=None):
+        """Count a crosspost; one whose crosspost_id was already counted is skipped. Returns whether it was added"""
+        if source == dest or (crosspost_id is not None and crosspost_id in self.crossposts):
+            return False
+        start = None if timestamp is None else self.window_start(float(timestamp))
+        if crosspost_id is not None:
+            self.crossposts[crosspost_id] = start
+        if start is None:
+            self.undated[(source, dest)] += count
+            return True
+        if start not in self.windows:
+            self.windows[start] = Counter()
+            self.starts.insert(bisect_left(self.starts, start), start)
+        self.windows[start][(source, dest)] += count
+        return True
+
+    def prune(self, before):
+        """Drop windows that end before the given time, for a rolling retention period; returns how many"""
+        keep_from = bisect_right(self.starts, before - self.window_seconds)
+        if not keep_from:
+            return 0
+        for start in self.starts[:keep_from]:
+            del self.windows[start]
+        self.starts = self.starts[keep_from:]
+        # Forget ids from dropped windows; an old crosspost seen again is pruned again
+        self.crossposts = {crosspost_id: start for crosspost_id, start in self.crossposts.items()
+                           if start is None or start in self.windows}
+        return keep_from
+
+    def latest(self):
+        """End of the newest window, or None for an index without dated crossposts"""
+        return self.starts[-1] + self.window_seconds if self.starts else None
+
+    def edge_weights(self, start=None, end=None):
+        """
+        Sum edge weights over the windows overlapping [start, end).
+        Whole windows are combined, so the range is effectively widened to window bounds.
+        """
+        first = 0 if start is None else bisect_left(self.starts, self.window_start(start))
+        last = len(self.starts) if end is None else bisect_left(self.starts, end)
+        weights = Counter()
+        for window_start in self.starts[first:last]:
+            weights.update(self.windows[window_start])
+        if start is None and end is None:
+            weights.update(self.undated)
+        return weights
+
+    def network(self, start=None, end=None):
+        """Nodes/edges/stats for a time range, in the shape of reddit_crosspost_network.json"""
+        weights = self.edge_weights(start, end)
+        as_source = Counter()
+        as_destination = Counter()
+        for (source, dest), count in weights.items():
+            as_source[source] += count
+            as_destination[dest] += count
+
+        names = list(dict.fromkeys(name for pair in weights for name in pair))
+        nodes = [{
+            "id": name,
+            "label": f"r/{name}",
+            "type": "subreddit",
+            "as_source": as_source[name],
+            "as_destination": as_destination[name],
+            "value": 10 + as_source[name] + as_destination[name]
+        } for name in names]
+
+        edges = [{
+            "id": f"{source}->{dest}",
+            "from": source,
+            "to": dest,
+            "weight": count,
+            "value": count,
+            "title": f"{count} crossposts from r/{source} to r/{dest}"
+        } for (source, dest), count in weights.most_common()]
+
+        return {
+            "window": self.window,
+            "from": start,
+            "to": end,
+            "nodes": nodes,
+            "edges": edges,
+            "stats": {
+                "total_crossposts": sum(weights.values()),
+                "total_subreddits": len(nodes),
+                "unique_connections": len(edges)
+            }
+        }
+
+    def to_dict(self):
+        return {
+            "window": self.window,
+            "window_seconds": self.window_seconds,
+            "windows": [{
+                "start": start,
+                "total": sum(self.windows[start].values()),
+                "edges": [[source, dest, count] for (source, dest), count in self.windows[start].items()]
+            } for start in self.starts],
+            "undated": [[source, dest, count] for (source, dest), count in self.undated.items()],
+            "crossposts": self.crossposts
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        index = cls(data["window"])
+        for window in data["windows"]:
+            for source, dest, count in window["edges"]:
+                index.add(source, dest, window["start"], count)
+        for source, dest, count in data.get("undated", []):
+            index.add(source, dest, None, count)
+        index.crossposts = dict(data.get("crossposts", {}))
+        return index
+
+    def save(self, output_file):
+        tmp_file = output_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+        os.replace(tmp_file, output_file)
+        print(f"Temporal crosspost network with {len(self.starts)} {self.window} windows saved to {output_file}")
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def load_or_create(cls, path, window="day"):
+        """The index saved at path to keep adding to, or a new one when it is missing, unreadable or uses another window"""
+        if path and os.path.exists(path):
+            try:
+                index = cls.load(path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Ignoring unreadable temporal index {path}: {e}")
+            else:
+                if index.window == window:
+                    return index
+                print(f"Temporal index {path} uses {index.window} windows; rebuilding with {window} windows")
+        return cls(window)